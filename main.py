@@ -9,8 +9,9 @@ load_dotenv()
 # Ensure the project root is in path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from pc_agent.agent import PcAgent, AgentConfig
-from pc_agent.model.client import ModelConfig
+# The agent, model client and desktop libraries are imported in main() once
+# they are needed, so --help and --list-apps start quickly
+from pc_agent.logs import setup_logging
 from pc_agent.config.apps import list_supported_apps
 
 def parse_args() -> argparse.Namespace:
@@ -31,6 +32,30 @@ Examples:
 
     # List supported apps
     python main.py --list-apps
+
+    # Trace where each step's time goes
+    python main.py "打开微信" --trace trace.json
+
+    # Checkpoint every step, and pick up where a crashed run left off
+    python main.py "整理本周所有邮件" --checkpoint run.ckpt
+    python main.py --resume run.ckpt
+
+    # Record a run, then replay it offline through the parsers
+    python main.py "打开微信" --record runs/wechat
+    python main.py --replay runs/wechat
+
+    # Run a regression suite from a JSONL task file
+    python main.py --batch tasks.jsonl --results results.jsonl
+
+    # Split a wide task into independent subtasks on 3 virtual displays, then merge
+    python main.py "分别查询北京、上海、广州明天的天气，并写入备忘录" --decompose --parallel 3
+
+    # Spread a task file over 8 agents on 8 virtual X displays (Linux, Xvfb)
+    python main.py --batch tasks.jsonl --parallel 8 --max-model-concurrency 4
+
+    # Run as a daemon accepting tasks over HTTP (metrics on /metrics)
+    python main.py --serve --port 8765
+    curl -N -d '{"task": "打开微信"}' "http://127.0.0.1:8765/tasks?stream=1"
         """,
     )
 
@@ -64,6 +89,14 @@ Examples:
         help="API key for model authentication",
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=os.getenv("PC_AGENT_STREAM", "").lower() in ("1", "true", "yes"),
+        help="Stream model replies: measures time-to-first-token in traces and metrics "
+             "and emits ModelToken events",
+    )
+
     # Agent options
     parser.add_argument(
         "--max-steps",
@@ -72,6 +105,27 @@ Examples:
         help="Maximum steps per task",
     )
 
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=float(os.getenv("PC_AGENT_TIMEOUT")) if os.getenv("PC_AGENT_TIMEOUT") else None,
+        help="Wall-clock time limit per task in seconds",
+    )
+
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=int(os.getenv("PC_AGENT_TOKEN_BUDGET")) if os.getenv("PC_AGENT_TOKEN_BUDGET") else None,
+        help="Stop a task once it has used this many prompt + completion tokens",
+    )
+
+    parser.add_argument(
+        "--image-budget",
+        type=int,
+        default=int(os.getenv("PC_AGENT_IMAGE_BUDGET")) if os.getenv("PC_AGENT_IMAGE_BUDGET") else None,
+        help="Stop a task before it sends more than this many screenshot bytes",
+    )
+
     parser.add_argument(
         "--lang",
         type=str,
@@ -80,6 +134,132 @@ Examples:
         help="Language (cn/en)",
     )
 
+    parser.add_argument(
+        "--trace",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        help="Trace each step and print a per-phase summary; with a PATH, also "
+             "export Chrome trace-event JSON (open in chrome://tracing or Perfetto)",
+    )
+
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv("PC_AGENT_METRICS_PORT")) if os.getenv("PC_AGENT_METRICS_PORT") else None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=os.getenv("PC_AGENT_METRICS_FILE"),
+        help="Periodically write Prometheus metrics to this textfile-collector .prom file",
+    )
+
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        help="Record each step (screenshots, model output, actions) into this directory",
+    )
+
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        help="Replay a recorded trajectory through the parsers and action handler, no screen or model needed",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Write a resumable checkpoint to this file before every step",
+    )
+
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        help="Continue the task saved in this checkpoint file",
+    )
+
+    parser.add_argument(
+        "--plan-cache",
+        type=str,
+        default=os.getenv("PC_AGENT_PLAN_CACHE"),
+        help="Replay cached action sequences of previously successful identical tasks "
+             "while the screen still matches (JSON cache file)",
+    )
+
+    parser.add_argument(
+        "--history-thumbnails",
+        type=int,
+        default=int(os.getenv("PC_AGENT_HISTORY_THUMBNAILS", "0")),
+        help="Show the model small thumbnails of the last K screens (default: 0, off)",
+    )
+
+    parser.add_argument(
+        "--escalation-model",
+        type=str,
+        default=os.getenv("PC_AGENT_ESCALATION_MODEL"),
+        help="Stronger model on the same endpoint to ask for one step when the agent is stuck in a loop",
+    )
+
+    parser.add_argument(
+        "--no-loop-detection",
+        action="store_true",
+        help="Do not detect repeated no-effect actions and action cycles",
+    )
+
+    parser.add_argument(
+        "--snap-taps",
+        action="store_true",
+        help="Move taps that land just off a UI element onto it (needs NumPy: pip install 'wordwill[snap]')",
+    )
+
+    parser.add_argument(
+        "--ui-tree",
+        action="store_true",
+        default=os.getenv("PC_AGENT_UI_TREE", "").lower() in ("1", "true", "yes"),
+        help="Send the focused window's accessibility tree with each screenshot "
+             "(Linux AT-SPI, requires PyGObject)",
+    )
+
+    parser.add_argument(
+        "--ui-tree-image-scale",
+        type=float,
+        default=float(os.getenv("PC_AGENT_UI_TREE_IMAGE_SCALE", "1.0")),
+        help="Scale of the screenshot sent alongside a rich UI tree (default: 1.0, full size)",
+    )
+
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        default=os.getenv("PC_AGENT_SPECULATIVE", "").lower() in ("1", "true", "yes"),
+        help="Send the next model request on an early frame while the UI settles after an "
+             "action; it is reissued if the settled screen differs. Turns on --stream so a "
+             "missed request is cancelled instead of running on next to its replacement",
+    )
+
+    parser.add_argument(
+        "--phase-deadlines",
+        type=str,
+        default=os.getenv("PC_AGENT_PHASE_DEADLINES", ""),
+        help="Override per-phase deadlines in seconds, e.g. 'capture=10,model=120' "
+             "(phases: capture, app_detection, ui_tree, model, action; 0 disables one)",
+    )
+
+    parser.add_argument(
+        "--model-timeout",
+        type=float,
+        default=float(os.getenv("PC_AGENT_MODEL_TIMEOUT", "60")),
+        help="Seconds before the HTTP client gives up on a model request attempt (default: 60); "
+             "the model deadline is raised to cover every retry unless set explicitly",
+    )
+
     # Utility options
     parser.add_argument(
         "--list-apps",
@@ -87,10 +267,84 @@ Examples:
         help="List supported PC applications",
     )
 
+    # Batch options
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help="Run every task in a JSONL file (fields: task, id, max_steps, timeout, lang)",
+    )
+
+    parser.add_argument(
+        "--results",
+        type=str,
+        default=None,
+        help="Results JSONL path for --batch (default: <batch file>.results.jsonl)",
+    )
+
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=0,
+        help="Run --batch tasks (or --decompose subtasks) on N agents, each on its own Xvfb display",
+    )
+
+    parser.add_argument(
+        "--decompose",
+        action="store_true",
+        help="Let the model split the task into independent subtasks, run them in separate "
+             "sessions (concurrently with --parallel N) and merge their results",
+    )
+
+    parser.add_argument(
+        "--max-subtasks",
+        type=int,
+        default=4,
+        help="Upper bound on the number of subtasks for --decompose",
+    )
+
+    parser.add_argument(
+        "--max-model-concurrency",
+        type=int,
+        default=int(os.getenv("PC_AGENT_MAX_MODEL_CONCURRENCY")) if os.getenv("PC_AGENT_MAX_MODEL_CONCURRENCY") else None,
+        help="Global cap on in-flight model requests: shared by the daemon's, batch and "
+             "subtask agents of this process, or by all --parallel workers (default: N "
+             "with --parallel, otherwise unlimited)",
+    )
+
+    # Daemon options
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a long-lived daemon accepting tasks over a local HTTP/JSON API",
+    )
+
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=os.getenv("PC_AGENT_HOST", "127.0.0.1"),
+        help="Daemon bind host",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("PC_AGENT_PORT", "8765")),
+        help="Daemon bind port",
+    )
+
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Serve the daemon API on this Unix socket path instead of TCP",
+    )
+
     return parser.parse_args()
 
 def main():
     args = parse_args()
+    setup_logging()
 
     if args.list_apps:
         print("\n🖥️  Supported PC Applications:")
@@ -99,33 +353,139 @@ def main():
             print(f"  - {app}")
         return
 
-    if not args.task:
-        print("❌ Error: Please provide a task description.")
-        print("Usage: python main.py \"your task here\"")
-        return
+    if args.replay:
+        from pc_agent.trajectory import replay
+        report = replay(args.replay)
+        print(f"\n🔁 Replay of {args.replay}\n{report.format()}")
+        sys.exit(0 if report.matched else 1)
+
+    from pc_agent.agent import PcAgent, AgentConfig
+    from pc_agent.model.client import ModelClient, ModelConfig
+    from pc_agent.watchdog import DEFAULT_PHASE_DEADLINES
 
     # 1. Create configurations
     model_config = ModelConfig(
         base_url=args.base_url,
         model_name=args.model,
         api_key=args.apikey,
+        input_cost_per_mtok=float(os.getenv("PC_AGENT_INPUT_COST_PER_MTOK", "0")),
+        output_cost_per_mtok=float(os.getenv("PC_AGENT_OUTPUT_COST_PER_MTOK", "0")),
+        stream=args.stream or args.speculative,  # only a streamed speculative request can be cancelled
+        request_timeout=args.model_timeout,
     )
 
+    phase_deadlines = dict(DEFAULT_PHASE_DEADLINES)
+    # The watchdog must not fire while the HTTP client is still retrying: the abandoned
+    # request would keep its slot while the agent sends another one
+    client_bound = model_config.request_timeout * (model_config.max_retries + 1)
+    phase_deadlines["model"] = max(phase_deadlines["model"], client_bound)
+    for item in filter(None, (part.strip() for part in args.phase_deadlines.split(","))):
+        phase, _, seconds = item.partition("=")
+        try:
+            phase_deadlines[phase.strip()] = float(seconds)
+        except ValueError:
+            print(f"❌ Error: invalid phase deadline {item!r}, expected PHASE=SECONDS")
+            sys.exit(2)
+        if phase.strip() == "model" and 0 < phase_deadlines["model"] < client_bound:
+            print(f"⚠️  The model deadline ({seconds}s) is shorter than the client's "
+                  f"{model_config.max_retries + 1} attempts of {model_config.request_timeout:g}s")
+
     agent_config = AgentConfig(
         max_steps=args.max_steps,
         lang=args.lang,
-        verbose=True
+        verbose=True,
+        timeout=args.timeout,
+        trace=args.trace is not None,
+        trace_path=args.trace or None,
+        token_budget=args.token_budget,
+        image_bytes_budget=args.image_budget,
+        record_path=args.record,
+        plan_cache_path=args.plan_cache,
+        checkpoint_path=args.checkpoint or args.resume,
+        history_thumbnails=args.history_thumbnails,
+        loop_detection=not args.no_loop_detection,
+        escalation_model=args.escalation_model,
+        snap_taps=args.snap_taps,
+        ui_tree=args.ui_tree,
+        ui_tree_image_scale=args.ui_tree_image_scale,
+        speculative=args.speculative,
+        phase_deadlines=phase_deadlines,
     )
 
+    # With --parallel, the workers' metrics are aggregated into this process
+    if args.metrics_port or args.metrics_file:
+        from pc_agent import metrics
+        if args.metrics_port:
+            metrics.start_metrics_server(args.metrics_port)
+        if args.metrics_file:
+            metrics.start_textfile_writer(args.metrics_file)
+
+    # One scheduler for every model client in this process, so interactive requests
+    # go first and agents are served fairly; --parallel workers share a semaphore instead
+    scheduler = None
+    if args.max_model_concurrency and args.parallel <= 0:
+        from pc_agent.model.scheduler import RequestScheduler
+        scheduler = RequestScheduler(max_in_flight=args.max_model_concurrency)
+
+    if args.batch:
+        results = args.results or os.path.splitext(args.batch)[0] + ".results.jsonl"
+        if args.parallel > 0:
+            from pc_agent.parallel import run_parallel
+            run_parallel(
+                args.batch, results, args.parallel, model_config, agent_config,
+                max_model_concurrency=args.max_model_concurrency,
+            )
+        else:
+            from pc_agent.batch import run_batch
+            run_batch(args.batch, results, model_config, agent_config, scheduler=scheduler)
+        return
+
+    if args.serve:
+        from pc_agent.server import serve
+        serve(
+            model_config, agent_config, host=args.host, port=args.port, unix_socket=args.socket,
+            scheduler=scheduler,
+        )
+        return
+
+    checkpoint = None
+    if args.resume:
+        from pc_agent.checkpoint import load_checkpoint
+        checkpoint = load_checkpoint(args.resume)
+        args.task = checkpoint.task
+        agent_config.lang = checkpoint.lang
+
+    if not args.task:
+        print("❌ Error: Please provide a task description.")
+        print("Usage: python main.py \"your task here\"")
+        return
+
+    from pc_agent.model.scheduler import Priority
+    model_client = ModelClient(model_config, scheduler=scheduler, priority=Priority.INTERACTIVE)
+
+    if args.decompose:
+        from pc_agent.planner import run_decomposed
+        try:
+            result = run_decomposed(
+                args.task, model_config, agent_config, model_client=model_client,
+                num_displays=args.parallel, max_subtasks=args.max_subtasks,
+                max_model_concurrency=args.max_model_concurrency,
+            )
+        except KeyboardInterrupt:
+            print("\n👋 Agent stopped by user.")
+            return
+        print(f"\n{'✅' if result.success else '❌'} {result.message}")
+        return
+
     # 2. Create agent
     agent = PcAgent(
-        model_config=model_config,
         agent_config=agent_config,
+        model_client=model_client,
     )
 
     # 3. Run task
     try:
-        agent.run(args.task)
+        agent.run(args.task, resume=checkpoint)
     except KeyboardInterrupt:
         print("\n👋 Agent stopped by user.")
     except Exception as e:
@@ -1,5 +1,7 @@
-from pc_agent.agent import PcAgent
-
+from pc_agent.lazy import lazy_exports
 
 __version__ = "0.1.0"
-__all__ = ["PcAgent"]
\ No newline at end of file
+__all__ = ["PcAgent"]
+
+# The agent pulls in the model client and desktop automation; load it on first use
+__getattr__, __dir__ = lazy_exports(__name__, {"PcAgent": "pc_agent.agent"})
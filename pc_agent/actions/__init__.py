@@ -1,5 +1,6 @@
 """Action handling module for Phone Agent."""
 
-from pc_agent.actions.handler import ActionHandler, ActionResult
+from pc_agent.actions.handler import ActionHandler, ActionResult, parse_action
+from pc_agent.actions.types import Action, action_from_dict
 
-__all__ = ["ActionHandler", "ActionResult"]
+__all__ = ["ActionHandler", "ActionResult", "Action", "parse_action", "action_from_dict"]
@@ -1,20 +1,13 @@
 """Action handler for processing AI model outputs."""
 
-import time
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, Tuple, Dict, Union, List
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
-from pc_agent.pc import (
-    back,
-    clear_text,
-    double_tap,
-    home,
-    launch_app,
-    long_press,
-    swipe,
-    tap,
-    type_text,
-)
+from pc_agent.actions import types
+from pc_agent.actions.types import Action, Point, action_from_dict, do, finish
+from pc_agent.config.apps import suggest_app_names
+from pc_agent.pc.backend import Backend, LocalBackend
+from pc_agent.scratchpad import Scratchpad
 
 
 @dataclass
@@ -35,154 +28,173 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        backend: Desktop backend to act on, defaults to the local screen.
+        scratchpad: Working memory that Note writes to; a private one is
+            created if not given.
+        summarize_callback: Optional callback used by Call_API, called with
+            (instruction, recorded notes) and returning the text-only answer.
     """
 
     def __init__(
         self,
         confirmation_callback: Optional[Callable[[str], bool]] = None,
         takeover_callback: Optional[Callable[[str], None]] = None,
+        backend: Optional[Backend] = None,
+        scratchpad: Optional[Scratchpad] = None,
+        summarize_callback: Optional[Callable[[str, str], str]] = None,
     ):
+        self.backend = backend or LocalBackend()
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
+        self.scratchpad = scratchpad if scratchpad is not None else Scratchpad()
+        self.summarize_callback = summarize_callback
 
     def execute(
-        self, action: Dict[str, Any], screen_width: int, screen_height: int
+        self, action: Union[Action, Dict[str, Any]], screen_width: int, screen_height: int
     ) -> ActionResult:
         """
         Execute an action from the AI model.
 
         Args:
-            action: The action dictionary from the model.
+            action: The parsed action; dicts in the ``do(...)`` layout, e.g.
+                from recordings, are converted first.
             screen_width: Current screen width in pixels.
             screen_height: Current screen height in pixels.
 
         Returns:
             ActionResult indicating success and whether to finish.
         """
-        action_type = action.get("_metadata")
+        if isinstance(action, dict):
+            if action.get("_metadata") not in ("do", "finish"):
+                return ActionResult(
+                    success=False,
+                    should_finish=True,
+                    message=f"Unknown action type: {action.get('_metadata')}",
+                )
+            action = action_from_dict(action)
 
-        if action_type == "finish":
-            return ActionResult(
-                success=True, should_finish=True, message=action.get("message")
-            )
+        result = self.ask_user(action)
+        if result is not None:
+            return result
+        return self.perform(action, screen_width, screen_height)
 
-        if action_type != "do":
+    def ask_user(self, action: Action) -> Optional[ActionResult]:
+        """
+        Run the interactive part of an action: takeovers and sensitive-tap confirmations.
+
+        Kept apart from ``perform`` so callers can bound the desktop input
+        without bounding the time a person takes to respond.
+
+        Args:
+            action: The parsed action.
+
+        Returns:
+            The action's result if the user settled it, or None to perform it.
+        """
+        try:
+            if isinstance(action, types.TakeOver):
+                self.takeover_callback(action.message or "User intervention required")
+                return ActionResult(True, False)
+            if type(action) is types.Tap and action.element and action.message is not None:
+                if not self.confirmation_callback(action.message):
+                    return ActionResult(
+                        success=False,
+                        should_finish=True,
+                        message="User cancelled sensitive operation",
+                    )
+        except Exception as e:
             return ActionResult(
-                success=False,
-                should_finish=True,
-                message=f"Unknown action type: {action_type}",
+                success=False, should_finish=False, message=f"Action failed: {e}"
             )
+        return None
+
+    def perform(self, action: Action, screen_width: int, screen_height: int) -> ActionResult:
+        """
+        Perform an action on the desktop, after ``ask_user`` let it proceed.
+
+        Args:
+            action: The parsed action.
+            screen_width: Current screen width in pixels.
+            screen_height: Current screen height in pixels.
 
-        action_name = action.get("action")
-        handler_method = self._get_handler(action_name)
+        Returns:
+            ActionResult indicating success and whether to finish.
+        """
+        handler_method = _HANDLERS.get(type(action))
 
         if handler_method is None:
             return ActionResult(
                 success=False,
                 should_finish=False,
-                message=f"Unknown action: {action_name}",
+                message=f"Unknown action: {action.name}",
             )
 
         try:
-            return handler_method(action, screen_width, screen_height)
+            return handler_method(self, action, screen_width, screen_height)
         except Exception as e:
             return ActionResult(
                 success=False, should_finish=False, message=f"Action failed: {e}"
             )
 
-    def _get_handler(self, action_name: str) -> Optional[Callable]:
-        """Get the handler method for an action."""
-        handlers = {
-            "Launch": self._handle_launch,
-            "Tap": self._handle_tap,
-            "Type": self._handle_type,
-            "Type_Name": self._handle_type,
-            "Swipe": self._handle_swipe,
-            "Back": self._handle_back,
-            "Home": self._handle_home,
-            "Double Tap": self._handle_double_tap,
-            "Long Press": self._handle_long_press,
-            "Wait": self._handle_wait,
-            "Take_over": self._handle_takeover,
-            "Note": self._handle_note,
-            "Call_API": self._handle_call_api,
-            "Interact": self._handle_interact,
-        }
-        return handlers.get(action_name)
-
+    @staticmethod
     def _convert_relative_to_absolute(
-        self, element: Union[List[int], str], screen_width: int, screen_height: int
+        point: Point, screen_width: int, screen_height: int
     ) -> Tuple[int, int]:
         """Convert relative coordinates (0-1000) to absolute pixels."""
-        if isinstance(element, str):
-            try:
-                # Handle string encoded lists like "[495, 109]"
-                import ast
-                element = ast.literal_eval(element)
-            except Exception:
-                # Fallback: try simple string splitting if literal_eval fails
-                try:
-                    clean_el = element.strip('[]() ')
-                    element = [int(i.strip()) for i in clean_el.split(',')]
-                except Exception:
-                    raise ValueError(f"Invalid coordinate format: {element}")
+        return point[0] * screen_width // 1000, point[1] * screen_height // 1000
 
-        if not isinstance(element, (list, tuple)) or len(element) < 2:
-            raise ValueError(f"Coordinates must be a list/tuple of at least 2 numbers, got: {element}")
+    def _handle_finish(self, action: types.Finish, width: int, height: int) -> ActionResult:
+        """Handle finish action."""
+        return ActionResult(success=True, should_finish=True, message=action.message)
 
-        x = int(float(element[0]) / 1000 * screen_width)
-        y = int(float(element[1]) / 1000 * screen_height)
-        return x, y
-
-    def _handle_launch(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_launch(self, action: types.Launch, width: int, height: int) -> ActionResult:
         """Handle app launch action."""
-        app_name = action.get("app")
+        app_name = action.app
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        success = launch_app(app_name)
+        success = self.backend.launch_app(app_name)
         if success:
             return ActionResult(True, False)
+        # Only exact names and aliases are launched; let the model pick from near misses
+        suggestions = suggest_app_names(app_name)
+        if suggestions:
+            return ActionResult(False, False, f"App not found: {app_name}. Did you mean: {', '.join(suggestions)}?")
         return ActionResult(False, False, f"App not found: {app_name}")
 
-    def _handle_tap(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_tap(self, action: types.Tap, width: int, height: int) -> ActionResult:
         """Handle tap action."""
-        element = action.get("element")
+        element = action.element
         if not element:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-
-        # Check for sensitive operation
-        if "message" in action:
-            if not self.confirmation_callback(action["message"]):
-                return ActionResult(
-                    success=False,
-                    should_finish=True,
-                    message="User cancelled sensitive operation",
-                )
-
-        tap(x, y)
+        # Sensitive taps were confirmed in ask_user
+        self.backend.tap(x, y)
         return ActionResult(True, False)
 
-    def _handle_type(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_type(self, action: types.TypeText, width: int, height: int) -> ActionResult:
         """Handle text input action."""
-        text = action.get("text", "")
+        text = action.text
 
         # Clear existing text and type new text
         # PC doesn't need ADB keyboard switching
-        clear_text()
-        time.sleep(0.5)
+        self.backend.clear_text()
+        self.backend.wait(0.5, "settle")
+
+        self.backend.type_text(text)
+        self.backend.wait(0.5, "settle")
 
-        type_text(text)
-        time.sleep(0.5)
+        if action.submit:
+            self.backend.press_key("enter")
+            self.backend.wait(0.5, "settle")
 
         return ActionResult(True, False)
 
-    def _handle_swipe(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_swipe(self, action: types.Swipe, width: int, height: int) -> ActionResult:
         """Handle swipe action."""
-        start = action.get("start")
-        end = action.get("end")
+        start = action.start
+        end = action.end
 
         if not start or not end:
             return ActionResult(False, False, "Missing swipe coordinates")
@@ -190,65 +202,70 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        swipe(start_x, start_y, end_x, end_y)
+        self.backend.swipe(start_x, start_y, end_x, end_y)
         return ActionResult(True, False)
 
-    def _handle_back(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_back(self, action: types.Back, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        back()
+        self.backend.back()
         return ActionResult(True, False)
 
-    def _handle_home(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_home(self, action: types.Home, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        home()
+        self.backend.home()
         return ActionResult(True, False)
 
-    def _handle_double_tap(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_double_tap(self, action: types.DoubleTap, width: int, height: int) -> ActionResult:
         """Handle double tap action."""
-        element = action.get("element")
+        element = action.element
         if not element:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        double_tap(x, y)
+        self.backend.double_tap(x, y)
         return ActionResult(True, False)
 
-    def _handle_long_press(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_long_press(self, action: types.LongPress, width: int, height: int) -> ActionResult:
         """Handle long press action."""
-        element = action.get("element")
+        element = action.element
         if not element:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        long_press(x, y)
+        self.backend.long_press(x, y)
         return ActionResult(True, False)
 
-    def _handle_wait(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_wait(self, action: types.Wait, width: int, height: int) -> ActionResult:
         """Handle wait action."""
-        duration_str = action.get("duration", "1 seconds")
-        try:
-            duration = float(duration_str.replace("seconds", "").strip())
-        except ValueError:
-            duration = 1.0
-
-        time.sleep(duration)
-        return ActionResult(True, False)
-
-    def _handle_takeover(self, action: Dict, width: int, height: int) -> ActionResult:
-        """Handle takeover request (login, captcha, etc.)."""
-        message = action.get("message", "User intervention required")
-        self.takeover_callback(message)
+        self.backend.wait(action.duration, "wait")
         return ActionResult(True, False)
 
-    def _handle_note(self, action: Dict, width: int, height: int) -> ActionResult:
-        """Handle note action (placeholder for content recording)."""
+    def _handle_takeover(self, action: types.TakeOver, width: int, height: int) -> ActionResult:
+        """Handle takeover request (login, captcha, etc.); the user took over in ask_user."""
         return ActionResult(True, False)
 
-    def _handle_call_api(self, action: Dict, width: int, height: int) -> ActionResult:
-        """Handle API call action (placeholder for summarization)."""
+    def _handle_note(self, action: types.Note, width: int, height: int) -> ActionResult:
+        """Handle note action: remember the extracted text in the scratchpad."""
+        text = (action.message or "").strip()
+        if not text or text.lower() == "true":
+            return ActionResult(False, False, "Note needs the content to remember in message")
+        self.scratchpad.add(text)
         return ActionResult(True, False)
 
-    def _handle_interact(self, action: Dict, width: int, height: int) -> ActionResult:
+    def _handle_call_api(self, action: types.CallApi, width: int, height: int) -> ActionResult:
+        """Handle API call action: answer the instruction from the recorded notes, without images."""
+        if not self.scratchpad:
+            return ActionResult(False, False, "Nothing has been recorded with Note yet")
+        if self.summarize_callback is None:
+            return ActionResult(False, False, "Call_API is not available")
+        instruction = action.instruction or "总结已记录的内容"
+        summary = self.summarize_callback(instruction, self.scratchpad.render()).strip()
+        if not summary:
+            return ActionResult(False, False, "Call_API returned nothing")
+        self.scratchpad.add(summary, kind="summary")
+        return ActionResult(True, False, message=summary)
+
+    def _handle_interact(self, action: types.Interact, width: int, height: int) -> ActionResult:
         """Handle interaction request (user choice needed)."""
         return ActionResult(True, False, message="User interaction required")
 
@@ -264,15 +281,39 @@ class ActionHandler:
         input(f"{message}\nPress Enter after completing manual operation...")
 
 
-def parse_action(response: str) -> Dict[str, Any]:
+# Handler for each action class, built once; subclasses are listed explicitly
+_HANDLERS: Dict[type, Callable[..., ActionResult]] = {
+    types.Finish: ActionHandler._handle_finish,
+    types.Launch: ActionHandler._handle_launch,
+    types.Tap: ActionHandler._handle_tap,
+    types.TypeText: ActionHandler._handle_type,
+    types.TypeName: ActionHandler._handle_type,
+    types.Swipe: ActionHandler._handle_swipe,
+    types.Back: ActionHandler._handle_back,
+    types.Home: ActionHandler._handle_home,
+    types.DoubleTap: ActionHandler._handle_double_tap,
+    types.LongPress: ActionHandler._handle_long_press,
+    types.Wait: ActionHandler._handle_wait,
+    types.TakeOver: ActionHandler._handle_takeover,
+    types.Note: ActionHandler._handle_note,
+    types.CallApi: ActionHandler._handle_call_api,
+    types.Interact: ActionHandler._handle_interact,
+}
+
+
+def parse_action(response: str) -> Action:
     """
     Parse action from model response.
 
+    Unparseable responses, including actions with malformed coordinates,
+    become a Wait action whose ``parse_error`` names the reason so callers
+    can count them.
+
     Args:
         response: Raw response string from the model.
 
     Returns:
-        Parsed action dictionary.
+        Parsed action.
 
     Raises:
         ValueError: If the response cannot be parsed.
@@ -282,7 +323,7 @@ def parse_action(response: str) -> Dict[str, Any]:
         
         # 0. Handle empty response
         if not response:
-            return do(action="Wait", duration="1 seconds", message="Empty action received, waiting for next turn.")
+            return do(action="Wait", duration="1 seconds", message="Empty action received, waiting for next turn.", _parse_error="empty")
             
         # 1. Clean trailing punctuation
         for punct in ["。", ".", "!", "！"]:
@@ -303,16 +344,18 @@ def parse_action(response: str) -> Dict[str, Any]:
         if response.startswith("do"):
             try:
                 action = eval(response, {"do": do, "finish": finish})
-            except (SyntaxError, NameError):
+            except (SyntaxError, NameError, TypeError):
                 # Fallback: if eval fails but it looks like do(...), try a safe Wait
-                return do(action="Wait", duration="1 seconds", message=f"Malformed do action: {response}")
+                return do(action="Wait", duration="1 seconds", message=f"Malformed do action: {response}", _parse_error="malformed")
+            except ValueError as e:
+                return do(action="Wait", duration="1 seconds", message=f"Invalid action: {e}", _parse_error="invalid")
                 
         # 4. Handle 'finish' actions
         elif response.startswith("finish"):
             if "message=" in response or (response.count('"') >= 2 or response.count("'") >= 2):
                 try:
                     action = eval(response, {"do": do, "finish": finish})
-                except (SyntaxError, NameError):
+                except (SyntaxError, NameError, TypeError):
                     action = finish(message=response.replace("finish(", "").rstrip(")"))
             else:
                 msg = response.replace("finish(", "").strip()
@@ -321,21 +364,12 @@ def parse_action(response: str) -> Dict[str, Any]:
                 action = finish(message=msg.strip("'\""))
         else:
             # Final fallback: return a Wait action with the raw content as a note
-            return do(action="Wait", duration="2 seconds", message=f"Unrecognized format: {response}")
-            
+            return do(action="Wait", duration="2 seconds", message=f"Unrecognized format: {response}", _parse_error="unrecognized")
+
+        if not isinstance(action, Action):
+            return do(action="Wait", duration="2 seconds", message=f"Unrecognized format: {response}", _parse_error="unrecognized")
         return action
     except Exception as e:
         # Instead of raising, return a Wait so the loop continues
-        return do(action="Wait", duration="2 seconds", message=f"Parse error: {str(e)}")
-
-
-def do(**kwargs) -> Dict[str, Any]:
-    """Helper function for creating 'do' actions."""
-    kwargs["_metadata"] = "do"
-    return kwargs
-
+        return do(action="Wait", duration="2 seconds", message=f"Parse error: {str(e)}", _parse_error="exception")
 
-def finish(**kwargs) -> Dict[str, Any]:
-    """Helper function for creating 'finish' actions."""
-    kwargs["_metadata"] = "finish"
-    return kwargs
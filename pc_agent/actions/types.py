@@ -0,0 +1,262 @@
+"""Typed actions parsed from model output."""
+
+import ast
+from typing import Any, ClassVar, Dict, Optional, Tuple, Type
+
+Point = Tuple[int, int]  # 0-1000 relative coordinates
+
+
+def to_point(value: Any) -> Optional[Point]:
+    """
+    Normalise model coordinates to an (x, y) tuple of ints.
+
+    Args:
+        value: A list/tuple of numbers, or its string form like "[495, 109]".
+
+    Returns:
+        The point, or None if no coordinates were given.
+
+    Raises:
+        ValueError: If the coordinates are malformed.
+    """
+    if value is None or value == "" or value == [] or value == ():
+        return None
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except Exception:
+            try:
+                value = [float(i.strip()) for i in value.strip("[]() ").split(",")]
+            except ValueError:
+                raise ValueError(f"Invalid coordinate format: {value}")
+    if not isinstance(value, (list, tuple)) or len(value) < 2:
+        raise ValueError(f"Coordinates must be a list/tuple of at least 2 numbers, got: {value}")
+    return int(float(value[0])), int(float(value[1]))
+
+
+def _duration(value: Any) -> float:
+    """Parse a Wait duration such as "2 seconds"; unparseable values wait 1 second."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace("seconds", "").strip())
+    except ValueError:
+        return 1.0
+
+
+class Action:
+    """
+    Base class of parsed actions.
+
+    Subclasses declare their parameters in ``__slots__``; values are
+    validated and normalised once, when the action is created.
+
+    Args:
+        message: Optional message attached by the model (a confirmation
+            prompt for sensitive taps, a note, or a finish message).
+        parse_error: Set on the Wait produced for unparseable output.
+    """
+
+    __slots__ = ("message", "parse_error")
+    name: ClassVar[str] = ""
+    kind: ClassVar[str] = "do"  # "do" or "finish"
+    fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.fields + tuple(cls.__dict__.get("__slots__", ()))
+
+    def __init__(self, message: Optional[str] = None, parse_error: Optional[str] = None):
+        self.message = message
+        self.parse_error = parse_error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialise compactly: parameters that are unset are left out.
+
+        Returns:
+            A JSON-compatible dict in the ``do(...)``/``finish(...)`` layout.
+        """
+        data: Dict[str, Any] = {"action": self.name} if self.kind == "do" else {}
+        for name in self.fields:
+            value = getattr(self, name)
+            if value is not None and value is not False:
+                data[name] = list(value) if isinstance(value, tuple) else value
+        if self.message is not None:
+            data["message"] = self.message
+        if self.parse_error is not None:
+            data["_parse_error"] = self.parse_error
+        data["_metadata"] = self.kind
+        return data
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "Action":
+        """Build the action from keyword parameters, ignoring unknown ones."""
+        known = {name: params[name] for name in cls.fields if name in params}
+        return cls(message=params.get("message"), parse_error=params.get("_parse_error"), **known)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.fields + Action.__slots__)
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items() if k != "_metadata")
+        return f"{type(self).__name__}({params})"
+
+
+class Launch(Action):
+    __slots__ = ("app",)
+    name = "Launch"
+
+    def __init__(self, app: Optional[str] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.app = app
+
+
+class Tap(Action):
+    __slots__ = ("element",)
+    name = "Tap"
+
+    def __init__(self, element: Any = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.element = to_point(element)
+
+
+class DoubleTap(Tap):
+    __slots__ = ()
+    name = "Double Tap"
+
+
+class LongPress(Tap):
+    __slots__ = ()
+    name = "Long Press"
+
+
+class TypeText(Action):
+    __slots__ = ("text", "submit")
+    name = "Type"
+
+    def __init__(self, text: Any = "", submit: bool = False, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.text = "" if text is None else str(text)
+        self.submit = bool(submit)  # press Enter after typing
+
+
+class TypeName(TypeText):
+    __slots__ = ()
+    name = "Type_Name"
+
+
+class Swipe(Action):
+    __slots__ = ("start", "end")
+    name = "Swipe"
+
+    def __init__(self, start: Any = None, end: Any = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.start = to_point(start)
+        self.end = to_point(end)
+
+
+class Back(Action):
+    __slots__ = ()
+    name = "Back"
+
+
+class Home(Action):
+    __slots__ = ()
+    name = "Home"
+
+
+class Wait(Action):
+    __slots__ = ("duration",)
+    name = "Wait"
+
+    def __init__(self, duration: Any = 1.0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.duration = _duration(duration)
+
+
+class TakeOver(Action):
+    __slots__ = ()
+    name = "Take_over"
+
+
+class Note(Action):
+    __slots__ = ()
+    name = "Note"
+
+
+class CallApi(Action):
+    __slots__ = ("instruction",)
+    name = "Call_API"
+
+    def __init__(self, instruction: Optional[str] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.instruction = instruction
+
+
+class Interact(Action):
+    __slots__ = ()
+    name = "Interact"
+
+
+class Finish(Action):
+    __slots__ = ()
+    kind = "finish"
+
+
+class UnknownAction(Action):
+    """A ``do(...)`` whose action name is not supported; executing it fails."""
+
+    __slots__ = ("action", "params")
+
+    def __init__(self, action: Optional[str] = None, params: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.action = action
+        self.params = params or {}
+
+    @property
+    def name(self) -> str:  # type: ignore[override]
+        return str(self.action)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"action": self.action, **self.params, "_metadata": "do"}
+
+
+# Action classes by the name the model uses
+ACTION_TYPES: Dict[str, Type[Action]] = {
+    cls.name: cls
+    for cls in (Launch, Tap, DoubleTap, LongPress, TypeText, TypeName, Swipe, Back, Home,
+                Wait, TakeOver, Note, CallApi, Interact)
+}
+
+
+def do(**kwargs: Any) -> Action:
+    """Create a ``do`` action; this is what ``do(...)`` in model output evaluates to."""
+    name = kwargs.pop("action", None)
+    cls = ACTION_TYPES.get(name)
+    if cls is None:
+        return UnknownAction(name, kwargs)
+    return cls.from_params(kwargs)
+
+
+def finish(**kwargs: Any) -> Action:
+    """Create a ``finish`` action; this is what ``finish(...)`` in model output evaluates to."""
+    return Finish.from_params(kwargs)
+
+
+def action_from_dict(data: Dict[str, Any]) -> Action:
+    """
+    Rebuild an action from its ``to_dict`` form, e.g. from a recording.
+
+    Args:
+        data: Serialised action.
+
+    Returns:
+        The action.
+    """
+    params = {k: v for k, v in data.items() if k != "_metadata"}
+    if data.get("_metadata") == "finish":
+        return finish(**params)
+    return do(**params)
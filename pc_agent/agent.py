@@ -1,43 +1,232 @@
 """PC Agent implementation for orchestrating the AI automation loop."""
 
 import time
+import contextvars
 import logging
-from dataclasses import dataclass
-from typing import Any, List, Optional
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
-from pc_agent.model.client import ModelClient, MessageBuilder, ModelConfig
-from pc_agent.actions.handler import ActionHandler, ActionResult
-from pc_agent.pc import get_screenshot, get_current_app
-from pc_agent.config import get_system_prompt, get_message
+from pc_agent.model.client import ModelClient, MessageBuilder, ModelConfig, ModelResponse
+from pc_agent.model.usage import TaskUsage
+from pc_agent.checkpoint import SAME_SCREEN_DISTANCE, Checkpoint, remove_checkpoint, save_checkpoint
+from pc_agent.actions.handler import ActionHandler, ActionResult, parse_action
+from pc_agent.actions.types import CallApi, Finish, Note, Tap
+from pc_agent.loop_detector import LoopDetector, LoopVerdict, action_signature, alternative_action
+from pc_agent.pc import Backend, LocalBackend, format_ui_tree, hash_distance
+from pc_agent.pc.screenshot import Screenshot, downscale, image_part, screenshot_dhash
+from pc_agent.plan_cache import CachedPlan, PlanCache, PlanStep
+from pc_agent.config import get_system_prompt
+from pc_agent.events import (
+    ActionExecuted,
+    ActionParsed,
+    ConsoleObserver,
+    Event,
+    EventBus,
+    ModelRequested,
+    ModelThought,
+    ModelToken,
+    Notice,
+    ObservationReady,
+    StepStarted,
+    TaskFinished,
+    TaskStarted,
+)
+from pc_agent.scratchpad import Scratchpad
+from pc_agent.thumbnails import ThumbnailHistory
+from pc_agent.tracing import NULL_TRACER, Tracer, use_tracer
+from pc_agent.watchdog import DEFAULT_PHASE_DEADLINES, PhaseTimeout, call_with_deadline
+from pc_agent.trajectory import TrajectoryRecorder
+from pc_agent import metrics
+
+if TYPE_CHECKING:
+    from pc_agent.pc.snapping import TapSnapper
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Actions whose output is data read off the screen; cached copies may be stale
+_VALUE_ACTIONS = (Finish, Note, CallApi)
+
 @dataclass
 class AgentConfig:
     """Configuration for the PC Agent."""
     max_steps: int = 50
-    verbose: bool = True
+    verbose: bool = True  # print progress to the console (a ConsoleObserver on the event bus)
     lang: str = "cn"  # 'cn' or 'en'
     confirm_sensitive: bool = True
+    timeout: Optional[float] = None  # wall-clock seconds per task, checked between steps
+    trace: bool = False  # record per-step spans and print a summary table
+    trace_path: Optional[str] = None  # export spans as Chrome trace-event JSON (implies trace)
+    token_budget: Optional[int] = None  # max prompt + completion tokens per task
+    image_bytes_budget: Optional[int] = None  # max encoded screenshot bytes sent per task
+    record_path: Optional[str] = None  # directory to record the trajectory of each run into
+    plan_cache_path: Optional[str] = None  # JSON file of successful action sequences to replay
+    plan_cache_distance: int = 6  # max dhash bit difference for a cached step to apply
+    checkpoint_path: Optional[str] = None  # rewrite a resumable checkpoint here before every step
+    history_thumbnails: int = 0  # past screens shown to the model as thumbnails (0 disables)
+    thumbnail_max_side: int = 256  # longest side of a thumbnail in pixels
+    thumbnail_bytes_budget: int = 64 * 1024  # max total encoded size of the thumbnails per request
+    thumbnail_token_budget: int = 600  # max total estimated vision tokens of the thumbnails per request
+    loop_detection: bool = True  # detect repeated no-effect actions and action cycles
+    # Recovery applied on each consecutive loop detection; the last one repeats
+    loop_recovery: Tuple[str, ...] = ("hint", "alternative", "escalate", "abort")
+    escalation_model: Optional[str] = None  # stronger model on the same endpoint for the "escalate" recovery
+    snap_taps: bool = False  # move taps that just miss a UI element onto it (needs NumPy)
+    snap_tolerance: int = 24  # max logical pixels a tap is moved
+    ui_tree: bool = False  # add the focused window's accessibility tree to each observation
+    ui_tree_max_chars: int = 3000  # size cap of the tree text
+    ui_tree_rich_elements: int = 12  # trees listing at least this many elements count as rich
+    ui_tree_image_scale: float = 1.0  # screenshot scale sent alongside a rich tree (1 keeps full size)
+    scratchpad_chars: int = 2000  # max characters of Note/Call_API text kept per task
+    settle_time: float = 1.0  # seconds the UI is given to update after an action
+    speculative: bool = False  # request the next step on an early frame while the UI settles (streaming clients only)
+    speculative_delay: float = 0.3  # seconds after an action before the early frame is captured
+    speculative_distance: int = 4  # max dhash bit difference for the settled frame to reuse the early request
+    # Seconds each blocking phase may take before it is abandoned (see pc_agent.watchdog); {} disables
+    phase_deadlines: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_PHASE_DEADLINES))
+    phase_retries: int = 1  # retries of a capture or model request that missed its deadline
+
+
+@dataclass
+class TaskResult:
+    """Outcome of a single task run."""
+    success: bool
+    message: Optional[str] = None
+    steps: int = 0
+    duration: float = 0.0
+    usage: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds spent per phase
+    stop_reason: str = "finished"  # finished, max_steps, timeout, budget, loop, phase_timeout or error
+    cost: float = 0.0
+
+@dataclass
+class _Speculation:
+    """A next-step request sent on an early post-action frame."""
+    future: Future
+    cancel: threading.Event
+    messages: List[dict]  # exactly what was sent; the last one carries the early frame
+    fingerprint: int
+    image_bytes: int  # charged to the task only if the request is used
+
+    def discard(self) -> None:
+        """Abandon the request; a streamed one is closed at its next chunk."""
+        self.cancel.set()
+
+
+def _text_parts(message: dict) -> List[str]:
+    """The text content of a message, ignoring images."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return [content]
+    return [part.get("text", "") for part in content or [] if part.get("type") == "text"]
+
 
 class PcAgent:
     """
     Agent for controlling PC applications.
     
     Orchestrates the loop: Perception -> Planning -> Action.
+
+    Progress is reported as typed events (see ``pc_agent.events``) on
+    ``self.events``: register observers with ``events.subscribe``, or
+    consume a run with ``stream``/``astream``. With ``verbose`` the console
+    is one such observer.
+
+    Args:
+        model_config: Model configuration, used when no client is given.
+        agent_config: Agent configuration.
+        model_client: Optional pre-built (warm) model client to share.
+        confirmation_callback: Optional callback for sensitive action confirmation.
+        takeover_callback: Optional callback for takeover requests.
+        step_callback: Optional callback invoked after every executed step
+            with (step, model response, action result); observers of
+            ActionExecuted events are the more general replacement.
+        backend: Desktop backend to observe and drive, defaults to the local screen.
+        tracer: Optional tracer; by default one is created when tracing is
+            enabled in the agent config.
     """
     
     def __init__(
         self, 
         model_config: Optional[ModelConfig] = None,
-        agent_config: Optional[AgentConfig] = None
+        agent_config: Optional[AgentConfig] = None,
+        model_client: Optional[ModelClient] = None,
+        confirmation_callback: Optional[Callable[[str], bool]] = None,
+        takeover_callback: Optional[Callable[[str], None]] = None,
+        step_callback: Optional[Callable[[int, ModelResponse, ActionResult], None]] = None,
+        backend: Optional[Backend] = None,
+        tracer: Optional[Tracer] = None,
     ):
         self.agent_config = agent_config or AgentConfig()
-        self.model_client = ModelClient(model_config)
-        self.action_handler = ActionHandler()
+        self.model_client = model_client or ModelClient(model_config)
+        self.backend = backend or LocalBackend()
+        self.scratchpad = Scratchpad(max_chars=self.agent_config.scratchpad_chars)
+        self.action_handler = ActionHandler(
+            confirmation_callback=confirmation_callback,
+            takeover_callback=takeover_callback,
+            backend=self.backend,
+            scratchpad=self.scratchpad,
+            summarize_callback=self._summarize,
+        )
+        self.step_callback = step_callback
+        self.events = EventBus()
+        if self.agent_config.verbose:
+            self.events.subscribe(ConsoleObserver(self.agent_config.lang))
+        if tracer is None:
+            traced = self.agent_config.trace or self.agent_config.trace_path
+            tracer = Tracer() if traced else NULL_TRACER
+        self.tracer = tracer
         self.messages: List[dict] = []
+        self._task_start = 0.0
+        self._last_app = "Desktop"
+        self._abandoned_action: Optional[threading.Event] = None  # set once a timed-out action returns
+        self._usage = TaskUsage()
+        self._timings: Dict[str, float] = {}
+        self._recorder: Optional[TrajectoryRecorder] = None
+        self.plan_cache: Optional[PlanCache] = None
+        if self.agent_config.plan_cache_path:
+            self.plan_cache = PlanCache(self.agent_config.plan_cache_path, self.agent_config.plan_cache_distance)
+        self._task_description = ""
+        self._plan: Optional[CachedPlan] = None
+        self._plan_steps: List[PlanStep] = []
+        self._replayed_steps = 0
+        self._resumed = False
+        self._resume_fingerprint: Optional[int] = None
+        self.thumbnails: Optional[ThumbnailHistory] = None
+        if self.agent_config.history_thumbnails > 0:
+            self.thumbnails = ThumbnailHistory(
+                max_frames=self.agent_config.history_thumbnails,
+                max_side=self.agent_config.thumbnail_max_side,
+                max_bytes=self.agent_config.thumbnail_bytes_budget,
+                max_tokens=self.agent_config.thumbnail_token_budget,
+            )
+        self.loop_detector = LoopDetector() if self.agent_config.loop_detection else None
+        self._escalation_client: Optional[ModelClient] = None
+        self._loop_level = 0
+        self._alternative_for: Optional[str] = None
+        self._escalate = False
+        self._speculation: Optional[_Speculation] = None
+        self._speculator: Optional[ThreadPoolExecutor] = None
+        # A blocking request cannot be cancelled, so every miss would double the in-flight load
+        self._speculative = self.agent_config.speculative and self.model_client.config.stream
+        if self.agent_config.speculative and not self._speculative:
+            logger.warning("Speculative requests need streaming (--stream) to cancel misses, continuing without them")
+        self.snapper: Optional["TapSnapper"] = None
+        if self.agent_config.snap_taps:
+            from pc_agent.pc import snapping  # loads NumPy
+
+            if snapping.snapping_available():
+                self.snapper = snapping.TapSnapper(tolerance=self.agent_config.snap_tolerance)
+            else:
+                snapping.log_missing_numpy()
+        self._setup_initial_context()
+
+    def reset(self):
+        """Clear the conversation so the agent can run another task."""
+        self.messages = []
         self._setup_initial_context()
 
     def _setup_initial_context(self):
@@ -45,81 +234,776 @@ class PcAgent:
         system_prompt = get_system_prompt(self.agent_config.lang)
         self.messages.append(MessageBuilder.create_system_message(system_prompt))
 
-    def run(self, task_description: str):
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        """Trace a phase of the loop and accumulate its wall time."""
+        start = time.perf_counter()
+        try:
+            with self.tracer.span(name):
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._timings[name] = self._timings.get(name, 0.0) + elapsed
+            metrics.STEP_PHASE_SECONDS.observe(elapsed, phase=name)
+
+    @staticmethod
+    def _record_model_metrics(response: ModelResponse) -> None:
+        """Export latency and token counts for one model response."""
+        metrics.MODEL_REQUEST_SECONDS.observe(response.model_time)
+        metrics.MODEL_QUEUE_SECONDS.observe(response.queue_wait)
+        if response.ttft is not None:
+            metrics.MODEL_TTFT_SECONDS.observe(response.ttft)
+        metrics.TOKENS.inc(response.usage.get("prompt_tokens", 0), direction="in")
+        metrics.TOKENS.inc(response.usage.get("completion_tokens", 0), direction="out")
+
+    def _task_result(
+        self, success: bool, message: Optional[str], steps: int, stop_reason: str = "finished"
+    ) -> TaskResult:
+        """Build the TaskResult for the current task, including usage and timings."""
+        self._discard_speculation()
+        if self._speculator is not None:
+            self._speculator.shutdown(wait=False, cancel_futures=True)
+            self._speculator = None
+        outcome = stop_reason if stop_reason != "finished" else ("success" if success else "failed")
+        metrics.TASKS.inc(outcome=outcome)
+        # Only a task that ran to completion drops its checkpoint; errors, hung
+        # phases and budget stops stay resumable.
+        if stop_reason in ("finished", "max_steps") and self.agent_config.checkpoint_path:
+            remove_checkpoint(self.agent_config.checkpoint_path)
+        if self.plan_cache is not None and success and self._plan_steps and not self._resumed:
+            self.plan_cache.store(self._task_description, self._plan_steps, replayed=self._replayed_steps)
+        cost = self._usage.cost(
+            self.model_client.config.input_cost_per_mtok,
+            self.model_client.config.output_cost_per_mtok,
+        )
+        return TaskResult(
+            success=success,
+            message=message,
+            steps=steps,
+            duration=time.perf_counter() - self._task_start,
+            usage=self._usage.as_dict(),
+            timings=dict(self._timings),
+            stop_reason=stop_reason,
+            cost=cost,
+        )
+
+    def _budget_exceeded(self, next_image_bytes: int = 0) -> Optional[Tuple[str, str]]:
+        """
+        Check the per-task wall-clock, token and image budgets.
+
+        Args:
+            next_image_bytes: Size of the screenshot about to be sent.
+
+        Returns:
+            (stop_reason, message) for the first exceeded budget, or None.
+        """
+        config = self.agent_config
+        if config.timeout is not None and time.perf_counter() - self._task_start > config.timeout:
+            return "timeout", f"Timed out after {config.timeout}s"
+        if config.token_budget is not None and self._usage.total_tokens >= config.token_budget:
+            return "budget", f"Token budget exceeded: used {self._usage.total_tokens} of {config.token_budget} tokens"
+        if (
+            config.image_bytes_budget is not None
+            and self._usage.image_bytes + next_image_bytes > config.image_bytes_budget
+        ):
+            return "budget", (
+                f"Image budget exceeded: sending {next_image_bytes} more bytes would exceed "
+                f"{config.image_bytes_budget} (already sent {self._usage.image_bytes})"
+            )
+        return None
+
+    def _cached_step(self, step: int, fingerprint: Optional[int]) -> Optional[PlanStep]:
+        """
+        Get the cached step to replay instead of asking the model.
+
+        Once the screen diverges from the cached plan, the plan is dropped
+        and the model drives the rest of the task. Steps whose output is a
+        value read off the screen (finish, Note, Call_API) are never
+        replayed: the data may have changed within the fingerprint's
+        tolerance, so the model takes over from there.
+
+        Args:
+            step: Step number.
+            fingerprint: dhash of the current screenshot.
+
+        Returns:
+            The cached step, or None to ask the model.
+        """
+        if self._plan is None or fingerprint is None:
+            return None
+        if self.plan_cache.matches(self._plan, step - 1, fingerprint):
+            if isinstance(parse_action(self._plan.steps[step - 1].action), _VALUE_ACTIONS):
+                logger.info(f"Cached step {step} produces a value, asking the model")
+                metrics.PLAN_CACHE_STEPS.inc(outcome="value")
+                self._plan = None
+                return None
+            self._replayed_steps += 1
+            metrics.PLAN_CACHE_STEPS.inc(outcome="hit")
+            return self._plan.steps[step - 1]
+        logger.info(f"Screen diverged from the cached plan at step {step}, asking the model")
+        metrics.PLAN_CACHE_STEPS.inc(outcome="miss")
+        self._plan = None
+        return None
+
+    def _save_checkpoint(self, step: int, fingerprint: Optional[int], current_app: str) -> None:
+        """Write the state needed to rerun this step after a crash."""
+        save_checkpoint(self.agent_config.checkpoint_path, Checkpoint(
+            task=self._task_description,
+            step=step,
+            messages=self.messages,
+            usage=self._usage.as_dict(),
+            timings=self._timings,
+            elapsed=time.perf_counter() - self._task_start,
+            fingerprint=fingerprint,
+            current_app=current_app,
+            lang=self.agent_config.lang,
+            notes=[asdict(entry) for entry in self.scratchpad.entries()],
+        ))
+
+    def _summarize(self, instruction: str, notes: str) -> str:
+        """
+        Answer a Call_API instruction from the recorded notes with a text-only request.
+
+        Args:
+            instruction: What the model asked for.
+            notes: The scratchpad contents.
+
+        Returns:
+            The model's answer, without its reasoning.
+        """
+        messages = [
+            MessageBuilder.create_system_message(
+                "你是一个文本助手。只根据给出的记录内容完成指令，直接输出结果，不要输出任何操作指令。"
+            ),
+            MessageBuilder.create_user_message(f"记录内容:\n{notes}\n\n指令: {instruction}"),
+        ]
+        with self._phase("summarize"):
+            response = self._guarded("model", self.model_client.request, messages, cancellable=True)
+        self._usage.add_response(response.usage, estimated=response.usage_estimated)
+        self._record_model_metrics(response)
+        answer = response.raw_content.split("</think>")[-1]
+        return answer.replace("<answer>", "").replace("</answer>", "").strip()
+
+    def _check_resumed_screen(self, fingerprint: Optional[int]) -> None:
+        """On the first resumed step, warn the model if the screen changed during the outage."""
+        saved, self._resume_fingerprint = self._resume_fingerprint, None
+        if fingerprint is not None and hash_distance(saved, fingerprint) <= SAME_SCREEN_DISTANCE:
+            return
+        self.events.emit(Notice("screen_changed", "Screen changed since the checkpoint"))
+        self.messages.append(MessageBuilder.create_user_message(
+            "注意: 任务在中断后恢复，屏幕可能已与中断前不同，请先确认当前状态再继续。"
+        ))
+
+    def _recover_from_loop(self, verdict: Optional[LoopVerdict], step: int) -> Optional[TaskResult]:
+        """
+        Apply the next recovery strategy for a detected loop.
+
+        Every detection moves one strategy further along ``loop_recovery``;
+        once an action changes the screen again, recovery starts over.
+
+        Args:
+            verdict: The detector's verdict for this step.
+            step: Step number.
+
+        Returns:
+            The TaskResult if the task was aborted, otherwise None.
+        """
+        if verdict is None:
+            if self.loop_detector.unchanged_steps == 0:
+                self._loop_level = 0
+            return None
+        strategies = [
+            strategy for strategy in self.agent_config.loop_recovery
+            if strategy != "escalate" or self.agent_config.escalation_model
+        ] or ["hint"]
+        strategy = strategies[min(self._loop_level, len(strategies) - 1)]
+        self._loop_level += 1
+        metrics.LOOP_RECOVERIES.inc(kind=verdict.kind, strategy=strategy)
+        self.events.emit(Notice("loop", f"{verdict.describe()} ({strategy})", step))
+
+        if strategy == "abort":
+            return self._task_result(False, f"Stopped in a loop: {verdict.describe()}", step - 1, "loop")
+
+        # A cached plan that loops is no longer trusted
+        self._plan = None
+        if strategy == "alternative" and verdict.kind == "stall":
+            self._alternative_for = verdict.actions[0]
+        elif strategy == "escalate":
+            self._escalate = True
+        if verdict.kind == "stall":
+            hint = (f"注意: 上一个动作已连续执行 {verdict.repeats} 次，屏幕没有任何变化。"
+                    "不要再重复它，请换一种操作方式（例如点击其他位置、先返回或使用其他入口）。")
+        else:
+            hint = (f"注意: 最近的 {verdict.period} 个动作在几个画面之间来回循环，任务没有进展。"
+                    "请重新审视当前屏幕，换一条路径完成任务。")
+        self.messages.append(MessageBuilder.create_user_message(hint))
+        return None
+
+    def _model_for_step(self, step: int) -> ModelClient:
+        """The client for this step: the escalation model once after an "escalate" recovery."""
+        if not self._escalate:
+            self.events.emit(ModelRequested(step, self.model_client.config.model_name))
+            return self.model_client
+        self._escalate = False
+        if self._escalation_client is None:
+            # Same agent, scheduler and limiter: escalated requests stay under the shared caps
+            self._escalation_client = self.model_client.derive(
+                self.model_client.agent_id, model_name=self.agent_config.escalation_model
+            )
+        self.events.emit(ModelRequested(step, self.agent_config.escalation_model, escalated=True))
+        return self._escalation_client
+
+    def run(self, task_description: str, resume: Optional[Checkpoint] = None) -> TaskResult:
         """
         Run the agent to complete a specific task.
         
         Args:
             task_description: Natural language description of the task.
+            resume: Optional checkpoint to continue from instead of step 1.
+
+        Returns:
+            TaskResult describing how the task ended.
         """
-        print(f"\n🚀 {get_message('starting_task', self.agent_config.lang)}: {task_description}")
-        
-        # Add initial user task
-        self.messages.append(MessageBuilder.create_user_message(f"任务目标: {task_description}"))
-        
-        for step in range(1, self.agent_config.max_steps + 1):
-            print(f"\n--- {get_message('step', self.agent_config.lang)} {step} ---")
-            
+        self.tracer.clear()
+        if self.agent_config.record_path:
+            self._recorder = TrajectoryRecorder(self.agent_config.record_path)
+            self._recorder.start(
+                task_description,
+                model=self.model_client.config.model_name,
+                lang=self.agent_config.lang,
+            )
+        try:
+            with use_tracer(self.tracer):
+                result = self._run_task(task_description, resume)
+            if self._recorder:
+                self._recorder.finish(result)
+        finally:
+            if self._recorder:
+                self._recorder.close()
+                self._recorder = None
+
+        if self.tracer.enabled:
+            self.events.emit(Notice("trace", f"Trace summary\n{self.tracer.format_summary()}"))
+            if self.agent_config.trace_path:
+                self.tracer.export_chrome_trace(self.agent_config.trace_path)
+        self.events.emit(TaskFinished(
+            result.success, result.message, result.steps, result.stop_reason,
+            result.duration, dict(result.usage), result.cost,
+        ))
+        return result
+
+    def stream(self, task_description: str, resume: Optional[Checkpoint] = None) -> Iterator[Event]:
+        """
+        Run a task on a worker thread and yield its events as they happen.
+
+        Args:
+            task_description: Natural language description of the task.
+            resume: Optional checkpoint to continue from.
+
+        Yields:
+            The run's events; the last one is TaskFinished.
+
+        Raises:
+            Exception: Whatever ``run`` raised, after the events before it.
+        """
+        events: "queue.SimpleQueue[Optional[Event]]" = queue.SimpleQueue()
+        failure: List[BaseException] = []
+
+        def work() -> None:
             try:
-                # 1. Perception: Capture state
-                screenshot = get_screenshot()
-                current_app = get_current_app()
-                
-                # Build context info
-                screen_info = MessageBuilder.build_screen_info(
-                    current_app=current_app,
-                    width=screenshot.logical_width,
-                    height=screenshot.logical_height
-                )
-                
-                # 2. Planning: Get model response
-                # We always send the latest state (screenshot + text info)
-                user_msg = MessageBuilder.create_user_message(
-                    text=f"当前状态: {screen_info}",
-                    image_base64=screenshot.base64_data
-                )
-                
-                # Temp message list for this request (don't keep screenshots in history to save tokens)
-                request_messages = self.messages + [user_msg]
-                
-                print(f"🤔 {get_message('thinking', self.agent_config.lang)}...")
-                response = self.model_client.request(request_messages)
-                
-                if response.thinking:
-                    print(f"💡 {response.thinking}")
-                
-                print(f"🎬 {get_message('action', self.agent_config.lang)}: {response.action}")
-                
-                # Add model's thought and choice to history (without images)
-                self.messages.append(MessageBuilder.create_assistant_message(response.raw_content))
-                
-                # 3. Execution: Run the action
-                import pc_agent.actions.handler as handler
-                action_dict = handler.parse_action(response.action)
-                
-                result = self.action_handler.execute(
-                    action_dict, 
-                    screenshot.logical_width, 
-                    screenshot.logical_height
-                )
-                
-                if not result.success:
-                    print(f"❌ {result.message}")
-                    # Optionally add failure info to history to help model recover
-                    self.messages.append(MessageBuilder.create_user_message(f"Action failed: {result.message}"))
-                
-                if result.should_finish:
-                    print(f"\n✅ {get_message('task_completed', self.agent_config.lang)}")
-                    if result.message:
-                        print(f"🏁 {get_message('final_result', self.agent_config.lang)}: {result.message}")
-                    break
-                    
-                # Short wait for UI update
-                time.sleep(1.0)
-                
+                self.run(task_description, resume)
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                events.put(None)
+
+        unsubscribe = self.events.subscribe(events.put)
+        try:
+            threading.Thread(target=work, name="pc-agent-run", daemon=True).start()
+            while (event := events.get()) is not None:
+                yield event
+        finally:
+            unsubscribe()
+        if failure:
+            raise failure[0]
+
+    async def astream(self, task_description: str, resume: Optional[Checkpoint] = None) -> AsyncIterator[Event]:
+        """
+        Async version of ``stream``: the task runs in the loop's default executor.
+
+        Args:
+            task_description: Natural language description of the task.
+            resume: Optional checkpoint to continue from.
+
+        Yields:
+            The run's events; the last one is TaskFinished.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+        unsubscribe = self.events.subscribe(lambda event: loop.call_soon_threadsafe(events.put_nowait, event))
+        try:
+            run = loop.run_in_executor(None, self.run, task_description, resume)
+            run.add_done_callback(lambda _: events.put_nowait(None))
+            while (event := await events.get()) is not None:
+                yield event
+            await run
+        finally:
+            unsubscribe()
+
+    def _run_task(self, task_description: str, resume: Optional[Checkpoint] = None) -> TaskResult:
+        """Run the perception-planning-action loop for one task."""
+        self._discard_speculation()
+        if self._abandoned_action is not None:
+            if not self._abandoned_action.is_set():
+                logger.warning("Waiting for the previous task's timed-out action to finish")
+                self._abandoned_action.wait()
+            self._abandoned_action = None
+        self._task_start = time.perf_counter()
+        self._usage = TaskUsage()
+        self._timings = {}
+        self._task_description = task_description
+        self._plan_steps = []
+        self._replayed_steps = 0
+        self._resumed = resume is not None
+        self._resume_fingerprint = None
+        self.scratchpad.clear()
+        if self.thumbnails is not None:
+            self.thumbnails.clear()
+        if self.loop_detector is not None:
+            self.loop_detector.reset()
+        self._loop_level = 0
+        self._alternative_for = None
+        self._escalate = False
+        first_step = 1
+
+        if resume:
+            # Cached plans are indexed from step 1, so they only apply to fresh runs
+            self._plan = None
+            self.messages = list(resume.messages)
+            self._usage = TaskUsage.from_dict(resume.usage)
+            self._timings = dict(resume.timings)
+            self._task_start -= resume.elapsed
+            self._resume_fingerprint = resume.fingerprint
+            for note in resume.notes:
+                self.scratchpad.add(note["text"], note["kind"])
+            first_step = resume.step
+        else:
+            self._plan = self.plan_cache.lookup(task_description) if self.plan_cache is not None else None
+
+            # Add initial user task
+            self.messages.append(MessageBuilder.create_user_message(f"任务目标: {task_description}"))
+        self.events.emit(TaskStarted(
+            task_description,
+            resumed_from=first_step if resume else None,
+            cached_plan_steps=len(self._plan.steps) if self._plan else 0,
+        ))
+
+        for step in range(first_step, self.agent_config.max_steps + 1):
+            exceeded = self._budget_exceeded()
+            if exceeded:
+                self.events.emit(Notice("budget", exceeded[1], step))
+                return self._task_result(False, exceeded[1], step - 1, exceeded[0])
+
+            self.events.emit(StepStarted(step))
+
+            try:
+                with self.tracer.span("step", step=step):
+                    result = self._step(step)
+                if result is not None:
+                    return result
+            except PhaseTimeout as e:
+                if e.phase == "action":
+                    # The abandoned input may still be running; the next task waits for it
+                    self._abandoned_action = e.done
+                logger.error(f"Step {step} stopped: {e}")
+                self.events.emit(Notice("error", f"Error: {e}", step))
+                return self._task_result(False, str(e), step, "phase_timeout")
             except Exception as e:
                 logger.error(f"Error during step {step}: {e}")
-                print(f"⚠️ {get_message('error', self.agent_config.lang) if 'error' in self.agent_config.lang else 'Error'}: {e}")
-                break
+                self.events.emit(Notice("error", f"Error: {e}", step))
+                return self._task_result(False, str(e), step, "error")
+
+        return self._task_result(
+            False, f"Reached max steps ({self.agent_config.max_steps})", self.agent_config.max_steps, "max_steps"
+        )
+
+    def _account_response(self, response: ModelResponse) -> None:
+        """Add a step's model response to the task's timings, usage and metrics."""
+        self._timings["model_queue"] = self._timings.get("model_queue", 0.0) + response.queue_wait
+        self._timings["model"] = self._timings.get("model", 0.0) + response.model_time
+        if response.ttft is not None:
+            self._timings["model_ttft"] = self._timings.get("model_ttft", 0.0) + response.ttft
+        self._usage.add_response(response.usage, estimated=response.usage_estimated)
+        self._record_model_metrics(response)
+
+    def _guarded(
+        self, phase: str, fn: Callable[..., Any], *args: Any, retries: int = 0, cancellable: bool = False, **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking call under its phase deadline, retrying after a timeout.
+
+        Args:
+            phase: Phase name, looked up in ``phase_deadlines``.
+            fn: The call.
+            *args: Positional arguments for ``fn``.
+            retries: Further attempts after a missed deadline.
+            cancellable: Pass ``fn`` a fresh ``cancel`` event per attempt and
+                set it when the attempt is abandoned (model requests).
+            **kwargs: Keyword arguments for ``fn``.
+
+        Returns:
+            What ``fn`` returned.
+
+        Raises:
+            PhaseTimeout: If the last attempt missed its deadline too.
+        """
+        deadline = self.agent_config.phase_deadlines.get(phase)
+        for attempt in range(retries + 1):
+            cancel = threading.Event() if cancellable else None
+            extra = {"cancel": cancel} if cancellable else {}
+            try:
+                return call_with_deadline(phase, deadline, fn, *args, **kwargs, **extra)
+            except PhaseTimeout as e:
+                if cancel is not None:
+                    cancel.set()
+                retrying = attempt < retries
+                logger.warning(f"{e}{', retrying' if retrying else ''}")
+                self.events.emit(Notice("phase_timeout", f"{e}{', retrying' if retrying else ''}"))
+                if not retrying:
+                    raise
+
+    def _current_app(self) -> str:
+        """The focused app; the last known one if detection hangs."""
+        try:
+            self._last_app = self._guarded("app_detection", self.backend.get_current_app)
+        except PhaseTimeout:
+            pass
+        return self._last_app
+
+    def _settle(self, step: int) -> None:
+        """
+        Give the UI time to update after an action.
+
+        In speculative mode, the next step's request is sent on an early
+        frame part-way through the wait, so the model works while the UI
+        settles; the next step decides whether that request still applies.
+        """
+        config = self.agent_config
+        speculate = (
+            self._speculative
+            and step < config.max_steps
+            and self._plan is None  # cached steps need no model
+            and not self._escalate
+        )
+        if not speculate:
+            with self._phase("settle"):
+                self.backend.wait(config.settle_time, "ui_wait")
+            return
+
+        start = time.perf_counter()
+        with self._phase("settle"):
+            self.backend.wait(min(config.speculative_delay, config.settle_time), "ui_wait")
+        with self._phase("speculate"):
+            self._speculation = self._speculate()
+        with self._phase("settle"):
+            self.backend.wait(max(0.0, config.settle_time - (time.perf_counter() - start)), "ui_wait")
+
+    def _speculate(self) -> Optional[_Speculation]:
+        """
+        Capture an early frame and send the next step's request on it in the background.
+
+        Returns:
+            The in-flight speculation, or None if the budget does not allow it.
+        """
+        try:
+            screenshot = self._guarded("capture", self.backend.get_screenshot)
+        except PhaseTimeout:
+            return None
+        current_app = self._current_app()
+        fingerprint = screenshot_dhash(screenshot)
+        _, request_messages, image_bytes, _ = self._build_request(screenshot, current_app)
+        if self._budget_exceeded(image_bytes):
+            return None
+
+        if self._speculator is None:
+            self._speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        cancel = threading.Event()
+        # Run in a copy of this context so the request is traced by this agent's tracer
+        future = self._speculator.submit(
+            contextvars.copy_context().run, self.model_client.request, request_messages, None, cancel
+        )
+        return _Speculation(future, cancel, request_messages, fingerprint, image_bytes)
+
+    def _take_speculation(
+        self, step: int, request_messages: List[dict], fingerprint: Optional[int]
+    ) -> Optional[Tuple[ModelResponse, List[dict]]]:
+        """
+        Use the speculative request if the settled screen still matches its frame.
+
+        It applies only when the settled frame is within
+        ``speculative_distance`` of the early one and the request would
+        otherwise be identical: same history and same screen text (app, UI
+        tree, notes). Loop hints, app switches and the like therefore force
+        a fresh request.
+
+        Args:
+            step: Step number.
+            request_messages: The request built from the settled frame.
+            fingerprint: dhash of the settled frame.
+
+        Returns:
+            (response, messages that were sent), or None to ask the model again.
+        """
+        speculation = self._speculation
+        same = (
+            not self._escalate
+            and fingerprint is not None
+            and hash_distance(speculation.fingerprint, fingerprint) <= self.agent_config.speculative_distance
+            and speculation.messages[:-1] == request_messages[:-1]
+            and _text_parts(speculation.messages[-1]) == _text_parts(request_messages[-1])
+        )
+        if not same:
+            logger.info(f"Screen changed while settling, reissuing the request for step {step}")
+            metrics.SPECULATIONS.inc(outcome="miss")
+            return None
+
+        self.events.emit(ModelRequested(step, self.model_client.config.model_name, speculative=True))
+        try:
+            with self._phase("speculative_wait"):
+                response = speculation.future.result(timeout=self.agent_config.phase_deadlines.get("model") or None)
+        except Exception as e:
+            logger.warning(f"Speculative request failed, reissuing it: {e}")
+            metrics.SPECULATIONS.inc(outcome="miss")
+            return None
+        self._speculation = None
+        metrics.SPECULATIONS.inc(outcome="hit")
+        self._usage.image_bytes += speculation.image_bytes
+        metrics.IMAGE_BYTES.inc(speculation.image_bytes)
+        self._account_response(response)
+        return response, speculation.messages
+
+    def _discard_speculation(self) -> None:
+        """Cancel a speculative request that will not be used."""
+        if self._speculation is not None:
+            self._speculation.discard()
+            self._speculation = None
+
+    def _build_request(self, screenshot: Screenshot, current_app: str) -> Tuple[dict, List[dict], int, int]:
+        """
+        Build the model request for a screenshot.
+
+        Args:
+            screenshot: The current screenshot.
+            current_app: Name of the foreground app.
+
+        Returns:
+            (user message, full request messages, image bytes sent, UI tree elements).
+        """
+        ui_tree = None
+        ui_elements = 0
+        image = screenshot
+        if self.agent_config.ui_tree:
+            with self._phase("ui_tree"):
+                try:
+                    root = self._guarded("ui_tree", self.backend.get_ui_tree)
+                except PhaseTimeout:
+                    root = None  # screenshot only
+                if root is not None:
+                    ui_tree, ui_elements = format_ui_tree(
+                        root,
+                        screenshot.logical_width or screenshot.width,
+                        screenshot.logical_height or screenshot.height,
+                        self.agent_config.ui_tree_max_chars,
+                    )
+            if ui_tree and ui_elements >= self.agent_config.ui_tree_rich_elements and self.agent_config.ui_tree_image_scale < 1:
+                # The tree carries the structure, so a coarser image is enough
+                with self._phase("downscale"):
+                    image = downscale(screenshot, self.agent_config.ui_tree_image_scale)
+
+        with self._phase("build_messages"):
+            # Build context info
+            screen_info = MessageBuilder.build_screen_info(
+                current_app=current_app,
+                ui_tree=ui_tree,
+                notes=self.scratchpad.render(),
+                width=screenshot.logical_width,
+                height=screenshot.logical_height
+            )
+            
+            # 2. Planning: Get model response
+            # We always send the latest state (screenshot + text info)
+            user_msg = MessageBuilder.create_user_message(
+                text=f"当前状态: {screen_info}",
+                image_part=image_part(image),
+            )
+            
+            # Temp message list for this request (don't keep screenshots in history to save tokens);
+            # past screens only appear as the bounded set of thumbnails
+            request_messages = list(self.messages)
+            thumbnail_msg = self.thumbnails.to_message() if self.thumbnails is not None else None
+            if thumbnail_msg:
+                request_messages.append(thumbnail_msg)
+            request_messages.append(user_msg)
+            image_bytes = len(image.base64_data) + (self.thumbnails.total_bytes if thumbnail_msg else 0)
+        return user_msg, request_messages, image_bytes, ui_elements
+
+    def _step(self, step: int) -> Optional[TaskResult]:
+        """
+        Run a single step of the loop.
+
+        Returns:
+            The TaskResult if the task finished in this step, otherwise None.
+        """
+        timings_before = dict(self._timings)
+
+        # 1. Perception: Capture state
+        with self._phase("capture"):
+            screenshot = self._guarded("capture", self.backend.get_screenshot, retries=self.agent_config.phase_retries)
+        with self._phase("app_detection"):
+            current_app = self._current_app()
+        
+        fingerprint = None
+        if (
+            self.plan_cache is not None or self.agent_config.checkpoint_path
+            or self.loop_detector is not None or self._speculation is not None
+        ):
+            with self._phase("fingerprint"):
+                fingerprint = screenshot_dhash(screenshot)
+
+        if self._resume_fingerprint is not None:
+            self._check_resumed_screen(fingerprint)
+        if self.loop_detector is not None:
+            stopped = self._recover_from_loop(self.loop_detector.observe(fingerprint), step)
+            if stopped:
+                return stopped
+        if self.agent_config.checkpoint_path:
+            with self._phase("checkpoint"):
+                self._save_checkpoint(step, fingerprint, current_app)
+
+        user_msg, request_messages, image_bytes, ui_elements = self._build_request(screenshot, current_app)
+
+        self.events.emit(ObservationReady(
+            step, current_app, screenshot.logical_width, screenshot.logical_height, image_bytes, ui_elements,
+        ))
+
+        cached_step = self._cached_step(step, fingerprint)
+        speculative = None
+        if not cached_step and self._speculation is not None:
+            speculative = self._take_speculation(step, request_messages, fingerprint)
+        self._discard_speculation()
+        if cached_step:
+            response = ModelResponse(
+                thinking=cached_step.thinking,
+                action=cached_step.action,
+                raw_content=cached_step.raw_content,
+            )
+            sent = None
+        elif speculative:
+            response, sent = speculative
+            user_msg = sent[-1]
+        else:
+            exceeded = self._budget_exceeded(image_bytes)
+            if exceeded:
+                self.events.emit(Notice("budget", exceeded[1], step))
+                return self._task_result(False, exceeded[1], step - 1, exceeded[0])
+            self._usage.image_bytes += image_bytes
+            metrics.IMAGE_BYTES.inc(image_bytes)
+
+            client = self._model_for_step(step)
+            with self.tracer.span("model"):
+                response = self._guarded(
+                    "model", client.request, request_messages,
+                    on_token=lambda text: self.events.emit(ModelToken(step, text)),
+                    retries=self.agent_config.phase_retries, cancellable=True,
+                )
+            self._account_response(response)
+            sent = request_messages
+        
+        self.events.emit(ModelThought(step, response.thinking, response.action, cached=bool(cached_step)))
+
+        # Add model's thought and choice to history (without images)
+        self.messages.append(MessageBuilder.create_assistant_message(response.raw_content))
+        
+        # 3. Execution: Run the action
+        with self._phase("parse"):
+            action = parse_action(response.action)
+        if action.parse_error:
+            metrics.PARSE_FAILURES.inc(reason=action.parse_error)
+        parsed = action
+        if self._alternative_for is not None:
+            # The model picked the action that just had no effect again: try another input for it
+            alternative = alternative_action(action)
+            if alternative and action_signature(action) == self._alternative_for:
+                self.events.emit(Notice(
+                    "alternative",
+                    f"Trying {alternative.name}{' + Enter' if getattr(alternative, 'submit', False) else ''} instead",
+                    step,
+                ))
+                action = alternative
+            self._alternative_for = None
+        if self.snapper is not None and isinstance(action, Tap) and action.element:
+            with self._phase("snap"):
+                snap = self.snapper.snap(screenshot, *action.element)
+            if snap:
+                logger.info(f"Snapped tap {list(action.element)} to [{snap.x}, {snap.y}] "
+                            f"({snap.dx:+d}, {snap.dy:+d} px, element {snap.box})")
+                self.events.emit(Notice(
+                    "snap", f"Snapped {action.name} by ({snap.dx:+d}, {snap.dy:+d}) px onto a nearby element", step
+                ))
+                metrics.TAP_SNAPS.inc()
+                action = type(action)((snap.x, snap.y), message=action.message)
+        
+        self.events.emit(ActionParsed(step, action))
+        if isinstance(action, CallApi):
+            # A text-only model request bounded by the model deadline in _summarize; no input is sent
+            result = self.action_handler.perform(action, screenshot.logical_width, screenshot.logical_height)
         else:
-            print(f"\n🛑 REACHED MAX STEPS ({self.agent_config.max_steps})")
+            with self._phase("action"):
+                # Takeovers and confirmations wait for the user as long as needed; only the input is bounded.
+                # A timed-out input is neither retried nor followed by further steps (see _run_task)
+                result = self.action_handler.ask_user(action)
+                if result is None:
+                    result = self._guarded(
+                        "action", self.action_handler.perform,
+                        action, screenshot.logical_width, screenshot.logical_height,
+                    )
+        
+        metrics.ACTIONS.inc(
+            action=action.name or action.kind,
+            outcome="success" if result.success else "failure",
+        )
+        self.events.emit(ActionExecuted.from_result(step, action, result))
+        if self.loop_detector is not None:
+            self.loop_detector.record_action(action)
+
+        if self.plan_cache is not None:
+            self._plan_steps.append(PlanStep(fingerprint, response.raw_content, response.thinking, response.action))
+            if cached_step and not result.success:
+                self._plan = None
+
+        if self.step_callback:
+            self.step_callback(step, response, result)
+
+        if self._recorder:
+            self._recorder.record_step(
+                step, screenshot, current_app, self.messages, user_msg, response, parsed, result,
+                {k: v - timings_before.get(k, 0.0) for k, v in self._timings.items()},
+                request_messages=sent, executed=action,
+            )
+
+        if not result.success:
+            # Optionally add failure info to history to help model recover
+            self.messages.append(MessageBuilder.create_user_message(f"Action failed: {result.message}"))
+        
+        if result.should_finish:
+            return self._task_result(result.success, result.message, step)
+
+        if self.thumbnails is not None:
+            with self._phase("thumbnail"):
+                self.thumbnails.add(step, response.action, screenshot.base64_data)
+            
+        # Short wait for UI update
+        self._settle(step)
+        return None
@@ -0,0 +1,189 @@
+"""Batch task runner over a JSONL task file with per-task reports."""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from pc_agent.agent import AgentConfig, PcAgent, TaskResult
+from pc_agent.model.client import ModelClient, ModelConfig
+from pc_agent.model.scheduler import Priority, RequestScheduler
+from pc_agent.pc import Backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchTask:
+    """A single entry of a batch task file."""
+
+    id: str
+    task: str
+    max_steps: Optional[int] = None
+    timeout: Optional[float] = None
+    lang: Optional[str] = None
+
+
+def load_tasks(path: Union[str, Path]) -> List[BatchTask]:
+    """
+    Load tasks from a JSONL file.
+
+    Each non-empty line is a JSON object with a required "task" field and
+    optional "id", "max_steps", "timeout" and "lang" fields.
+
+    Args:
+        path: Path to the task file.
+
+    Returns:
+        List of BatchTask entries in file order.
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no "task".
+    """
+    tasks = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                tasks.append(BatchTask(
+                    id=str(entry.get("id", line_no)),
+                    task=entry["task"],
+                    max_steps=entry.get("max_steps"),
+                    timeout=entry.get("timeout"),
+                    lang=entry.get("lang"),
+                ))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_no}: invalid task entry ({e})") from e
+    return tasks
+
+
+def create_unattended_agent(
+    model_client: ModelClient, agent_config: AgentConfig, backend: Optional[Backend] = None
+) -> PcAgent:
+    """
+    Create an agent that never blocks on console input.
+
+    Sensitive actions only proceed when confirmation is disabled in the
+    agent config, and takeover requests are logged and skipped.
+
+    Args:
+        model_client: Shared, warm model client.
+        agent_config: Default agent configuration.
+        backend: Optional desktop backend.
+
+    Returns:
+        The configured PcAgent.
+    """
+    agent = PcAgent(
+        agent_config=agent_config,
+        model_client=model_client,
+        backend=backend,
+        confirmation_callback=lambda message: not agent.agent_config.confirm_sensitive,
+        takeover_callback=lambda message: logger.warning(f"Takeover requested: {message}"),
+    )
+    return agent
+
+
+def run_batch_task(agent: PcAgent, task: BatchTask, base_config: AgentConfig) -> Dict[str, Any]:
+    """
+    Run one batch task on a reused agent and build its results record.
+
+    Args:
+        agent: The agent to reuse; its conversation is reset first.
+        task: The task to run.
+        base_config: Defaults for limits the task does not override.
+
+    Returns:
+        The results-file record for the task.
+    """
+    agent.agent_config = replace(
+        base_config,
+        max_steps=task.max_steps or base_config.max_steps,
+        timeout=task.timeout if task.timeout is not None else base_config.timeout,
+        lang=task.lang or base_config.lang,
+        trace_path=f"{base_config.trace_path}.{task.id}.json" if base_config.trace_path else None,
+        record_path=str(Path(base_config.record_path) / task.id) if base_config.record_path else None,
+        checkpoint_path=f"{base_config.checkpoint_path}.{task.id}.json" if base_config.checkpoint_path else None,
+    )
+    agent.reset()
+    try:
+        result = agent.run(task.task)
+    except Exception as e:
+        logger.error(f"Task {task.id} crashed: {e}")
+        result = TaskResult(success=False, message=str(e))
+
+    return {
+        "id": task.id,
+        "task": task.task,
+        "success": result.success,
+        "message": result.message,
+        "steps": result.steps,
+        "wall_time": round(result.duration, 3),
+        "stop_reason": result.stop_reason,
+        "usage": result.usage,
+        "cost": round(result.cost, 6),
+        "timings": {phase: round(seconds, 3) for phase, seconds in result.timings.items()},
+    }
+
+
+def print_summary(records: List[Dict[str, Any]], elapsed: float, results_path: Union[str, Path]) -> None:
+    """Print success count and throughput for a finished batch."""
+    succeeded = sum(1 for r in records if r["success"])
+    throughput = len(records) / elapsed * 3600 if elapsed > 0 else 0.0
+    print(
+        f"\n📊 Batch finished: {succeeded}/{len(records)} succeeded in {elapsed:.1f}s "
+        f"({throughput:.1f} tasks/hour), results in {results_path}"
+    )
+
+
+def run_batch(
+    tasks_path: Union[str, Path],
+    results_path: Union[str, Path],
+    model_config: Optional[ModelConfig] = None,
+    agent_config: Optional[AgentConfig] = None,
+    scheduler: Optional[RequestScheduler] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run every task in a JSONL file with one warm agent and write per-task results.
+
+    The model client is created and warmed once; the agent's conversation
+    is reset between tasks and per-task limits override the defaults.
+    Results are appended and flushed as each task finishes, so a partial
+    file is still usable if the run is interrupted.
+
+    Args:
+        tasks_path: Path to the JSONL task file.
+        results_path: Path of the JSONL results file to write.
+        model_config: Model configuration for the shared client.
+        agent_config: Default agent configuration.
+        scheduler: Optional request scheduler shared with other clients in
+            this process; batch requests yield to interactive ones.
+
+    Returns:
+        List of result records, in task order.
+    """
+    tasks = load_tasks(tasks_path)
+    base_config = agent_config or AgentConfig()
+
+    model_client = ModelClient(model_config, scheduler=scheduler, priority=Priority.BATCH)
+    if not model_client.warmup():
+        logger.warning("Model server warm-up failed; continuing anyway")
+    agent = create_unattended_agent(model_client, base_config)
+
+    records = []
+    batch_start = time.perf_counter()
+    with open(results_path, "w", encoding="utf-8") as out:
+        for index, task in enumerate(tasks, 1):
+            print(f"\n📋 [{index}/{len(tasks)}] {task.id}: {task.task}")
+            record = run_batch_task(agent, task, base_config)
+            records.append(record)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+    print_summary(records, time.perf_counter() - batch_start, results_path)
+    return records
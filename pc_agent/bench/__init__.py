@@ -0,0 +1,20 @@
+"""Benchmarks of the agent loop without a real model or screen."""
+
+from pc_agent.bench.desktop import SimElement, SimScreen, SimulatedDesktop
+from pc_agent.bench.mock_server import MockModelConfig, MockOpenAIServer
+from pc_agent.bench.runner import compare_reports, format_report, load_report, run_benchmark, write_report
+from pc_agent.bench.synthetic import SyntheticBackend
+
+__all__ = [
+    "MockModelConfig",
+    "MockOpenAIServer",
+    "SyntheticBackend",
+    "SimulatedDesktop",
+    "SimScreen",
+    "SimElement",
+    "run_benchmark",
+    "format_report",
+    "compare_reports",
+    "write_report",
+    "load_report",
+]
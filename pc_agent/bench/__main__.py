@@ -0,0 +1,59 @@
+"""Command-line entry point: python -m pc_agent.bench."""
+
+import argparse
+import logging
+
+from pc_agent.bench.mock_server import MockModelConfig
+from pc_agent.bench.runner import compare_reports, format_report, load_report, run_benchmark, write_report
+from pc_agent.logs import setup_logging
+
+
+def _resolution(value: str) -> tuple:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure per-phase agent latency against a mock model and a synthetic screen",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python -m pc_agent.bench --output bench.json
+    python -m pc_agent.bench --resolutions 1920x1080,3840x2160 --codecs png,jpeg --steps 5,20
+    python -m pc_agent.bench --output new.json --baseline bench.json
+        """,
+    )
+    parser.add_argument("--resolutions", default="1280x720,1920x1080,2560x1600",
+                        help="Comma-separated WIDTHxHEIGHT frame sizes")
+    parser.add_argument("--codecs", default="png", help="Comma-separated codecs (png, jpeg)")
+    parser.add_argument("--steps", default="5", help="Comma-separated steps per run")
+    parser.add_argument("--repeats", type=int, default=3, help="Measured runs per case")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock network latency in seconds")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Mock time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Mock decode rate")
+    parser.add_argument("--stream", action="store_true", help="Use streaming requests")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="Compare against an earlier JSON report")
+    args = parser.parse_args()
+    setup_logging()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = run_benchmark(
+        resolutions=[_resolution(r) for r in args.resolutions.split(",")],
+        codecs=args.codecs.split(","),
+        step_counts=[int(s) for s in args.steps.split(",")],
+        repeats=args.repeats,
+        mock_config=MockModelConfig(latency=args.latency, ttft=args.ttft, tokens_per_second=args.tokens_per_second),
+        stream=args.stream,
+    )
+    print(f"\n{format_report(report)}")
+    if args.output:
+        write_report(report, args.output)
+        print(f"\n📄 Report written to {args.output}")
+    if args.baseline:
+        print(f"\n📊 Compared with {args.baseline}\n{compare_reports(load_report(args.baseline), report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""Scriptable simulated desktop: a state machine of rendered screens."""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from pc_agent.pc.accessibility import UINode
+from pc_agent.pc.backend import Backend
+from pc_agent.pc.frame_cache import FRAME_CACHE, EncodedFrame
+from pc_agent.pc.screenshot import Screenshot, screenshot_dhash
+from pc_agent.tracing import span
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 in 0-1000 relative units, like model coordinates
+
+
+@dataclass
+class SimElement:
+    """
+    An interactive element on a simulated screen.
+
+    Args:
+        id: Unique element id.
+        label: Text drawn on the element; "{name}" placeholders are filled
+            from the desktop's text fields and flags.
+        box: Bounds in 0-1000 relative units.
+        kind: "button" (tap goes to ``target``), "textbox" (tap focuses it,
+            typing fills it) or "toggle" (tap flips the ``target`` flag).
+        target: Screen to open for buttons, or flag name for toggles.
+        field: For textboxes, the text field they edit (defaults to the id);
+            textboxes on different screens can share a field.
+        submit: For buttons, the text field whose content is submitted.
+        scrolls: Whether the element moves with the screen's scroll offset.
+    """
+
+    id: str
+    label: str
+    box: Box
+    kind: str = "button"
+    target: Optional[str] = None
+    field: Optional[str] = None
+    submit: Optional[str] = None
+    scrolls: bool = False
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        """Center point in 0-1000 relative units."""
+        return (self.box[0] + self.box[2]) // 2, (self.box[1] + self.box[3]) // 2
+
+
+@dataclass
+class SimScreen:
+    """A screen of the simulated desktop."""
+
+    name: str
+    app: str
+    title: str
+    elements: List[SimElement] = field(default_factory=list)
+    max_scroll: int = 0  # relative units the scrollable elements can move up
+
+
+def default_screens() -> List[SimScreen]:
+    """
+    The built-in desktop: a launcher, a browser with search, Notes and Settings.
+
+    Returns:
+        Screens of the default scenario; "desktop" is the start screen.
+    """
+    results = [
+        ("result_wiki", "DeepSeek - Wikipedia", "page_wiki"),
+        ("result_news", "DeepSeek releases new model - News", "page_news"),
+        ("result_github", "deepseek-ai - GitHub", "page_github"),
+        ("result_docs", "DeepSeek API Docs", "page_docs"),
+        ("result_official", "DeepSeek | Official Site", "page_official"),
+    ]
+    result_elements = [
+        SimElement(element_id, label, (60, 220 + i * 170, 940, 340 + i * 170), target=target, scrolls=True)
+        for i, (element_id, label, target) in enumerate(results)
+    ]
+    pages = [
+        SimScreen(target, "Chrome", label, [SimElement("page_back", "< Back", (20, 60, 140, 120), target="results")])
+        for _, label, target in results
+    ]
+    return [
+        SimScreen("desktop", "Finder", "Desktop", [
+            SimElement("dock_chrome", "Chrome", (300, 900, 400, 980), target="browser"),
+            SimElement("dock_notes", "Notes", (450, 900, 550, 980), target="notes"),
+            SimElement("dock_settings", "Settings", (600, 900, 700, 980), target="settings"),
+        ]),
+        SimScreen("browser", "Chrome", "New Tab", [
+            SimElement("search_box", "{query}", (200, 400, 720, 470), kind="textbox", field="query"),
+            SimElement("search_button", "Search", (740, 400, 860, 470), target="results", submit="query"),
+        ]),
+        SimScreen("results", "Chrome", "Results for: {query}", [
+            SimElement("results_box", "{query}", (200, 60, 720, 130), kind="textbox", field="query"),
+            SimElement("results_button", "Search", (740, 60, 860, 130), target="results", submit="query"),
+            *result_elements,
+        ], max_scroll=400),
+        *pages,
+        SimScreen("notes", "Notes", "Notes", [
+            SimElement("new_note", "+ New Note", (40, 60, 260, 130), target="note_editor"),
+        ]),
+        SimScreen("note_editor", "Notes", "New Note", [
+            SimElement("note_body", "{note}", (60, 160, 940, 800), kind="textbox", field="note"),
+            SimElement("note_save", "Save", (800, 60, 940, 130), target="notes", submit="note"),
+        ]),
+        SimScreen("settings", "Settings", "System Settings", [
+            SimElement("settings_appearance", "Appearance", (40, 160, 400, 230), target="appearance"),
+            SimElement("settings_wifi", "Wi-Fi", (40, 250, 400, 320), target="wifi"),
+        ]),
+        SimScreen("appearance", "Settings", "Appearance", [
+            SimElement("dark_mode", "Dark mode: {dark_mode}", (60, 200, 600, 270), kind="toggle", target="dark_mode"),
+        ]),
+        SimScreen("wifi", "Settings", "Wi-Fi", [
+            SimElement("wifi_toggle", "Wi-Fi: {wifi}", (60, 200, 600, 270), kind="toggle", target="wifi"),
+        ]),
+    ]
+
+
+# Screen opened by Launch for each app name the default desktop knows
+DEFAULT_APPS = {"chrome": "browser", "google chrome": "browser", "notes": "notes", "备忘录": "notes",
+                "settings": "settings", "system settings": "settings", "系统设置": "settings"}
+
+
+class SimulatedDesktop(Backend):
+    """
+    Headless desktop the agent can drive through the Backend interface.
+
+    Taps are hit-tested against the current screen's elements, typing
+    fills the focused textbox, swipes scroll, Launch opens an app's first
+    screen and Back/Home walk the navigation history. Every state change is
+    deterministic, so the same model outputs always lead to the same
+    screens; tasks check the final state through ``screen``, ``fields``,
+    ``flags`` and ``submitted``.
+
+    Args:
+        screens: Screens of the scenario; the first one is the start screen.
+        apps: Launchable app names (lowercase) mapped to their first screen.
+        width: Frame width in pixels.
+        height: Frame height in pixels.
+    """
+
+    def __init__(
+        self,
+        screens: Optional[List[SimScreen]] = None,
+        apps: Optional[Dict[str, str]] = None,
+        width: int = 1280,
+        height: int = 800,
+    ):
+        screens = screens if screens is not None else default_screens()
+        self.screens = {screen.name: screen for screen in screens}
+        self.start_screen = screens[0].name
+        self.apps = apps if apps is not None else dict(DEFAULT_APPS)
+        self.width = width
+        self.height = height
+        self._frames: Dict[tuple, EncodedFrame] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the start screen with empty fields and flags off."""
+        self.screen = self.start_screen
+        self.history: List[str] = []
+        self.fields: Dict[str, str] = {}
+        self.flags: Dict[str, bool] = {}
+        self.submitted: Dict[str, List[str]] = {}  # field -> submitted values
+        self.focused: Optional[str] = None  # field of the focused textbox
+        self.scroll = 0
+        self.actions = 0
+
+    @property
+    def current(self) -> SimScreen:
+        """The screen currently shown."""
+        return self.screens[self.screen]
+
+    def _navigate(self, name: str) -> None:
+        if name not in self.screens:
+            return
+        if name != self.screen:
+            self.history.append(self.screen)
+        self.screen = name
+        self.focused = None
+        self.scroll = 0
+
+    def _element_box(self, element: SimElement) -> Box:
+        x0, y0, x1, y1 = element.box
+        offset = self.scroll if element.scrolls else 0
+        return x0, y0 - offset, x1, y1 - offset
+
+    def _label(self, text: str) -> str:
+        values = {**self.fields, **{k: "on" if v else "off" for k, v in self.flags.items()}}
+        for element in self.current.elements:
+            if element.kind == "toggle":
+                values.setdefault(element.target, "off")
+            if element.kind == "textbox":
+                values.setdefault(element.field or element.id, "")
+        try:
+            return text.format(**values)
+        except (KeyError, IndexError, ValueError):
+            return text
+
+    def _hit(self, x: int, y: int) -> Optional[SimElement]:
+        rx, ry = x * 1000 / self.width, y * 1000 / self.height
+        for element in self.current.elements:
+            x0, y0, x1, y1 = self._element_box(element)
+            if y1 < 150 and element.scrolls:  # scrolled under the toolbar
+                continue
+            if x0 <= rx <= x1 and y0 <= ry <= y1:
+                return element
+        return None
+
+    # Backend interface
+
+    def get_screenshot(self) -> Screenshot:
+        key = (self.screen, self.scroll, self.focused,
+               tuple(sorted(self.fields.items())), tuple(sorted(self.flags.items())))
+        frame = self._frames.get(key)
+        image = None
+        if frame is None:
+            with span("render"):
+                image = self._render()
+                frame = FRAME_CACHE.encode(image)
+            self._frames[key] = frame
+        screenshot = Screenshot(frame.base64_data, self.width, self.height, self.width, self.height, digest=frame.digest)
+        if image is not None:
+            screenshot_dhash(screenshot, image)
+        return screenshot
+
+    def _render(self) -> Image.Image:
+        dark = self.flags.get("dark_mode", False)
+        background, foreground = ((32, 33, 36), (232, 234, 237)) if dark else ((246, 246, 246), (20, 20, 20))
+        img = Image.new("RGB", (self.width, self.height), background)
+        draw = ImageDraw.Draw(img)
+
+        def px(box: Box) -> List[int]:
+            x0, y0, x1, y1 = box
+            return [x0 * self.width // 1000, y0 * self.height // 1000, x1 * self.width // 1000, y1 * self.height // 1000]
+
+        draw.rectangle(px((0, 0, 1000, 40)), fill=(210, 210, 210) if not dark else (60, 60, 64))
+        draw.text((10, 6), f"{self.current.app} - {self._label(self.current.title)}", fill=foreground)
+        for element in self.current.elements:
+            box = self._element_box(element)
+            if box[3] < 150 and element.scrolls or box[1] > 1000:
+                continue
+            focused = element.kind == "textbox" and (element.field or element.id) == self.focused
+            outline = (26, 115, 232) if focused else (150, 150, 150)
+            fill = (255, 255, 255) if element.kind == "textbox" and not dark else None
+            draw.rectangle(px(box), fill=fill, outline=outline, width=2)
+            label = self._label(element.label)
+            if element.kind == "textbox" and not label:
+                label = "Type here..."
+            x0, y0, _, _ = px(box)
+            draw.text((x0 + 8, y0 + 8), label, fill=foreground if fill is None else (20, 20, 20))
+        return img
+
+    def get_current_app(self) -> str:
+        return self.current.app
+
+    def get_ui_tree(self) -> Optional[UINode]:
+        roles = {"button": "push button", "textbox": "entry", "toggle": "toggle button"}
+        window = UINode("frame", f"{self.current.app} - {self._label(self.current.title)}", (0, 0, self.width, self.height))
+        for element in self.current.elements:
+            x0, y0, x1, y1 = self._element_box(element)
+            if y1 < 150 and element.scrolls or y0 > 1000:
+                continue
+            node = UINode(
+                roles.get(element.kind, element.kind),
+                bounds=(x0 * self.width // 1000, y0 * self.height // 1000,
+                        (x1 - x0) * self.width // 1000, (y1 - y0) * self.height // 1000),
+            )
+            if element.kind == "textbox":
+                node.value = self._label(element.label)
+                if (element.field or element.id) == self.focused:
+                    node.states.append("focused")
+            else:
+                node.name = self._label(element.label)
+                if element.kind == "toggle" and self.flags.get(element.target, False):
+                    node.states.append("checked")
+            window.children.append(node)
+        return window
+
+    def tap(self, x: int, y: int) -> None:
+        self.actions += 1
+        element = self._hit(x, y)
+        if element is None:
+            self.focused = None
+            return
+        if element.kind == "textbox":
+            self.focused = element.field or element.id
+        elif element.kind == "toggle":
+            self.flags[element.target] = not self.flags.get(element.target, False)
+        else:
+            if element.submit:
+                self.submitted.setdefault(element.submit, []).append(self.fields.get(element.submit, ""))
+            self._navigate(element.target)
+
+    def double_tap(self, x: int, y: int) -> None:
+        self.tap(x, y)
+
+    def long_press(self, x: int, y: int) -> None:
+        self.tap(x, y)
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        self.actions += 1
+        delta = (start_y - end_y) * 1000 // self.height
+        self.scroll = max(0, min(self.current.max_scroll, self.scroll + delta))
+
+    def back(self) -> None:
+        self.actions += 1
+        if self.history:
+            self.screen = self.history.pop()
+            self.focused = None
+            self.scroll = 0
+
+    def home(self) -> None:
+        self.actions += 1
+        self._navigate(self.start_screen)
+
+    def launch_app(self, app_name: str) -> bool:
+        self.actions += 1
+        screen = self.apps.get(app_name.strip().casefold())
+        if screen is None:
+            return False
+        self._navigate(screen)
+        return True
+
+    def type_text(self, text: str) -> None:
+        self.actions += 1
+        if self.focused:
+            self.fields[self.focused] = self.fields.get(self.focused, "") + text
+
+    def clear_text(self) -> None:
+        if self.focused:
+            self.fields[self.focused] = ""
+
+    def press_key(self, key: str) -> None:
+        self.actions += 1
+
+    def wait(self, seconds: float, reason: str = "wait") -> None:
+        pass
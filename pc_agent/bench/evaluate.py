@@ -0,0 +1,289 @@
+"""Task-level evaluation on the simulated desktop: success rate, steps and tokens."""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from pc_agent.agent import AgentConfig, PcAgent
+from pc_agent.bench.desktop import SimulatedDesktop, default_screens
+from pc_agent.bench.mock_server import MockModelConfig, MockOpenAIServer
+from pc_agent.logs import setup_logging
+from pc_agent.model.client import ModelClient, ModelConfig
+
+REPORT_VERSION = 1
+
+
+def _tap(element_id: str, scroll: int = 0) -> str:
+    """Reference Tap action for an element of the default desktop."""
+    for screen in default_screens():
+        for element in screen.elements:
+            if element.id == element_id:
+                x, y = element.center
+                return f'do(action="Tap", element=[{x}, {y - scroll}])'
+    raise KeyError(element_id)
+
+
+def _reply(thinking: str, action: str) -> str:
+    return f"<think>{thinking}</think><answer>{action}</answer>"
+
+
+@dataclass
+class SimTask:
+    """
+    A canned task on the simulated desktop.
+
+    Args:
+        id: Short task id.
+        task: Task description given to the agent.
+        check: Predicate on the final desktop state; success is judged by
+            this, not by the agent claiming it finished.
+        solution: Reference model replies, used with the mock server to
+            validate the pipeline and as the optimal step count.
+        max_steps: Step limit for the task.
+    """
+
+    id: str
+    task: str
+    check: Callable[[SimulatedDesktop], bool]
+    solution: List[str] = field(default_factory=list)
+    max_steps: int = 15
+
+
+def _searched(desktop: SimulatedDesktop, text: str) -> bool:
+    return any(text in query.casefold() for query in desktop.submitted.get("query", []))
+
+
+CANNED_TASKS = [
+    SimTask(
+        id="open_chrome",
+        task="打开 Chrome",
+        check=lambda d: d.current.app == "Chrome",
+        solution=[
+            _reply("Launch the browser.", 'do(action="Launch", app="Chrome")'),
+            _reply("Chrome is open.", 'finish(message="Chrome 已打开")'),
+        ],
+    ),
+    SimTask(
+        id="search",
+        task="打开 Chrome 搜索 DeepSeek",
+        check=lambda d: _searched(d, "deepseek"),
+        solution=[
+            _reply("Launch the browser.", 'do(action="Launch", app="Chrome")'),
+            _reply("Focus the search box.", _tap("search_box")),
+            _reply("Type the query.", 'do(action="Type", text="DeepSeek")'),
+            _reply("Run the search.", _tap("search_button")),
+            _reply("Results are shown.", 'finish(message="已搜索 DeepSeek")'),
+        ],
+    ),
+    SimTask(
+        id="open_official_site",
+        task="打开 Chrome 搜索 DeepSeek，并打开 DeepSeek 官网",
+        check=lambda d: d.screen == "page_official",
+        solution=[
+            _reply("Launch the browser.", 'do(action="Launch", app="Chrome")'),
+            _reply("Focus the search box.", _tap("search_box")),
+            _reply("Type the query.", 'do(action="Type", text="DeepSeek")'),
+            _reply("Run the search.", _tap("search_button")),
+            _reply("The official site is below the fold.", 'do(action="Swipe", start=[500, 800], end=[500, 400])'),
+            _reply("Open the official site.", _tap("result_official", scroll=400)),
+            _reply("The official site is open.", 'finish(message="已打开 DeepSeek 官网")'),
+        ],
+    ),
+    SimTask(
+        id="new_note",
+        task="在备忘录中新建一条笔记，内容为：买牛奶",
+        check=lambda d: any("买牛奶" in note for note in d.submitted.get("note", [])),
+        solution=[
+            _reply("Open Notes.", 'do(action="Launch", app="Notes")'),
+            _reply("Create a note.", _tap("new_note")),
+            _reply("Focus the editor.", _tap("note_body")),
+            _reply("Write the note.", 'do(action="Type", text="买牛奶")'),
+            _reply("Save it.", _tap("note_save")),
+            _reply("The note is saved.", 'finish(message="笔记已保存")'),
+        ],
+    ),
+    SimTask(
+        id="dark_mode",
+        task="打开系统设置，开启深色模式",
+        check=lambda d: d.flags.get("dark_mode", False),
+        solution=[
+            _reply("Open System Settings.", 'do(action="Launch", app="Settings")'),
+            _reply("Open Appearance.", _tap("settings_appearance")),
+            _reply("Turn on dark mode.", _tap("dark_mode")),
+            _reply("Dark mode is on.", 'finish(message="深色模式已开启")'),
+        ],
+    ),
+]
+
+
+def evaluate_task(task: SimTask, model_client: ModelClient, agent_config: AgentConfig, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Run one task on a fresh simulated desktop.
+
+    Args:
+        task: The task.
+        model_client: Client for the model under test.
+        agent_config: Agent configuration; max_steps comes from the task.
+        verbose: Show the agent's console output.
+
+    Returns:
+        The task's result record.
+    """
+    desktop = SimulatedDesktop()
+    agent = PcAgent(
+        agent_config=replace(agent_config, max_steps=task.max_steps, verbose=verbose),
+        model_client=model_client,
+        backend=desktop,
+        confirmation_callback=lambda message: True,
+        takeover_callback=lambda message: None,
+    )
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        result = agent.run(task.task)
+    return {
+        "id": task.id,
+        "task": task.task,
+        "success": bool(task.check(desktop)),
+        "claimed_success": result.success,
+        "stop_reason": result.stop_reason,
+        "steps": result.steps,
+        "optimal_steps": len(task.solution) or None,
+        "model_calls": result.usage.get("requests", 0),
+        "tokens": result.usage.get("total_tokens", 0),
+        "wall_time": round(result.duration, 3),
+        "final_screen": desktop.screen,
+    }
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate task records into suite-level numbers."""
+    count = len(records) or 1
+    return {
+        "tasks": len(records),
+        "success_rate": round(sum(r["success"] for r in records) / count, 4),
+        "mean_steps": round(sum(r["steps"] for r in records) / count, 2),
+        "mean_model_calls": round(sum(r["model_calls"] for r in records) / count, 2),
+        "mean_tokens": round(sum(r["tokens"] for r in records) / count, 1),
+        "total_tokens": sum(r["tokens"] for r in records),
+    }
+
+
+def run_suite(
+    tasks: Optional[List[SimTask]] = None,
+    model_config: Optional[ModelConfig] = None,
+    agent_config: Optional[AgentConfig] = None,
+    mock: bool = False,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run canned tasks and report success rate, steps and tokens.
+
+    Args:
+        tasks: Tasks to run, defaults to CANNED_TASKS.
+        model_config: Model under test; with ``mock`` only its ``stream``
+            setting is kept.
+        agent_config: Agent configuration.
+        mock: Answer with each task's reference solution from a local mock
+            server instead of a real model.
+        verbose: Show the agent's console output.
+
+    Returns:
+        The machine-readable report.
+    """
+    tasks = tasks if tasks is not None else CANNED_TASKS
+    agent_config = agent_config or AgentConfig(verbose=False)
+    records = []
+
+    with contextlib.ExitStack() as stack:
+        server = None
+        if mock:
+            server = stack.enter_context(MockOpenAIServer(MockModelConfig(ttft=0.0, tokens_per_second=1e6)))
+            model_config = ModelConfig(
+                base_url=server.base_url, api_key="mock", model_name="mock",
+                stream=model_config.stream if model_config else False,
+            )
+        model_client = ModelClient(model_config)
+        model_client.warmup()
+
+        for task in tasks:
+            if server is not None:
+                server.config.script = task.solution
+            record = evaluate_task(task, model_client, agent_config, verbose)
+            records.append(record)
+            print(f"{'✅' if record['success'] else '❌'} {task.id}: {record['steps']} steps, "
+                  f"{record['model_calls']} model calls, {record['tokens']} tokens")
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "model": "mock" if mock else model_client.config.model_name,
+        "summary": summarize(records),
+        "results": records,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Evaluate the agent on canned tasks in a simulated desktop",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python -m pc_agent.bench.evaluate --mock
+    python -m pc_agent.bench.evaluate --base-url http://localhost:8000/v1 --model autoglm-phone-9b --output eval.json
+        """,
+    )
+    parser.add_argument("--base-url", default=os.getenv("PC_AGENT_BASE_URL", "http://localhost:8000/v1"))
+    parser.add_argument("--model", default=os.getenv("PC_AGENT_MODEL", "autoglm-phone-9b"))
+    parser.add_argument("--apikey", default=os.getenv("PC_AGENT_API_KEY", "EMPTY"))
+    parser.add_argument("--mock", action="store_true", help="Replay reference solutions from a mock model server")
+    parser.add_argument("--tasks", default=None, help="Comma-separated task ids (default: all)")
+    parser.add_argument("--lang", default="cn", choices=["cn", "en"])
+    parser.add_argument("--history-thumbnails", type=int, default=0,
+                        help="Show the model thumbnails of the last K screens")
+    parser.add_argument("--snap-taps", action="store_true", help="Snap near-miss taps onto UI elements")
+    parser.add_argument("--ui-tree", action="store_true", help="Send the simulated accessibility tree")
+    parser.add_argument("--ui-tree-image-scale", type=float, default=1.0,
+                        help="Screenshot scale sent alongside a rich UI tree")
+    parser.add_argument("--speculative", action="store_true",
+                        help="Request the next step on an early frame while the UI settles (streams requests)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's output")
+    args = parser.parse_args()
+    setup_logging()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    tasks = CANNED_TASKS
+    if args.tasks:
+        wanted = set(args.tasks.split(","))
+        tasks = [task for task in CANNED_TASKS if task.id in wanted]
+
+    report = run_suite(
+        tasks=tasks,
+        model_config=ModelConfig(
+            base_url=args.base_url, model_name=args.model, api_key=args.apikey, stream=args.speculative,
+        ),
+        agent_config=AgentConfig(
+            verbose=False, lang=args.lang, history_thumbnails=args.history_thumbnails, snap_taps=args.snap_taps,
+            ui_tree=args.ui_tree, ui_tree_image_scale=args.ui_tree_image_scale, speculative=args.speculative,
+        ),
+        mock=args.mock,
+        verbose=args.verbose,
+    )
+    summary = report["summary"]
+    print(f"\n📊 Success {summary['success_rate']:.0%} over {summary['tasks']} tasks, "
+          f"{summary['mean_steps']} steps / {summary['mean_model_calls']} model calls / "
+          f"{summary['mean_tokens']} tokens per task")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Import-time budget check: python -m pc_agent.bench.importtime."""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Cumulative import time budget per module in milliseconds. Heavy libraries
+# (openai, NumPy, pyautogui, pyperclip) must stay out of these imports;
+# they are loaded when first used.
+DEFAULT_BUDGETS: Dict[str, float] = {
+    "pc_agent": 25.0,
+    "pc_agent.config": 60.0,
+    "pc_agent.pc": 25.0,
+    "pc_agent.model": 25.0,
+    "pc_agent.agent": 250.0,
+    "pc_agent.batch": 300.0,
+}
+
+_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure(module: str, repeats: int = 5) -> float:
+    """
+    Measure the cumulative import time of a module in a fresh interpreter.
+
+    Uses ``python -X importtime``, which times each import inside the
+    interpreter, so interpreter startup is excluded. The best of several
+    runs is taken to filter out noise.
+
+    Args:
+        module: Dotted module name.
+        repeats: Number of fresh interpreters to measure in.
+
+    Returns:
+        Milliseconds.
+
+    Raises:
+        RuntimeError: If the module fails to import.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+        for line in proc.stderr.splitlines():
+            match = _LINE.match(line)
+            # The top-level entry is the one not nested under another import
+            if match and match.group(3) == module and len(match.group(2)) <= 1:
+                best = min(best, int(match.group(1)) / 1000)
+    return best
+
+
+def check(budgets: Dict[str, float], repeats: int = 5, scale: float = 1.0) -> List[Dict[str, object]]:
+    """
+    Measure every module against its budget.
+
+    Args:
+        budgets: Module -> budget in milliseconds.
+        repeats: Fresh interpreters per module.
+        scale: Factor applied to all budgets, for slower or faster machines.
+
+    Returns:
+        One record per module with its time, budget and whether it passed.
+    """
+    records = []
+    for module, budget in budgets.items():
+        elapsed = measure(module, repeats)
+        records.append({
+            "module": module,
+            "ms": round(elapsed, 1),
+            "budget_ms": round(budget * scale, 1),
+            "ok": elapsed <= budget * scale,
+        })
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check module import times against their budgets")
+    parser.add_argument("--modules", default=None, help="Comma-separated modules (default: all budgeted)")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all budgets, e.g. 2 on slow CI")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    budgets = DEFAULT_BUDGETS
+    if args.modules:
+        budgets = {m: DEFAULT_BUDGETS.get(m, float("inf")) for m in args.modules.split(",")}
+    records = check(budgets, args.repeats, args.scale)
+
+    for record in records:
+        mark = "✅" if record["ok"] else "❌"
+        print(f"{mark} {record['module']:<20} {record['ms']:>8.1f} ms  (budget {record['budget_ms']} ms)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2)
+    sys.exit(0 if all(record["ok"] for record in records) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Local OpenAI-compatible server with scripted replies and simulated latency."""
+
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from pc_agent.model.usage import estimate_prompt_tokens
+
+DEFAULT_SCRIPT = [
+    '<think>Open the browser first.</think><answer>do(action="Launch", app="Chrome")</answer>',
+    '<think>Focus the search box.</think><answer>do(action="Tap", element=[500, 80])</answer>',
+    '<think>Enter the query.</think><answer>do(action="Type", text="DeepSeek")</answer>',
+    '<think>Scroll through the results.</think><answer>do(action="Swipe", start=[500, 800], end=[500, 200])</answer>',
+    '<think>Let the page load.</think><answer>do(action="Wait", duration="0 seconds")</answer>',
+]
+
+
+@dataclass
+class MockModelConfig:
+    """
+    Behaviour of the mock inference server.
+
+    The reply for a request is chosen by how many assistant messages the
+    conversation already holds, so every agent run sees the same script
+    regardless of how many runs share the server.
+    """
+
+    latency: float = 0.0  # seconds before the response starts (network + queueing)
+    ttft: float = 0.2  # seconds from response start to the first token
+    tokens_per_second: float = 50.0  # decode rate after the first token
+    script: list[str] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    chars_per_token: int = 4
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Implements /v1/models and /v1/chat/completions."""
+
+    server: "MockOpenAIServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "bench"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+
+        messages = body.get("messages", [])
+        turn = sum(1 for m in messages if m.get("role") == "assistant")
+        reply = config.script[turn % len(config.script)]
+        step = config.chars_per_token
+        tokens = [reply[i:i + step] for i in range(0, len(reply), step)]
+        usage = {
+            "prompt_tokens": estimate_prompt_tokens(messages),
+            "completion_tokens": len(tokens),
+            "total_tokens": 0,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock")
+        self.server.requests += 1
+
+        time.sleep(config.latency)
+        if body.get("stream"):
+            self._stream(completion_id, model, tokens, usage, body.get("stream_options") or {})
+            return
+
+        time.sleep(config.ttft + max(len(tokens) - 1, 0) / config.tokens_per_second)
+        self._send_json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(
+        self, completion_id: str, model: str, tokens: list[str], usage: dict[str, int], options: dict[str, Any]
+    ) -> None:
+        """Send tokens as server-sent events at the configured rate."""
+        config = self.server.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None, **extra: Any) -> None:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(config.ttft)
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(1.0 / config.tokens_per_second)
+            chunk({"role": "assistant", "content": token} if index == 0 else {"content": token})
+        chunk({}, "stop")
+        if options.get("include_usage"):
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _send_json(self, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Mock OpenAI-compatible chat completions server on a background thread.
+
+    Args:
+        config: Latency and script settings.
+        host: Host to bind.
+        port: Port to bind, 0 for a free one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: MockModelConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _MockHandler)
+        self.config = config or MockModelConfig()
+        self.requests = 0
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The URL to use as ModelConfig.base_url."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,222 @@
+"""Step-latency benchmark: the agent loop against a mock model and a synthetic screen."""
+
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pc_agent.agent import AgentConfig, PcAgent
+from pc_agent.bench.mock_server import MockModelConfig, MockOpenAIServer
+from pc_agent.bench.synthetic import SyntheticBackend
+from pc_agent.model.client import ModelClient, ModelConfig
+from pc_agent.tracing import Tracer, percentile
+
+REPORT_VERSION = 1
+# Time inside these spans is model or deliberate waiting, not agent overhead
+_EXTERNAL_SPANS = ("model.request", "model.queue", "ui_wait")
+
+
+def _phase_stats(durations: List[float]) -> Dict[str, float]:
+    values = sorted(d * 1000 for d in durations)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def _step_overheads(tracer: Tracer) -> List[float]:
+    """
+    Per-step agent overhead: step duration minus model and wait time.
+
+    Spans are appended when they close, so each "step" span follows the
+    spans of the work it contains.
+    """
+    overheads = []
+    external = 0.0
+    for span in tracer.spans:
+        if span.name in _EXTERNAL_SPANS:
+            external += span.duration
+        elif span.name == "step":
+            overheads.append(max(span.duration - external, 0.0))
+            external = 0.0
+    return overheads
+
+
+def run_case(
+    base_url: str,
+    resolution: Tuple[int, int],
+    codec: str,
+    steps: int,
+    repeats: int,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """
+    Benchmark one resolution/codec/step-count combination.
+
+    Args:
+        base_url: Mock server URL.
+        resolution: Frame (width, height).
+        codec: Frame codec.
+        steps: Steps per run; the scripted model never finishes, so every
+            run stops at max_steps.
+        repeats: Number of measured runs.
+        stream: Use streaming requests.
+
+    Returns:
+        The result row for the report.
+    """
+    width, height = resolution
+    backend = SyntheticBackend(width, height, codec)
+    client = ModelClient(ModelConfig(base_url=base_url, api_key="mock", model_name="mock", stream=stream))
+    client.warmup()
+
+    durations: Dict[str, List[float]] = {}
+    overheads: List[float] = []
+    walls = []
+    image_bytes = 0
+    for _ in range(repeats):
+        tracer = Tracer()
+        agent = PcAgent(
+            agent_config=AgentConfig(max_steps=steps, verbose=False),
+            model_client=client,
+            backend=backend,
+            tracer=tracer,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = agent.run("benchmark task")
+        walls.append(result.duration)
+        image_bytes += result.usage.get("image_bytes", 0)
+        for span in tracer.spans:
+            durations.setdefault(span.name, []).append(span.duration)
+        overheads.extend(_step_overheads(tracer))
+
+    phases = {name: _phase_stats(values) for name, values in sorted(durations.items())}
+    phases["overhead"] = _phase_stats(overheads)
+    return {
+        "resolution": f"{width}x{height}",
+        "codec": codec,
+        "steps": steps,
+        "runs": repeats,
+        "wall_ms_mean": round(sum(walls) / len(walls) * 1000, 3),
+        "image_bytes_per_step": image_bytes // max(repeats * steps, 1),
+        "phases": phases,
+    }
+
+
+def run_benchmark(
+    resolutions: Iterable[Tuple[int, int]] = ((1280, 720), (1920, 1080), (2560, 1600)),
+    codecs: Iterable[str] = ("png",),
+    step_counts: Iterable[int] = (5,),
+    repeats: int = 3,
+    mock_config: Optional[MockModelConfig] = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run the benchmark matrix against a private mock server.
+
+    Args:
+        resolutions: Frame sizes to test.
+        codecs: Frame codecs to test.
+        step_counts: Steps per run to test.
+        repeats: Measured runs per combination.
+        mock_config: Mock model latency settings.
+        stream: Use streaming requests (measures TTFT).
+
+    Returns:
+        The machine-readable report.
+    """
+    from pc_agent import __version__
+
+    mock_config = mock_config or MockModelConfig()
+    results = []
+    with MockOpenAIServer(mock_config) as server:
+        for width, height in resolutions:
+            for codec in codecs:
+                for steps in step_counts:
+                    row = run_case(server.base_url, (width, height), codec, steps, repeats, stream)
+                    results.append(row)
+                    overhead = row["phases"]["overhead"]
+                    print(f"📏 {row['resolution']} {codec} x{steps} steps: overhead p50 "
+                          f"{overhead['p50_ms']:.1f} ms, p95 {overhead['p95_ms']:.1f} ms")
+
+    mock = asdict(mock_config)
+    mock.pop("script")
+    return {
+        "version": REPORT_VERSION,
+        "pc_agent_version": __version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "stream": stream,
+        "mock": mock,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any], phases: Iterable[str] = ("capture", "encode", "build_messages", "model", "parse", "action", "overhead")) -> str:
+    """Render the p50/p95/p99 of the main phases as a text table."""
+    phases = list(phases)
+    header = f"{'case':<24}{'phase':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for row in report["results"]:
+        case = f"{row['resolution']} {row['codec']} x{row['steps']}"
+        for name in phases:
+            stats = row["phases"].get(name)
+            if stats:
+                lines.append(f"{case:<24}{name:<16}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+                case = ""
+    return "\n".join(lines)
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], metric: str = "p50_ms") -> str:
+    """
+    Compare two reports case by case.
+
+    Args:
+        baseline: Earlier report.
+        current: New report.
+        metric: Statistic to compare.
+
+    Returns:
+        A text table of per-phase changes for cases present in both.
+    """
+    def key(row: Dict[str, Any]) -> Tuple[str, str, int]:
+        return row["resolution"], row["codec"], row["steps"]
+
+    old_rows = {key(row): row for row in baseline["results"]}
+    header = f"{'case':<24}{'phase':<16}{'before':>10}{'after':>10}{'change':>10}"
+    lines = [header, "-" * len(header)]
+    for row in current["results"]:
+        old = old_rows.get(key(row))
+        if old is None:
+            continue
+        case = f"{row['resolution']} {row['codec']} x{row['steps']}"
+        for name, stats in row["phases"].items():
+            if name not in old["phases"]:
+                continue
+            before, after = old["phases"][name][metric], stats[metric]
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            lines.append(f"{case:<24}{name:<16}{before:>10.2f}{after:>10.2f}{change:>10}")
+            case = ""
+    return "\n".join(lines)
+
+
+def write_report(report: Dict[str, Any], path: Union[str, Path]) -> None:
+    """Write a report as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a report written by write_report()."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
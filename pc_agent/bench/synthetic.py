@@ -0,0 +1,130 @@
+"""Synthetic desktop backend producing frames at a chosen resolution and codec."""
+
+import random
+from typing import Any, List, Tuple
+
+from PIL import Image, ImageDraw
+
+from pc_agent.pc.backend import Backend
+from pc_agent.pc.frame_cache import FRAME_CACHE
+from pc_agent.pc.screenshot import Screenshot
+from pc_agent.tracing import span
+
+CODECS = ("png", "jpeg")
+
+
+def _render_desktop(width: int, height: int, seed: int = 0) -> Image.Image:
+    """
+    Draw a desktop-like frame: flat windows, toolbars and rows of text-like marks.
+
+    Flat areas and small high-contrast details give PNG/JPEG encoders a
+    workload close to a real screen, unlike noise or a plain gradient.
+    """
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (236, 239, 244))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width, max(height // 40, 12)], fill=(250, 250, 250))
+
+    for _ in range(4):
+        x0 = rng.randrange(0, width // 2)
+        y0 = rng.randrange(height // 20, height // 2)
+        x1 = min(width - 1, x0 + rng.randrange(width // 3, width // 2 + 1))
+        y1 = min(height - 1, y0 + rng.randrange(height // 3, height // 2 + 1))
+        draw.rectangle([x0, y0, x1, y1], fill=(255, 255, 255), outline=(200, 200, 200))
+        draw.rectangle([x0, y0, x1, y0 + 28], fill=(rng.randrange(200, 240),) * 3)
+
+        line_height = 18
+        for y in range(y0 + 40, y1 - line_height, line_height):
+            x = x0 + 12
+            while x < x1 - 60:
+                word = rng.randrange(12, 60)
+                draw.rectangle([x, y + 4, x + word, y + 12], fill=(rng.randrange(20, 90),) * 3)
+                x += word + 8
+    return img
+
+
+class SyntheticBackend(Backend):
+    """
+    Backend that renders frames in memory and ignores input.
+
+    Every capture draws a moving cursor so successive frames differ and
+    miss the frame cache; the grab/encode phases cost what they would on a
+    real, changing screen of that size, while waits return immediately.
+
+    Args:
+        width: Frame width in pixels.
+        height: Frame height in pixels.
+        codec: "png" or "jpeg".
+        jpeg_quality: Quality used for JPEG frames.
+        scale: Physical pixels per logical pixel (2 for Retina).
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, codec: str = "png", jpeg_quality: int = 85, scale: int = 1):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported codec {codec!r}, expected one of {CODECS}")
+        self.width = width
+        self.height = height
+        self.codec = codec
+        self.jpeg_quality = jpeg_quality
+        self.scale = scale
+        self.frames = 0
+        self.calls: List[Tuple[Any, ...]] = []
+        self._base = _render_desktop(width, height)
+
+    def get_screenshot(self) -> Screenshot:
+        with span("grab"):
+            img = self._base.copy()
+            x = (self.frames * 97) % max(self.width - 16, 1)
+            y = (self.frames * 53) % max(self.height - 16, 1)
+            ImageDraw.Draw(img).rectangle([x, y, x + 12, y + 16], fill=(0, 0, 0))
+            self.frames += 1
+
+        with span("encode", width=self.width, height=self.height, codec=self.codec):
+            frame = FRAME_CACHE.encode(img, self.codec, self.jpeg_quality)
+
+        return Screenshot(
+            base64_data=frame.base64_data,
+            width=self.width,
+            height=self.height,
+            logical_width=self.width // self.scale,
+            logical_height=self.height // self.scale,
+            image_format=self.codec,
+            digest=frame.digest,
+        )
+
+    def get_current_app(self) -> str:
+        return "Finder"
+
+    def tap(self, x: int, y: int) -> None:
+        self.calls.append(("tap", x, y))
+
+    def double_tap(self, x: int, y: int) -> None:
+        self.calls.append(("double_tap", x, y))
+
+    def long_press(self, x: int, y: int) -> None:
+        self.calls.append(("long_press", x, y))
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        self.calls.append(("swipe", start_x, start_y, end_x, end_y))
+
+    def back(self) -> None:
+        self.calls.append(("back",))
+
+    def home(self) -> None:
+        self.calls.append(("home",))
+
+    def launch_app(self, app_name: str) -> bool:
+        self.calls.append(("launch_app", app_name))
+        return True
+
+    def type_text(self, text: str) -> None:
+        self.calls.append(("type_text", text))
+
+    def clear_text(self) -> None:
+        self.calls.append(("clear_text",))
+
+    def press_key(self, key: str) -> None:
+        self.calls.append(("press_key", key))
+
+    def wait(self, seconds: float, reason: str = "wait") -> None:
+        pass
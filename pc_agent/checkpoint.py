@@ -0,0 +1,82 @@
+"""Per-step checkpoints so long tasks can resume after a crash."""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+CHECKPOINT_VERSION = 1
+# Max dhash bit difference for the screen to count as unchanged on resume
+SAME_SCREEN_DISTANCE = 10
+
+
+@dataclass
+class Checkpoint:
+    """State needed to continue a task at the start of a step."""
+
+    task: str
+    step: int  # the step to run next
+    messages: List[Dict[str, Any]]
+    usage: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0  # seconds already spent, counted against the timeout
+    fingerprint: Optional[int] = None  # dhash of the screen at the start of the step
+    current_app: str = ""
+    lang: str = "cn"
+    notes: List[Dict[str, str]] = field(default_factory=list)  # scratchpad entries
+    saved_at: float = 0.0
+
+
+def save_checkpoint(path: Union[str, Path], checkpoint: Checkpoint) -> None:
+    """
+    Atomically write a checkpoint.
+
+    The file is written next to the target and renamed over it, so a crash
+    mid-write leaves the previous checkpoint intact.
+
+    Args:
+        path: Checkpoint file path.
+        checkpoint: The state to save.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint.saved_at = time.time()
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION, **asdict(checkpoint)}, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Union[str, Path]) -> Checkpoint:
+    """
+    Read a checkpoint written by save_checkpoint().
+
+    Args:
+        path: Checkpoint file path.
+
+    Returns:
+        The saved state.
+
+    Raises:
+        ValueError: If the file is not a checkpoint of a supported version.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.pop("version", None) != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} checkpoint")
+    try:
+        return Checkpoint(**data)
+    except TypeError as e:
+        raise ValueError(f"{path} is not a valid checkpoint ({e})") from e
+
+
+def remove_checkpoint(path: Union[str, Path]) -> None:
+    """Delete a checkpoint once its task has ended, if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,9 +1,23 @@
 """Configuration module for Phone Agent."""
 
-from pc_agent.config.apps import APP_PACKAGES
+import importlib
+
+from pc_agent.config.apps import APP_PACKAGES, get_app_registry, resolve_app_name, suggest_app_names
 from pc_agent.config.i18n import get_message, get_messages
-from pc_agent.config.prompts_en import SYSTEM_PROMPT as SYSTEM_PROMPT_EN
-from pc_agent.config.prompts_zh import SYSTEM_PROMPT as SYSTEM_PROMPT_ZH
+
+# Prompt modules are only imported when a prompt is first needed
+_PROMPT_MODULES = {
+    "SYSTEM_PROMPT": "pc_agent.config.prompts_zh",  # Chinese is the default, for backward compatibility
+    "SYSTEM_PROMPT_ZH": "pc_agent.config.prompts_zh",
+    "SYSTEM_PROMPT_EN": "pc_agent.config.prompts_en",
+}
+
+
+def __getattr__(name: str) -> str:
+    module = _PROMPT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(module).SYSTEM_PROMPT
 
 
 def get_system_prompt(lang: str = "cn") -> str:
@@ -16,16 +30,13 @@ def get_system_prompt(lang: str = "cn") -> str:
     Returns:
         System prompt string.
     """
-    if lang == "en":
-        return SYSTEM_PROMPT_EN
-    return SYSTEM_PROMPT_ZH
-
-
-# Default to Chinese for backward compatibility
-SYSTEM_PROMPT = SYSTEM_PROMPT_ZH
+    return __getattr__("SYSTEM_PROMPT_EN" if lang == "en" else "SYSTEM_PROMPT_ZH")
 
 __all__ = [
     "APP_PACKAGES",
+    "get_app_registry",
+    "resolve_app_name",
+    "suggest_app_names",
     "SYSTEM_PROMPT",
     "SYSTEM_PROMPT_ZH",
     "SYSTEM_PROMPT_EN",
@@ -1,5 +1,13 @@
 """App name to package name mapping for supported applications."""
-from typing import Optional, Union, Any, Dict, List
+import configparser
+import difflib
+import json
+import os
+import plistlib
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Optional, Union, Any, Dict, List, Iterable
 
 APP_CONFIGS: Dict[str, Dict[str, Any]] = {
     # Browsers
@@ -7,42 +15,50 @@ APP_CONFIGS: Dict[str, Dict[str, Any]] = {
         "macos": {"bundle_id": "com.google.Chrome"},
         "windows": {"executable": "chrome.exe"},
         "window_title": "Google Chrome",
+        "aliases": ["Google Chrome", "谷歌浏览器", "google-chrome"],
     },
     "Safari": {
         "macos": {"bundle_id": "com.apple.Safari"},
         "window_title": "Safari",
+        "aliases": ["Safari浏览器"],
     },
     "Edge": {
         "macos": {"bundle_id": "com.microsoft.edgemac"},
         "windows": {"executable": "msedge.exe"},
         "window_title": "Microsoft Edge",
+        "aliases": ["Microsoft Edge", "微软浏览器", "microsoft-edge"],
     },
     # Communication
     "微信": {
         "macos": {"bundle_id": "com.tencent.xinWeChat"},
         "windows": {"executable": "WeChat.exe"},
         "window_title": "微信",
+        "aliases": ["WeChat", "Weixin"],
     },
     "飞书": {
         "macos": {"bundle_id": "com.electron.lark"},
         "windows": {"executable": "Lark.exe"},
         "window_title": "飞书",
+        "aliases": ["Feishu", "Lark"],
     },
     "钉钉": {
         "macos": {"bundle_id": "com.alibaba.DingTalkMac"},
         "windows": {"executable": "Dingtalk.exe"},
         "window_title": "钉钉",
+        "aliases": ["DingTalk"],
     },
     "QQ": {
         "macos": {"bundle_id": "com.tencent.qq"},
         "windows": {"executable": "QQ.exe"},
         "window_title": "QQ",
+        "aliases": ["腾讯QQ"],
     },
     # Productivity
     "VS Code": {
         "macos": {"bundle_id": "com.microsoft.VSCode"},
         "windows": {"executable": "Code.exe"},
         "window_title": "Visual Studio Code",
+        "aliases": ["Visual Studio Code", "VSCode", "Code"],
     },
     "Obsidian": {
         "macos": {"bundle_id": "md.obsidian"},
@@ -55,18 +71,387 @@ APP_CONFIGS: Dict[str, Dict[str, Any]] = {
 APP_PACKAGES = {name: cfg.get("macos", {}).get("bundle_id") or cfg.get("windows", {}).get("executable") 
                 for name, cfg in APP_CONFIGS.items()}
 
+# Identifier keys that may appear in a platform section of an app config
+IDENTIFIER_KEYS = ("bundle_id", "executable", "desktop_id")
+
+# Minimum similarity ratio for suggesting a registered app for an unknown name
+FUZZY_CUTOFF = 0.8
+
+# Bumped whenever the on-disk discovery cache layout changes
+DISCOVERY_CACHE_VERSION = 1
+
+
+def current_platform() -> str:
+    """
+    Get the platform key used in app configs for the running OS.
+
+    Returns:
+        'macos', 'windows' or 'linux'.
+    """
+    if sys.platform == "darwin":
+        return "macos"
+    if sys.platform.startswith("win"):
+        return "windows"
+    return "linux"
+
+
+def normalize_app_name(name: str) -> str:
+    """
+    Normalise an app name or alias for lookups.
+
+    Case, width, whitespace, punctuation and common file suffixes are
+    ignored, so "Google Chrome", "google-chrome" and "GoogleChrome.app"
+    all map to the same key.
+
+    Args:
+        name: The raw name.
+
+    Returns:
+        The normalised key (may be empty).
+    """
+    key = unicodedata.normalize("NFKC", name).strip().casefold()
+    for suffix in (".app", ".exe", ".desktop"):
+        if key.endswith(suffix):
+            key = key[: -len(suffix)]
+            break
+    return "".join(ch for ch in key if ch.isalnum())
+
+
+class AppRegistry:
+    """
+    Indexed registry of known apps.
+
+    Built once from the static APP_CONFIGS plus any discovered apps, with
+    O(1) lookups by display name, platform identifier (bundle id,
+    executable, desktop id) and normalised alias. Fuzzy matching never
+    picks an app on its own: it only suggests candidates for unknown names.
+    """
+
+    def __init__(self, configs: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._by_identifier: Dict[str, str] = {}
+        self._by_alias: Dict[str, str] = {}
+        for name, cfg in (configs or {}).items():
+            self.add(name, cfg)
+
+    def add(self, name: str, cfg: Dict[str, Any]) -> str:
+        """
+        Register an app, merging it into an existing entry if it matches one.
+
+        A discovered app that resolves to a configured one (e.g. the Linux
+        "Google Chrome" desktop entry) only contributes its missing platform
+        sections and aliases, so the configured display name stays canonical.
+
+        Args:
+            name: Display name of the app.
+            cfg: App config dictionary.
+
+        Returns:
+            The canonical name the app was registered under.
+        """
+        existing = self._find_existing(name, cfg)
+        if existing is None:
+            self._configs[name] = {
+                key: (dict(value) if isinstance(value, dict) else value)
+                for key, value in cfg.items()
+            }
+            canonical = name
+        else:
+            canonical = existing
+            target = self._configs[canonical]
+            for key, value in cfg.items():
+                if isinstance(value, dict):
+                    merged = dict(value)
+                    merged.update(target.get(key, {}))
+                    target[key] = merged
+            aliases = list(target.get("aliases", []))
+            for alias in [name, *cfg.get("aliases", [])]:
+                if alias != canonical and alias not in aliases:
+                    aliases.append(alias)
+            target["aliases"] = aliases
+
+        self._index(canonical)
+        return canonical
+
+    def _find_existing(self, name: str, cfg: Dict[str, Any]) -> Optional[str]:
+        """Find an already registered app that the given entry refers to."""
+        if name in self._configs:
+            return name
+        for identifier in _iter_identifiers(cfg):
+            found = self._by_identifier.get(identifier.casefold())
+            if found:
+                return found
+        for alias in [name, *cfg.get("aliases", [])]:
+            found = self._by_alias.get(normalize_app_name(alias))
+            if found:
+                return found
+        return None
+
+    def _index(self, name: str) -> None:
+        """(Re)build index entries for a registered app."""
+        cfg = self._configs[name]
+        for identifier in _iter_identifiers(cfg):
+            self._by_identifier.setdefault(identifier.casefold(), name)
+        for alias in [name, cfg.get("window_title", ""), *cfg.get("aliases", [])]:
+            key = normalize_app_name(alias)
+            if key:
+                self._by_alias.setdefault(key, name)
+
+    def resolve(self, query: str, fuzzy: bool = False) -> Optional[str]:
+        """
+        Resolve a name, alias or identifier to a canonical app name.
+
+        Args:
+            query: What the model or the OS called the app.
+            fuzzy: Whether to fall back to the closest fuzzy match on aliases;
+                never used for launching, where a near miss opens the wrong app.
+
+        Returns:
+            The canonical app name, or None if nothing matches.
+        """
+        if not query:
+            return None
+        if query in self._configs:
+            return query
+
+        found = self._by_identifier.get(query.strip().casefold())
+        if found:
+            return found
+
+        key = normalize_app_name(query)
+        if not key:
+            return None
+        found = self._by_alias.get(key)
+        if found or not fuzzy:
+            return found
+
+        matches = self.suggest(query, limit=1)
+        return matches[0] if matches else None
+
+    def suggest(self, query: str, limit: int = 3) -> List[str]:
+        """
+        Suggest registered apps whose names or aliases are close to an unknown name.
+
+        Args:
+            query: The name that did not resolve.
+            limit: Maximum number of suggestions.
+
+        Returns:
+            Canonical app names, closest first.
+        """
+        key = normalize_app_name(query or "")
+        suggestions: List[str] = []
+        for match in difflib.get_close_matches(key, self._by_alias.keys(), n=limit * 3, cutoff=FUZZY_CUTOFF):
+            name = self._by_alias[match]
+            if name not in suggestions:
+                suggestions.append(name)
+        return suggestions[:limit]
+
+    def get_config(self, app_name: str) -> Optional[Dict[str, Any]]:
+        """Get the config for an app by exact name, alias or identifier."""
+        name = self.resolve(app_name)
+        return self._configs.get(name) if name else None
+
+    def names(self) -> List[str]:
+        """Get all registered canonical app names."""
+        return list(self._configs.keys())
+
+    def __contains__(self, app_name: str) -> bool:
+        return self.resolve(app_name) is not None
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+
+def _iter_identifiers(cfg: Dict[str, Any]) -> Iterable[str]:
+    """Yield every platform identifier declared in an app config."""
+    for value in cfg.values():
+        if isinstance(value, dict):
+            for key in IDENTIFIER_KEYS:
+                if value.get(key):
+                    yield value[key]
+
+
+def _discovery_dirs(platform: str) -> List[Path]:
+    """Get the directories scanned for installed apps on a platform."""
+    if platform == "linux":
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        roots = [data_home, *data_dirs.split(":"), "/var/lib/flatpak/exports/share"]
+        return [Path(root) / "applications" for root in roots if root]
+    if platform == "macos":
+        return [
+            Path("/Applications"),
+            Path("/System/Applications"),
+            Path(os.path.expanduser("~/Applications")),
+        ]
+    return []
+
+
+def _read_desktop_file(path: Path) -> Optional[tuple]:
+    """Parse a Linux .desktop file into (name, config), skipping hidden entries."""
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    try:
+        parser.read(path, encoding="utf-8")
+    except (configparser.Error, UnicodeDecodeError, OSError):
+        return None
+    if not parser.has_section("Desktop Entry"):
+        return None
+
+    entry = parser["Desktop Entry"]
+    if entry.get("Type", "Application") != "Application":
+        return None
+    if entry.get("NoDisplay", "false").lower() == "true" or entry.get("Hidden", "false").lower() == "true":
+        return None
+    name = entry.get("Name")
+    if not name:
+        return None
+
+    # configparser lower-cases keys, so localized names show up as "name[zh_cn]"
+    aliases = [value for key, value in entry.items() if key.startswith("name[") and value != name]
+    linux_cfg = {"desktop_id": path.stem}
+    exec_line = entry.get("Exec", "").split()
+    if exec_line:
+        linux_cfg["executable"] = os.path.basename(exec_line[0])
+    return name, {"linux": linux_cfg, "window_title": name, "aliases": aliases}
+
+
+def _read_macos_bundle(path: Path) -> Optional[tuple]:
+    """Read a macOS .app bundle's Info.plist into (name, config)."""
+    try:
+        with open(path / "Contents" / "Info.plist", "rb") as f:
+            info = plistlib.load(f)
+    except (OSError, plistlib.InvalidFileException, ValueError):
+        return None
+    bundle_id = info.get("CFBundleIdentifier")
+    if not bundle_id:
+        return None
+
+    name = path.stem
+    aliases = [
+        alias for alias in (info.get("CFBundleDisplayName"), info.get("CFBundleName"))
+        if isinstance(alias, str) and alias != name
+    ]
+    return name, {"macos": {"bundle_id": bundle_id}, "window_title": name, "aliases": aliases}
+
+
+def _scan_apps(platform: str, dirs: List[Path]) -> Dict[str, Dict[str, Any]]:
+    """Scan the given directories for installed apps."""
+    apps: Dict[str, Dict[str, Any]] = {}
+    for directory in dirs:
+        if platform == "linux":
+            entries = (_read_desktop_file(p) for p in sorted(directory.glob("*.desktop")))
+        else:
+            entries = (_read_macos_bundle(p) for p in sorted(directory.glob("*.app")))
+        for entry in entries:
+            if entry and entry[0] not in apps:
+                apps[entry[0]] = entry[1]
+    return apps
+
+
+def _default_cache_path(platform: str) -> Path:
+    """Get the default location of the app discovery cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(cache_home) / "wordwill" / f"apps-{platform}.json"
+
+
+def discover_installed_apps(
+    platform: Optional[str] = None, cache_path: Optional[Union[str, Path]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Discover installed apps, using an on-disk cache invalidated by mtime.
+
+    Linux reads XDG ``.desktop`` files and macOS reads ``.app`` bundles. The
+    cache stores the mtime of every scanned directory; adding or removing an
+    app changes its directory's mtime and triggers a rescan.
+
+    Args:
+        platform: Platform key, defaults to the running platform.
+        cache_path: Cache file location, defaults to the XDG cache dir.
+
+    Returns:
+        Mapping of discovered app names to app configs.
+    """
+    platform = platform or current_platform()
+    dirs = _discovery_dirs(platform)
+    if not dirs:
+        return {}
+
+    mtimes = {}
+    for directory in dirs:
+        try:
+            mtimes[str(directory)] = directory.stat().st_mtime
+        except OSError:
+            continue
+
+    cache_file = Path(cache_path) if cache_path else _default_cache_path(platform)
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == DISCOVERY_CACHE_VERSION and cached.get("mtimes") == mtimes:
+            return cached["apps"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    apps = _scan_apps(platform, [Path(d) for d in mtimes])
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": DISCOVERY_CACHE_VERSION, "mtimes": mtimes, "apps": apps}, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return apps
+
+
+_registry: Optional[AppRegistry] = None
+
+
+def get_app_registry() -> AppRegistry:
+    """
+    Get the process-wide app registry, building it on first use.
+
+    Discovery can be disabled by setting PC_AGENT_APP_DISCOVERY=0.
+
+    Returns:
+        The shared AppRegistry.
+    """
+    global _registry
+    if _registry is None:
+        registry = AppRegistry(APP_CONFIGS)
+        if os.getenv("PC_AGENT_APP_DISCOVERY", "1") != "0":
+            for name, cfg in discover_installed_apps().items():
+                registry.add(name, cfg)
+        _registry = registry
+    return _registry
+
+
+def resolve_app_name(query: str, fuzzy: bool = False) -> Optional[str]:
+    """
+    Resolve a model- or OS-provided app name to a canonical app name.
+
+    Args:
+        query: Display name, alias or platform identifier.
+        fuzzy: Whether to allow fuzzy matching.
+
+    Returns:
+        The canonical app name, or None if not found.
+    """
+    return get_app_registry().resolve(query, fuzzy=fuzzy)
+
 
 def get_app_config(app_name: str) -> Optional[Dict]:
     """
     Get the full config for an app.
 
     Args:
-        app_name: The display name of the app.
+        app_name: The display name (or any alias) of the app.
 
     Returns:
         The configuration dictionary, or None if not found.
     """
-    return APP_CONFIGS.get(app_name)
+    return get_app_registry().get_config(app_name)
 
 
 def get_app_identifier(app_name: str, platform: str = "macos") -> Optional[str]:
@@ -74,11 +459,12 @@ def get_app_identifier(app_name: str, platform: str = "macos") -> Optional[str]:
     Get the platform-specific identifier for an app.
 
     Args:
-        app_name: The display name of the app.
-        platform: The platform ('macos' or 'windows').
+        app_name: The display name (or any alias) of the app.
+        platform: The platform ('macos', 'windows' or 'linux').
 
     Returns:
-        The bundle_id (macOS) or executable (Windows), or None if not found.
+        The bundle_id (macOS), executable (Windows) or desktop_id (Linux),
+        or None if not found.
     """
     cfg = get_app_config(app_name)
     if not cfg:
@@ -89,6 +475,8 @@ def get_app_identifier(app_name: str, platform: str = "macos") -> Optional[str]:
         return platform_cfg.get("bundle_id")
     elif platform == "windows":
         return platform_cfg.get("executable")
+    elif platform == "linux":
+        return platform_cfg.get("desktop_id")
     return None
 
 
@@ -107,7 +495,7 @@ def get_package_name(app_name: str) -> Optional[str]:
 
 def get_app_name(identifier: str) -> Optional[str]:
     """
-    Get the app name from an identifier (bundle_id or executable).
+    Get the app name from an identifier (bundle_id, executable or desktop_id).
 
     Args:
         identifier: The platform-specific identifier.
@@ -115,21 +503,28 @@ def get_app_name(identifier: str) -> Optional[str]:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, cfg in APP_CONFIGS.items():
-        # Check macOS bundle_id
-        if cfg.get("macos", {}).get("bundle_id") == identifier:
-            return name
-        # Check Windows executable
-        if cfg.get("windows", {}).get("executable") == identifier:
-            return name
-    return None
+    return get_app_registry().resolve(identifier, fuzzy=False)
+
+
+def suggest_app_names(query: str, limit: int = 3) -> List[str]:
+    """
+    Suggest known apps for a name that did not resolve.
+
+    Args:
+        query: The unknown app name.
+        limit: Maximum number of suggestions.
+
+    Returns:
+        Canonical app names, closest first.
+    """
+    return get_app_registry().suggest(query, limit=limit)
 
 
 def list_supported_apps() -> List[str]:
     """
-    Get a list of all supported app names.
+    Get a list of all supported app names, configured and discovered.
 
     Returns:
         List of app names.
     """
-    return list(APP_CONFIGS.keys())
+    return get_app_registry().names()
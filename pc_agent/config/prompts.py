@@ -38,10 +38,10 @@ SYSTEM_PROMPT = (
     多选项交互询问。
 - do(action="Swipe", start=[x1,y1], end=[x2,y2])  
     Swipe 是拖拽或滚动操作。坐标系统从 (0,0) 到 (999,999)。
-- do(action="Note", message="True")  
-    记录页面内容。
+- do(action="Note", message="xxx")  
+    把页面上的相关内容摘录为文字记录下来。
 - do(action="Call_API", instruction="xxx")  
-    总结页面内容。
+    根据已记录的内容进行总结。
 - do(action="Long Press", element=[x,y])  
     长按操作，用于唤起右键菜单等。
 - do(action="Double Tap", element=[x,y])  
@@ -62,6 +62,18 @@ Your output should STRICTLY follow the format:
   <answer>
   do(action="Launch", app="Chrome")
   </answer>
+- **Note**
+  Record information from the current screen (titles, prices, figures) as text in message. Recorded notes are shown in every following step, so there is no need to go back to re-read them.
+  **Example**:
+  <answer>
+  do(action="Note", message="DeepSeek API: 1M tokens for $0.28")
+  </answer>
+- **Call_API**
+  Summarize or analyze the recorded notes as the instruction says. The text answer is added to the recorded notes.
+  **Example**:
+  <answer>
+  do(action="Call_API", instruction="Compare the prices recorded so far")
+  </answer>
 - **Back**
   Perform a "Back" operation or use browser shortcuts (e.g., Cmd+[).
   **Example**:
@@ -40,10 +40,10 @@ SYSTEM_PROMPT = (
     Interact 是当有多个满足条件的选项时触发，询问用户如何选择。
 - do(action="Swipe", start=[x1,y1], end=[x2,y2])  
     Swipe 是拖拽或滚动操作，通过从起始坐标拖动到结束坐标来执行手势。可用于滚动窗口内容、拖动文件或进行手势导航。坐标系统为 (0,0) 到 (999,999)。
-- do(action="Note", message="True")  
-    记录当前页面内容以便后续总结。
+- do(action="Note", message="xxx")  
+    Note 是记录操作，把当前页面上与任务相关的信息（如标题、价格、数据）摘录为文字写入 message。已记录的内容会在之后每一步的“已记录的内容”中显示，无需为重新查看而返回之前的页面。
 - do(action="Call_API", instruction="xxx")  
-    总结或评论当前页面或已记录的内容。
+    Call_API 是对已记录内容的总结或分析操作，按 instruction 的要求只根据已记录的内容生成文字结果，结果同样会出现在“已记录的内容”中。
 - do(action="Long Press", element=[x,y])  
     Long Press 是长按（或鼠标右键菜单模拟）操作，在特定点按住指定时间。可用于触发右键菜单或激活特殊交互。
 - do(action="Double Tap", element=[x,y])  
@@ -0,0 +1,240 @@
+"""Typed events describing a task run, and the bus delivering them to observers."""
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ClassVar, Dict, List, Optional, TextIO
+
+from pc_agent.actions.handler import ActionResult
+from pc_agent.actions.types import Action
+from pc_agent.config import get_message
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    """Base class of agent events."""
+
+    type: ClassVar[str] = "event"
+    timestamp: float = field(default_factory=time.time, kw_only=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-compatible form, tagged with the event type."""
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass
+class TaskStarted(Event):
+    type: ClassVar[str] = "task_started"
+    task: str
+    resumed_from: Optional[int] = None  # step a checkpointed task resumes at
+    cached_plan_steps: int = 0  # length of the cached plan found for the task
+
+
+@dataclass
+class StepStarted(Event):
+    type: ClassVar[str] = "step_started"
+    step: int
+
+
+@dataclass
+class ObservationReady(Event):
+    """The screen was captured and the request to the model is built."""
+
+    type: ClassVar[str] = "observation_ready"
+    step: int
+    current_app: str
+    width: int
+    height: int
+    image_bytes: int  # encoded image bytes about to be sent
+    ui_elements: int = 0  # accessibility tree elements listed, if enabled
+
+
+@dataclass
+class ModelRequested(Event):
+    type: ClassVar[str] = "model_requested"
+    step: int
+    model: str
+    escalated: bool = False  # the escalation model is asked after a loop
+    speculative: bool = False  # answered by a request sent while the previous action settled
+
+
+@dataclass
+class ModelToken(Event):
+    """A piece of the model's reply, while it streams (``ModelConfig.stream``)."""
+
+    type: ClassVar[str] = "model_token"
+    step: int
+    text: str
+
+
+@dataclass
+class ModelThought(Event):
+    """The model's complete reply for a step."""
+
+    type: ClassVar[str] = "model_thought"
+    step: int
+    thinking: str
+    action: str  # action text as written by the model
+    cached: bool = False  # replayed from the plan cache instead of asking the model
+
+
+@dataclass
+class ActionParsed(Event):
+    """The action that is about to run, after any loop or snapping adjustment."""
+
+    type: ClassVar[str] = "action_parsed"
+    step: int
+    action: Action
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "step": self.step, "action": self.action.to_dict(), "timestamp": self.timestamp}
+
+
+@dataclass
+class ActionExecuted(Event):
+    type: ClassVar[str] = "action_executed"
+    step: int
+    action: str  # action name
+    success: bool
+    should_finish: bool
+    message: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, step: int, action: Action, result: ActionResult) -> "ActionExecuted":
+        return cls(step, action.name or action.kind, result.success, result.should_finish, result.message)
+
+
+@dataclass
+class Notice(Event):
+    """
+    Something worth telling the user that is not part of the regular flow.
+
+    Kinds: resume, screen_changed, cached_step, loop, escalate, alternative,
+    snap, budget, error and trace.
+    """
+
+    type: ClassVar[str] = "notice"
+    kind: str
+    message: str
+    step: Optional[int] = None
+
+
+@dataclass
+class TaskFinished(Event):
+    """The task ended; always the last event of a run."""
+
+    type: ClassVar[str] = "task_finished"
+    success: bool
+    message: Optional[str]
+    steps: int
+    stop_reason: str
+    duration: float
+    usage: Dict[str, int] = field(default_factory=dict)
+    cost: float = 0.0
+
+
+Observer = Callable[[Event], None]
+
+
+class EventBus:
+    """
+    Delivers events to registered observers, synchronously and in order.
+
+    Observers run on the agent's thread, so they should be quick; one that
+    raises is logged and skipped rather than failing the task.
+    """
+
+    def __init__(self):
+        self._observers: List[Observer] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, observer: Observer) -> Callable[[], None]:
+        """
+        Register an observer.
+
+        Args:
+            observer: Called with every event.
+
+        Returns:
+            A function that unsubscribes the observer.
+        """
+        with self._lock:
+            self._observers = [*self._observers, observer]
+        return lambda: self.unsubscribe(observer)
+
+    def unsubscribe(self, observer: Observer) -> None:
+        """Remove an observer if it is registered."""
+        with self._lock:
+            self._observers = [o for o in self._observers if o is not observer]
+
+    def emit(self, event: Event) -> None:
+        """Deliver an event to every observer."""
+        for observer in self._observers:
+            try:
+                observer(event)
+            except Exception:
+                logger.exception(f"Event observer failed on {event.type}")
+
+
+class ConsoleObserver:
+    """
+    Renders events as the CLI's human-readable progress lines.
+
+    Args:
+        lang: Language of the fixed messages, 'cn' or 'en'.
+        stream: Where to write; defaults to stdout at the time of each event.
+        show_usage: Print token usage and cost when the task finishes.
+    """
+
+    def __init__(self, lang: str = "cn", stream: Optional[TextIO] = None, show_usage: bool = True):
+        self.lang = lang
+        self.stream = stream
+        self.show_usage = show_usage
+
+    def _print(self, text: str) -> None:
+        print(text, file=self.stream)
+
+    def __call__(self, event: Event) -> None:
+        msg = lambda key: get_message(key, self.lang)
+        if isinstance(event, TaskStarted):
+            self._print(f"\n🚀 {msg('starting_task')}: {event.task}")
+            if event.resumed_from is not None:
+                self._print(f"⏯️  Resuming from step {event.resumed_from}")
+            if event.cached_plan_steps:
+                self._print(f"♻️  Found a cached plan with {event.cached_plan_steps} steps")
+        elif isinstance(event, StepStarted):
+            self._print(f"\n--- {msg('step')} {event.step} ---")
+        elif isinstance(event, ModelRequested):
+            if event.escalated:
+                self._print(f"⬆️  Escalating to {event.model}")
+            if event.speculative:
+                self._print("⚡ Using the speculative request sent while the screen settled")
+            self._print(f"🤔 {msg('thinking')}...")
+        elif isinstance(event, ModelThought):
+            if event.cached:
+                self._print(f"♻️  Reusing cached step {event.step}")
+            if event.thinking:
+                self._print(f"💡 {event.thinking}")
+            self._print(f"🎬 {msg('action')}: {event.action}")
+        elif isinstance(event, ActionExecuted):
+            if not event.success:
+                self._print(f"❌ {event.message}")
+        elif isinstance(event, Notice):
+            icons = {"loop": "🔁", "alternative": "🔀", "snap": "🎯", "budget": "\n⏰", "trace": "\n⏱️ ",
+                     "error": "⚠️", "resume": "⏯️ ", "screen_changed": "⚠️ "}
+            self._print(f"{icons.get(event.kind, 'ℹ️ ')} {event.message}")
+        elif isinstance(event, TaskFinished):
+            if event.stop_reason == "finished":
+                self._print(f"\n✅ {msg('task_completed')}")
+                if event.message:
+                    self._print(f"🏁 {msg('final_result')}: {event.message}")
+            elif event.stop_reason == "max_steps":
+                self._print(f"\n🛑 {event.message}")
+            if self.show_usage and event.usage:
+                estimated = " (estimated)" if event.usage.get("estimated_requests") else ""
+                self._print(f"🧾 Tokens: {event.usage.get('prompt_tokens', 0)} in / "
+                            f"{event.usage.get('completion_tokens', 0)} out{estimated}, "
+                            f"images: {event.usage.get('image_bytes', 0)} bytes, cost: ${event.cost:.4f}")
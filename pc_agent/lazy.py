@@ -0,0 +1,31 @@
+"""Lazy package exports, so importing a package does not import its heavy submodules."""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build a module ``__getattr__`` and ``__dir__`` resolving names on first use (PEP 562).
+
+    Args:
+        package: ``__name__`` of the package.
+        exports: Exported name -> module defining it.
+
+    Returns:
+        The package's ``__getattr__`` and ``__dir__``.
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        namespace[name] = value  # later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__
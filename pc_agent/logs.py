@@ -0,0 +1,49 @@
+"""Queue-backed logging setup for entry points."""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO, stream: Optional[TextIO] = None, fmt: str = LOG_FORMAT) -> None:
+    """
+    Route the root logger through a queue to a background writer thread.
+
+    Records are only enqueued on the calling thread, so logging from the
+    agent loop never blocks on console or file I/O. The library itself does
+    not configure logging; applications call this once at startup (calling
+    it again replaces the previous setup). Pending records are flushed at exit.
+
+    Args:
+        level: Root log level.
+        stream: Where records are written, defaults to stderr.
+        fmt: Record format.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(fmt))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(QueueHandler(records))
+    root.setLevel(level)
+    _listener.start()
+
+
+@atexit.register
+def _flush() -> None:
+    if _listener is not None:
+        _listener.stop()
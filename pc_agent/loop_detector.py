@@ -0,0 +1,184 @@
+"""Detection of repeated no-effect actions and action cycles."""
+
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional, Tuple
+
+from pc_agent.actions import types
+from pc_agent.actions.types import Action
+from pc_agent.pc.screenshot import hash_distance
+
+# Actions that legitimately repeat on an unchanged screen
+_IDLE_ACTIONS = {"Wait", "Take_over", "Note", "Call_API", "Interact"}
+
+# Alternative input tried when the model repeats an action that had no effect
+_ALTERNATIVES = {types.Tap: types.DoubleTap, types.DoubleTap: types.LongPress}
+
+
+def action_signature(action: Action, grid: int = 10) -> str:
+    """
+    Reduce a parsed action to a comparable signature.
+
+    Coordinates are snapped to a grid so that jitter of a few units in
+    the model's output still counts as the same action.
+
+    Args:
+        action: Parsed action.
+        grid: Coordinate grid in 0-1000 relative units.
+
+    Returns:
+        The signature string.
+    """
+    def snap(value: Any) -> Any:
+        if isinstance(value, (list, tuple)) and all(isinstance(v, (int, float)) for v in value):
+            return [int(round(v / grid)) * grid for v in value]
+        return value
+
+    params = {k: snap(v) for k, v in action.to_dict().items() if k not in ("_metadata", "message", "submit")}
+    return json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def alternative_action(action: Action) -> Optional[Action]:
+    """
+    Get a different input for an action that had no effect.
+
+    Taps become double taps and double taps become long presses; typing
+    is followed by an Enter key press.
+
+    Args:
+        action: Parsed action.
+
+    Returns:
+        The rewritten action, or None if there is no alternative.
+    """
+    alternative = _ALTERNATIVES.get(type(action))
+    if alternative is not None:
+        return alternative(action.element, message=action.message)
+    if isinstance(action, types.TypeText) and not action.submit:
+        return type(action)(action.text, submit=True, message=action.message)
+    return None
+
+
+@dataclass
+class LoopVerdict:
+    """A detected loop."""
+
+    kind: str  # "stall": the same action keeps having no effect; "cycle": actions repeat across screens
+    repeats: int
+    period: int = 1
+    actions: List[str] = field(default_factory=list)  # signatures of one period
+
+    def describe(self) -> str:
+        """Human-readable diagnostic."""
+        actions = " -> ".join(self.actions)
+        if self.kind == "stall":
+            return f"Action repeated {self.repeats} times without changing the screen: {actions}"
+        return f"Cycle of {self.period} actions repeated {self.repeats} times: {actions}"
+
+
+class LoopDetector:
+    """
+    Watches recent (screen, action) pairs for loops.
+
+    ``observe`` is called with the fingerprint of every new screenshot,
+    before the model is asked, and ``record_action`` with the action then
+    executed on it. Two patterns are reported:
+
+    * stall: the same action was executed ``stall_repeats`` times in a row
+      and the screen did not change after any of them;
+    * cycle: the last ``period * cycle_repeats`` steps are the same
+      ``period`` actions on the same screens, repeated, and the current
+      screen is where the cycle starts again.
+
+    Args:
+        window: Number of recent steps kept.
+        max_distance: Max dhash bit difference for two screens to count as the same.
+        stall_repeats: Repetitions of a no-effect action that make a stall.
+        max_period: Longest cycle looked for (cycles of one step are stalls).
+        cycle_repeats: Repetitions of a cycle that make a loop.
+    """
+
+    def __init__(
+        self,
+        window: int = 12,
+        max_distance: int = 3,
+        stall_repeats: int = 2,
+        max_period: int = 4,
+        cycle_repeats: int = 2,
+    ):
+        self.window = window
+        self.max_distance = max_distance
+        self.stall_repeats = stall_repeats
+        self.max_period = max_period
+        self.cycle_repeats = cycle_repeats
+        # (fingerprint of the screen acted on, action signature, action name)
+        self._steps: Deque[Tuple[int, str, Optional[str]]] = deque(maxlen=window)
+        self._pending: Optional[int] = None
+        self._stalled = 0
+        self.unchanged_steps = 0  # consecutive actions, of any kind, that left the screen as it was
+
+    def reset(self) -> None:
+        """Forget all history, e.g. for a new task."""
+        self._steps.clear()
+        self._pending = None
+        self._stalled = 0
+        self.unchanged_steps = 0
+
+    def _same(self, a: int, b: int) -> bool:
+        return hash_distance(a, b) <= self.max_distance
+
+    def observe(self, fingerprint: int) -> Optional[LoopVerdict]:
+        """
+        Check the history against the screen the last action led to.
+
+        Args:
+            fingerprint: dhash of the new screenshot.
+
+        Returns:
+            The detected loop, or None.
+        """
+        self._pending = fingerprint
+        if not self._steps:
+            return None
+
+        last_fingerprint, last_signature, last_name = self._steps[-1]
+        if last_name in _IDLE_ACTIONS or not self._same(last_fingerprint, fingerprint):
+            self._stalled = 0
+            self.unchanged_steps = 0
+            return self._find_cycle(fingerprint)
+
+        self.unchanged_steps += 1
+        if self._stalled and len(self._steps) > 1 and self._steps[-2][1] == last_signature:
+            self._stalled += 1
+        else:
+            self._stalled = 1
+        if self._stalled >= self.stall_repeats:
+            return LoopVerdict("stall", self._stalled, 1, [last_signature])
+        return self._find_cycle(fingerprint)
+
+    def _find_cycle(self, fingerprint: int) -> Optional[LoopVerdict]:
+        steps = list(self._steps)
+        for period in range(2, self.max_period + 1):
+            span = period * self.cycle_repeats
+            if len(steps) < span or not self._same(steps[-period][0], fingerprint):
+                continue
+            recent = steps[-span:]
+            if all(
+                recent[i][1] == recent[i + period][1] and self._same(recent[i][0], recent[i + period][0])
+                for i in range(span - period)
+            ):
+                return LoopVerdict("cycle", self.cycle_repeats, period, [s[1] for s in recent[-period:]])
+        return None
+
+    def record_action(self, action: Action) -> None:
+        """
+        Record the action executed on the last observed screen.
+
+        Args:
+            action: Parsed action.
+        """
+        if self._pending is None:
+            return
+        self._steps.append((self._pending, action_signature(action), action.name))
+        self._pending = None
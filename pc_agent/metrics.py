@@ -0,0 +1,289 @@
+"""Prometheus-style metrics for agent fleets."""
+
+import atexit
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Seconds; covers sub-millisecond phases up to multi-minute model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing counter with optional labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        """Increase the counter for the given label values."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        """Get the current value for the given label values."""
+        return self._values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> Dict[LabelKey, float]:
+        """Copy the values of every label set."""
+        with self._lock:
+            return dict(self._values)
+
+    def load(self, values: Dict[LabelKey, float], **labels: object) -> None:
+        """Replace label sets with values from a snapshot, adding ``labels`` to each."""
+        with self._lock:
+            for key, value in values.items():
+                self._values[_label_key({**dict(key), **labels})] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """A histogram with cumulative buckets, sum and count per label set."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: object) -> None:
+        """Record one observation for the given label values."""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels: object) -> float:
+        """Get the number of observations for the given label values."""
+        data = self._values.get(_label_key(labels))
+        return data[-1] if data else 0.0
+
+    def snapshot(self) -> Dict[LabelKey, List[float]]:
+        """Copy the buckets, sum and count of every label set."""
+        with self._lock:
+            return {key: list(data) for key, data in self._values.items()}
+
+    def load(self, values: Dict[LabelKey, List[float]], **labels: object) -> None:
+        """Replace label sets with values from a snapshot, adding ``labels`` to each."""
+        with self._lock:
+            for key, data in values.items():
+                self._values[_label_key({**dict(key), **labels})] = list(data)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(data)) for key, data in self._values.items())
+        lines = []
+        for key, data in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, data):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {_format_value(data[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(data[-1])}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[Union[Counter, Histogram]] = []
+
+    def register(self, metric: Union[Counter, Histogram]) -> Union[Counter, Histogram]:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, help, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[LabelKey, object]]:
+        """Copy every metric's values, e.g. to send them to another process."""
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def load(self, snapshot: Dict[str, Dict[LabelKey, object]], **labels: object) -> None:
+        """
+        Merge a snapshot from another process into this registry.
+
+        The snapshot's label sets replace earlier ones with the same labels,
+        so loading a process's cumulative snapshot repeatedly is safe.
+
+        Args:
+            snapshot: Output of ``snapshot()`` on an identical registry.
+            **labels: Labels telling the source apart, e.g. its display.
+        """
+        for metric in self._metrics:
+            if metric.name in snapshot:
+                metric.load(snapshot[metric.name], **labels)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format 0.0.4."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STEP_PHASE_SECONDS = REGISTRY.histogram(
+    "pc_agent_step_phase_seconds", "Time spent in each phase of an agent step.")
+MODEL_REQUEST_SECONDS = REGISTRY.histogram(
+    "pc_agent_model_request_seconds", "Model request latency, excluding queueing.")
+MODEL_QUEUE_SECONDS = REGISTRY.histogram(
+    "pc_agent_model_queue_seconds", "Time model requests waited for a slot.")
+MODEL_TTFT_SECONDS = REGISTRY.histogram(
+    "pc_agent_model_ttft_seconds", "Model time to first token (streaming requests).")
+TOKENS = REGISTRY.counter(
+    "pc_agent_tokens_total", "Model tokens by direction (in = prompt, out = completion).")
+IMAGE_BYTES = REGISTRY.counter(
+    "pc_agent_image_bytes_total", "Encoded screenshot bytes sent to the model.")
+PARSE_FAILURES = REGISTRY.counter(
+    "pc_agent_parse_failures_total", "Model outputs that fell back to Wait, by reason.")
+ACTIONS = REGISTRY.counter(
+    "pc_agent_actions_total", "Executed actions by action type and outcome.")
+TASKS = REGISTRY.counter(
+    "pc_agent_tasks_total", "Finished tasks by outcome.")
+PLAN_CACHE_STEPS = REGISTRY.counter(
+    "pc_agent_plan_cache_steps_total", "Steps served from the plan cache (hit), diverged from it (miss) or left to the model "
+    "because they produce a value (value).")
+LOOP_RECOVERIES = REGISTRY.counter(
+    "pc_agent_loop_recoveries_total", "Detected action loops by kind and the recovery applied.")
+TAP_SNAPS = REGISTRY.counter(
+    "pc_agent_tap_snaps_total", "Taps moved onto a nearby UI element.")
+FRAME_CACHE_LOOKUPS = REGISTRY.counter(
+    "pc_agent_frame_cache_lookups_total", "Encoded-frame cache lookups by outcome (hit, miss).")
+PHASE_TIMEOUTS = REGISTRY.counter(
+    "pc_agent_phase_timeouts_total", "Agent phases abandoned after their deadline, by phase.")
+SPECULATIONS = REGISTRY.counter(
+    "pc_agent_speculations_total", "Speculative next-step requests, used (hit) or reissued (miss).")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry on /metrics."""
+
+    registry: Registry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve metrics on http://host:port/metrics from a daemon thread.
+
+    Args:
+        port: Port to listen on.
+        host: Host to bind.
+        registry: Registry to expose.
+
+    Returns:
+        The running server.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def write_textfile(path: Union[str, Path], registry: Registry = REGISTRY) -> None:
+    """
+    Atomically write metrics for node_exporter's textfile collector.
+
+    Args:
+        path: Target .prom file.
+        registry: Registry to write.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def start_textfile_writer(
+    path: Union[str, Path], interval: float = 15.0, registry: Registry = REGISTRY
+) -> threading.Event:
+    """
+    Periodically rewrite a metrics textfile, and once more at exit.
+
+    Args:
+        path: Target .prom file.
+        interval: Seconds between writes.
+        registry: Registry to write.
+
+    Returns:
+        Event that stops the writer when set.
+    """
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval):
+            write_textfile(path, registry)
+
+    threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
+    atexit.register(write_textfile, path, registry)
+    return stop
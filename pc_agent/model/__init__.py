@@ -1,5 +1,14 @@
 """Model client module for AI inference."""
 
-from pc_agent.model.client import ModelClient, ModelConfig
+from pc_agent.lazy import lazy_exports
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = ["ModelClient", "ModelConfig", "Priority", "RequestCancelled", "RequestScheduler", "SchedulerFull"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ModelClient": "pc_agent.model.client",
+    "ModelConfig": "pc_agent.model.client",
+    "Priority": "pc_agent.model.scheduler",
+    "RequestCancelled": "pc_agent.model.client",
+    "RequestScheduler": "pc_agent.model.scheduler",
+    "SchedulerFull": "pc_agent.model.scheduler",
+})
@@ -1,10 +1,21 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
+import copy
 import json
-from dataclasses import dataclass, field
-from typing import Any
+import threading
+import time
+import uuid
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
 
-from openai import OpenAI
+from pc_agent.model.scheduler import Priority, RequestScheduler
+from pc_agent.model.usage import estimate_prompt_tokens, estimate_text_tokens
+from pc_agent.tracing import get_tracer
+
+
+class RequestCancelled(RuntimeError):
+    """Raised when a request is cancelled before its reply is complete."""
 
 
 @dataclass
@@ -19,6 +30,11 @@ class ModelConfig:
     top_p: float = 0.85
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
+    stream: bool = False  # stream tokens, which also measures time-to-first-token
+    request_timeout: float = 60.0  # seconds before the HTTP client gives up on a request (or a stalled stream)
+    max_retries: int = 2  # HTTP client retries; keep the agent's model deadline >= request_timeout * (max_retries + 1)
+    input_cost_per_mtok: float = 0.0  # price per million prompt tokens, for cost accounting
+    output_cost_per_mtok: float = 0.0  # price per million completion tokens
 
 
 @dataclass
@@ -28,6 +44,11 @@ class ModelResponse:
     thinking: str
     action: str
     raw_content: str
+    usage: dict[str, int] = field(default_factory=dict)
+    usage_estimated: bool = False  # True when the server omitted usage
+    queue_wait: float = 0.0  # seconds waiting for a request slot
+    model_time: float = 0.0  # seconds spent in the model call itself
+    ttft: float | None = None  # seconds to the first content token (streaming only)
 
 
 class ModelClient:
@@ -36,26 +57,143 @@ class ModelClient:
 
     Args:
         config: Model configuration.
+        limiter: Optional context manager held around each request, e.g. a
+            semaphore shared between processes to cap in-flight requests.
+        scheduler: Optional RequestScheduler shared by the clients in this
+            process, enforcing a global in-flight cap, fairness and priorities.
+        agent_id: Identity used for fairness by the scheduler.
+        priority: Scheduler priority of this client's requests.
     """
 
-    def __init__(self, config: ModelConfig | None = None):
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        limiter: AbstractContextManager | None = None,
+        scheduler: RequestScheduler | None = None,
+        agent_id: str | None = None,
+        priority: Priority = Priority.BATCH,
+    ):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+        self.limiter = limiter if limiter is not None else nullcontext()
+        self.scheduler = scheduler
+        self.agent_id = agent_id or uuid.uuid4().hex[:8]
+        self.priority = priority
+        from openai import OpenAI  # imported on first use: it dominates import time
+
+        self.client = OpenAI(
+            base_url=self.config.base_url,
+            api_key=self.config.api_key,
+            timeout=self.config.request_timeout,
+            max_retries=self.config.max_retries,
+        )
+
+    def derive(
+        self, agent_id: str, priority: Priority | None = None, model_name: str | None = None
+    ) -> "ModelClient":
+        """
+        Create a client for another agent that shares this one's connections.
+
+        Args:
+            agent_id: Identity of the new agent for scheduler fairness.
+            priority: Optional priority override.
+            model_name: Optional model to request instead, on the same server.
 
-    def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        Returns:
+            A ModelClient reusing the same HTTP client, limiter and scheduler.
+        """
+        derived = copy.copy(self)
+        derived.agent_id = agent_id
+        if priority is not None:
+            derived.priority = priority
+        if model_name is not None:
+            derived.config = replace(self.config, model_name=model_name)
+        return derived
+
+    def warmup(self) -> bool:
+        """
+        Open a connection to the inference server ahead of the first request.
+
+        The underlying HTTP client keeps the connection alive, so later
+        requests skip the TCP/TLS handshake.
+
+        Returns:
+            True if the server answered, False otherwise.
+        """
+        try:
+            self.client.models.list()
+            return True
+        except Exception:
+            return False
+
+    def request(
+        self,
+        messages: list[dict[str, Any]],
+        on_token: Callable[[str], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> ModelResponse:
         """
         Send a request to the model.
 
         Args:
             messages: List of message dictionaries in OpenAI format.
+            on_token: Optional callback receiving each content delta as it
+                arrives; only called when streaming is enabled.
+            cancel: Optional event that abandons the request once set: it is
+                checked when a request slot is granted and, when streaming,
+                between chunks (the stream is closed). A blocking request
+                already sent runs to completion.
 
         Returns:
             ModelResponse containing thinking and action.
 
         Raises:
             ValueError: If the response cannot be parsed.
+            SchedulerFull: If the shared scheduler refuses the request.
+            RequestCancelled: If ``cancel`` was set first.
         """
-        response = self.client.chat.completions.create(
+        tracer = get_tracer()
+        queued_at = time.perf_counter()
+        slot = self.scheduler.slot(self.agent_id, self.priority) if self.scheduler else nullcontext()
+        with self.limiter, slot:
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled("Request cancelled before it was sent")
+            started_at = time.perf_counter()
+            if self.config.stream:
+                raw_content, usage, ttft = self._request_stream(messages, started_at, on_token, cancel)
+            else:
+                raw_content, usage, ttft = self._request_blocking(messages)
+            finished_at = time.perf_counter()
+
+        usage_estimated = not usage
+        if usage_estimated:
+            usage = {
+                "prompt_tokens": estimate_prompt_tokens(messages),
+                "completion_tokens": estimate_text_tokens(raw_content),
+            }
+
+        tracer.add("model.queue", queued_at, started_at - queued_at)
+        tracer.add("model.request", started_at, finished_at - started_at, ttft=ttft, **usage)
+        if ttft is not None:
+            tracer.add("model.ttft", started_at, ttft)
+
+        # Parse thinking and action from response
+        with tracer.span("model.parse"):
+            thinking, action = self._parse_response(raw_content)
+
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=raw_content,
+            usage=usage,
+            usage_estimated=usage_estimated,
+            queue_wait=started_at - queued_at,
+            model_time=finished_at - started_at,
+            ttft=ttft,
+        )
+
+    def _create(self, messages: list[dict[str, Any]], **kwargs: Any) -> Any:
+        """Call the chat completions endpoint with the configured sampling parameters."""
+        return self.client.chat.completions.create(
             messages=messages,
             model=self.config.model_name,
             max_tokens=self.config.max_tokens,
@@ -63,17 +201,55 @@ class ModelClient:
             top_p=self.config.top_p,
             frequency_penalty=self.config.frequency_penalty,
             extra_body=self.config.extra_body,
-            stream=False,
+            **kwargs,
         )
 
-        raw_content = response.choices[0].message.content
-
-        # Parse thinking and action from response
-        thinking, action = self._parse_response(raw_content)
+    def _request_blocking(self, messages: list[dict[str, Any]]) -> tuple[str, dict[str, int], None]:
+        """Send a non-streaming request, returning (content, usage, ttft)."""
+        response = self._create(messages, stream=False)
+        return response.choices[0].message.content, self._usage_dict(response.usage), None
+
+    def _request_stream(
+        self,
+        messages: list[dict[str, Any]],
+        started_at: float,
+        on_token: Callable[[str], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> tuple[str, dict[str, int], float | None]:
+        """Send a streaming request, returning (content, usage, ttft)."""
+        stream = self._create(messages, stream=True, stream_options={"include_usage": True})
+        parts = []
+        usage = {}
+        ttft = None
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                stream.close()  # drops the connection, so the server stops generating
+                raise RequestCancelled("Request cancelled while streaming")
+            if getattr(chunk, "usage", None):
+                usage = self._usage_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if ttft is None:
+                    ttft = time.perf_counter() - started_at
+                parts.append(delta)
+                if on_token is not None:
+                    on_token(delta)
+        return "".join(parts), usage, ttft
 
-        return ModelResponse(thinking=thinking, action=action, raw_content=raw_content)
+    @staticmethod
+    def _usage_dict(usage: Any) -> dict[str, int]:
+        """Convert an OpenAI usage object to a plain dict (empty if absent)."""
+        if not usage:
+            return {}
+        return {
+            "prompt_tokens": usage.prompt_tokens or 0,
+            "completion_tokens": usage.completion_tokens or 0,
+        }
 
-    def _parse_response(self, content: str) -> tuple[str, str]:
+    @staticmethod
+    def _parse_response(content: str) -> tuple[str, str]:
         """
         Parse the model response into thinking and action parts.
 
@@ -135,7 +311,10 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str,
+        image_base64: str | None = None,
+        image_format: str = "png",
+        image_part: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
@@ -143,17 +322,22 @@ class MessageBuilder:
         Args:
             text: Text content.
             image_base64: Optional base64-encoded image.
+            image_format: Encoding of the image, e.g. "png" or "jpeg".
+            image_part: Ready-made image_url part to use instead of
+                ``image_base64`` (see ``pc_agent.pc.screenshot.image_part``).
 
         Returns:
             Message dictionary.
         """
         content = []
 
-        if image_base64:
+        if image_part is not None:
+            content.append(image_part)
+        elif image_base64:
             content.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    "image_url": {"url": f"data:image/{image_format};base64,{image_base64}"},
                 }
             )
 
@@ -184,16 +368,26 @@ class MessageBuilder:
         return message
 
     @staticmethod
-    def build_screen_info(current_app: str, **extra_info) -> str:
+    def build_screen_info(
+        current_app: str, ui_tree: str | None = None, notes: str | None = None, **extra_info
+    ) -> str:
         """
         Build screen info string for the model.
 
         Args:
             current_app: Current app name.
+            ui_tree: Optional accessibility tree of the focused window, as
+                formatted by ``format_ui_tree``; appended after the JSON.
+            notes: Optional scratchpad contents recorded with Note/Call_API.
             **extra_info: Additional info to include.
 
         Returns:
-            JSON string with screen info.
+            JSON string with screen info, followed by the UI tree and notes if given.
         """
         info = {"current_app": current_app, **extra_info}
-        return json.dumps(info, ensure_ascii=False)
+        text = json.dumps(info, ensure_ascii=False)
+        if ui_tree:
+            text += f"\n界面元素 (坐标为元素中心):\n{ui_tree}"
+        if notes:
+            text += f"\n已记录的内容:\n{notes}"
+        return text
@@ -0,0 +1,178 @@
+"""Shared scheduler for model requests with concurrency limits and priorities."""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Iterator
+
+
+class Priority(IntEnum):
+    """Request priority; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class SchedulerFull(RuntimeError):
+    """Raised when a request is refused by admission control."""
+
+
+@dataclass
+class _Waiter:
+    """A request waiting for an in-flight slot."""
+
+    agent_id: str
+    priority: int
+    seq: int
+    granted: bool = False
+
+
+@dataclass
+class SchedulerStats:
+    """Snapshot of scheduler counters."""
+
+    in_flight: int
+    queued: int
+    admitted: int
+    rejected: int
+    total_queue_wait: float
+
+    @property
+    def mean_queue_wait(self) -> float:
+        """Average time an admitted request spent queued, in seconds."""
+        return self.total_queue_wait / self.admitted if self.admitted else 0.0
+
+
+class RequestScheduler:
+    """
+    Gate in front of the inference server shared by every ModelClient in a process.
+
+    At most ``max_in_flight`` requests run at once. When a slot frees up it
+    goes to the waiting request with the best priority; among equal
+    priorities the agent that was served least recently wins, so one busy
+    agent cannot starve the others. Once ``max_queue`` requests are waiting,
+    new ones are rejected with SchedulerFull instead of piling up.
+
+    Args:
+        max_in_flight: Maximum concurrent model requests.
+        max_queue: Maximum number of waiting requests before rejecting.
+        admission_timeout: Maximum seconds a request may wait for a slot,
+            or None to wait indefinitely.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        max_queue: int = 64,
+        admission_timeout: float | None = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.admission_timeout = admission_timeout
+
+        self._cond = threading.Condition()
+        self._waiters: list[_Waiter] = []
+        self._in_flight = 0
+        self._seq = 0
+        self._grants = 0
+        self._last_served: dict[str, int] = {}
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+
+    def acquire(self, agent_id: str, priority: int = Priority.BATCH) -> float:
+        """
+        Wait for an in-flight slot.
+
+        Args:
+            agent_id: Identity used for fairness between agents.
+            priority: Request priority.
+
+        Returns:
+            Seconds spent waiting in the queue.
+
+        Raises:
+            SchedulerFull: If the queue is full or the admission timeout expires.
+        """
+        start = time.perf_counter()
+        with self._cond:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._grant(agent_id)
+                return 0.0
+
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise SchedulerFull(f"Model request queue is full ({self.max_queue} waiting)")
+
+            self._seq += 1
+            waiter = _Waiter(agent_id=agent_id, priority=int(priority), seq=self._seq)
+            self._waiters.append(waiter)
+            deadline = None if self.admission_timeout is None else start + self.admission_timeout
+            while not waiter.granted:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._waiters.remove(waiter)
+                    self._rejected += 1
+                    raise SchedulerFull(f"Timed out after {self.admission_timeout}s waiting for a model slot")
+                self._cond.wait(remaining)
+
+            wait = time.perf_counter() - start
+            self._total_wait += wait
+            return wait
+
+    def release(self) -> None:
+        """Free an in-flight slot and hand it to the next waiter."""
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, agent_id: str, priority: int = Priority.BATCH) -> Iterator[float]:
+        """
+        Hold an in-flight slot for the duration of a request.
+
+        Yields:
+            Seconds spent waiting in the queue.
+        """
+        wait = self.acquire(agent_id, priority)
+        try:
+            yield wait
+        finally:
+            self.release()
+
+    def stats(self) -> SchedulerStats:
+        """Get a snapshot of the scheduler counters."""
+        with self._cond:
+            return SchedulerStats(
+                in_flight=self._in_flight,
+                queued=len(self._waiters),
+                admitted=self._admitted,
+                rejected=self._rejected,
+                total_queue_wait=self._total_wait,
+            )
+
+    def _grant(self, agent_id: str) -> None:
+        """Account for a request entering flight. Caller holds the lock."""
+        self._in_flight += 1
+        self._grants += 1
+        self._last_served[agent_id] = self._grants
+        self._admitted += 1
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the best waiters. Caller holds the lock."""
+        granted = False
+        while self._waiters and self._in_flight < self.max_in_flight:
+            waiter = min(
+                self._waiters,
+                key=lambda w: (w.priority, self._last_served.get(w.agent_id, 0), w.seq),
+            )
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self._grant(waiter.agent_id)
+            granted = True
+        if granted:
+            self._cond.notify_all()
@@ -0,0 +1,142 @@
+"""Token usage accounting and local estimation."""
+
+import base64
+import struct
+from dataclasses import dataclass
+from typing import Any
+
+# Vision encoders in the GLM/Qwen family emit one token per 28x28 pixel patch
+IMAGE_PATCH_PIXELS = 28
+# Upper bound on tokens for one image, matching common server-side resizing
+MAX_IMAGE_TOKENS = 16384
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text.
+
+    CJK characters count as one token each; everything else as one token
+    per four characters, which is close enough for budget enforcement.
+
+    Args:
+        text: The text.
+
+    Returns:
+        Estimated token count.
+    """
+    cjk = sum(1 for ch in text if "⺀" <= ch <= "鿿" or "가" <= ch <= "힯")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def image_size_from_base64(data: str) -> tuple[int, int] | None:
+    """
+    Read the pixel size of a base64 PNG or JPEG without decoding the image.
+
+    Args:
+        data: Base64 image payload, optionally as a data URL.
+
+    Returns:
+        (width, height), or None if the format is not recognised.
+    """
+    if data.startswith("data:"):
+        data = data.split(",", 1)[-1]
+    head = base64.b64decode(data[:64] + "=" * (-len(data[:64]) % 4))
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        return struct.unpack(">II", head[16:24])
+    if head.startswith(b"\xff\xd8"):
+        raw = base64.b64decode(data)
+        index = 2
+        while index + 9 < len(raw):
+            if raw[index] != 0xFF:
+                index += 1
+                continue
+            marker = raw[index + 1]
+            length = struct.unpack(">H", raw[index + 2:index + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", raw[index + 5:index + 9])
+                return width, height
+            index += 2 + length
+    return None
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Estimate the tokens a vision model spends on an image of the given size."""
+    patches = -(-width // IMAGE_PATCH_PIXELS) * -(-height // IMAGE_PATCH_PIXELS)
+    return min(patches, MAX_IMAGE_TOKENS)
+
+
+def estimate_prompt_tokens(messages: list[dict[str, Any]]) -> int:
+    """
+    Estimate the prompt tokens of an OpenAI-format message list.
+
+    Args:
+        messages: Chat messages, possibly with image_url parts.
+
+    Returns:
+        Estimated token count.
+    """
+    total = 0
+    for message in messages:
+        total += 4  # role and framing
+        content = message.get("content")
+        if isinstance(content, str):
+            total += estimate_text_tokens(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                total += estimate_text_tokens(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                size = image_size_from_base64(part["image_url"]["url"])
+                total += estimate_image_tokens(*size) if size else MAX_IMAGE_TOKENS // 4
+    return total
+
+
+@dataclass
+class TaskUsage:
+    """Token, image and request totals accumulated over one task."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    image_bytes: int = 0
+    requests: int = 0
+    estimated_requests: int = 0  # requests whose usage was estimated locally
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add_response(self, usage: dict[str, int], estimated: bool = False) -> None:
+        """Add the usage of one model response."""
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+        self.requests += 1
+        if estimated:
+            self.estimated_requests += 1
+
+    def cost(self, input_cost_per_mtok: float, output_cost_per_mtok: float) -> float:
+        """Get the cost of the task given per-million-token prices."""
+        return (
+            self.prompt_tokens * input_cost_per_mtok + self.completion_tokens * output_cost_per_mtok
+        ) / 1_000_000
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int]) -> "TaskUsage":
+        """Rebuild totals saved with as_dict()."""
+        return cls(
+            prompt_tokens=data.get("prompt_tokens", 0),
+            completion_tokens=data.get("completion_tokens", 0),
+            image_bytes=data.get("image_bytes", 0),
+            requests=data.get("requests", 0),
+            estimated_requests=data.get("estimated_requests", 0),
+        )
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the totals as a plain dictionary."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "image_bytes": self.image_bytes,
+            "requests": self.requests,
+            "estimated_requests": self.estimated_requests,
+        }
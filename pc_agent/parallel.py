@@ -0,0 +1,400 @@
+"""Parallel task execution: one agent per isolated Xvfb display."""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class XvfbDisplay:
+    """
+    A private Xvfb X server.
+
+    Args:
+        number: Display number, e.g. 99 for ":99".
+        width: Screen width in pixels.
+        height: Screen height in pixels.
+        depth: Colour depth.
+    """
+
+    def __init__(self, number: int, width: int = 1920, height: int = 1080, depth: int = 24):
+        self.number = number
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def name(self) -> str:
+        """The X display name, e.g. ":99"."""
+        return f":{self.number}"
+
+    def start(self, timeout: float = 10.0) -> "XvfbDisplay":
+        """
+        Start the X server and wait until it accepts connections.
+
+        Raises:
+            RuntimeError: If Xvfb is missing or does not come up in time.
+        """
+        if shutil.which("Xvfb") is None:
+            raise RuntimeError("Xvfb not found; install it (e.g. apt install xvfb)")
+
+        self.process = subprocess.Popen(
+            [
+                "Xvfb", self.name,
+                "-screen", "0", f"{self.width}x{self.height}x{self.depth}",
+                "-nolisten", "tcp",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        socket_path = Path(f"/tmp/.X11-unix/X{self.number}")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Xvfb {self.name} exited with code {self.process.returncode}")
+            if socket_path.exists():
+                return self
+            time.sleep(0.05)
+        self.stop()
+        raise RuntimeError(f"Xvfb {self.name} did not start within {timeout}s")
+
+    def stop(self) -> None:
+        """Terminate the X server."""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self) -> "XvfbDisplay":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def find_free_displays(count: int, start: int = 99) -> List[int]:
+    """
+    Find display numbers that have no X server lock file.
+
+    Args:
+        count: How many display numbers to return.
+        start: First display number to try.
+
+    Returns:
+        List of free display numbers.
+    """
+    numbers = []
+    number = start
+    while len(numbers) < count:
+        if not Path(f"/tmp/.X{number}-lock").exists() and not Path(f"/tmp/.X11-unix/X{number}").exists():
+            numbers.append(number)
+        number += 1
+    return numbers
+
+
+class _TrackedLimiter:
+    """
+    The shared request limiter, counting the slots this worker holds.
+
+    If the supervisor kills a hung worker, it returns the counted slots so
+    the other workers do not lose model capacity. A slot is counted before
+    it is acquired, so a worker killed in between (or while waiting for
+    it) is over-counted, which at worst lets one more request through,
+    rather than leaking the slot for the rest of the run.
+    """
+
+    def __init__(self, limiter: Any, held: Any):
+        self.limiter = limiter
+        self.held = held
+
+    def __enter__(self) -> None:
+        with self.held.get_lock():
+            self.held.value += 1
+        try:
+            self.limiter.acquire()
+        except BaseException:
+            with self.held.get_lock():
+                self.held.value -= 1
+            raise
+
+    def __exit__(self, *exc: Any) -> None:
+        with self.held.get_lock():
+            self.held.value -= 1
+        self.limiter.release()
+
+
+def _display_worker(
+    display: str,
+    task_queue: "multiprocessing.Queue",
+    result_queue: "multiprocessing.Queue",
+    model_config: Any,
+    agent_config: Any,
+    limiter: Any,
+    held: Any,
+) -> None:
+    """
+    Worker process: pin to one display, then run tasks until the queue is drained.
+
+    Desktop automation is imported only after the display is pinned, so
+    pyautogui connects to this worker's X server. Each task is announced
+    before it runs, so the supervisor can spot a worker stuck on one, and
+    followed by a snapshot of the worker's metrics for the supervisor to
+    aggregate.
+    """
+    os.environ["DISPLAY"] = display
+
+    from pc_agent.logs import setup_logging
+    setup_logging()
+
+    from pc_agent import metrics
+    from pc_agent.batch import create_unattended_agent, run_batch_task
+    from pc_agent.model.client import ModelClient
+    from pc_agent.pc import LocalBackend
+
+    model_client = ModelClient(model_config, limiter=_TrackedLimiter(limiter, held))
+    model_client.warmup()
+    agent = create_unattended_agent(model_client, agent_config, backend=LocalBackend(display=display))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        result_queue.put({"started": task.id, "display": display})
+        record = run_batch_task(agent, task, agent_config)
+        record["display"] = display
+        result_queue.put({"metrics": metrics.REGISTRY.snapshot(), "display": display})
+        result_queue.put(record)
+
+
+def _hung_record(task: Any, display: str, elapsed: float) -> Dict[str, Any]:
+    """Results record for a task whose worker was killed."""
+    return {
+        "id": task.id,
+        "task": task.task,
+        "success": False,
+        "message": f"Worker hung for {elapsed:.0f}s and was restarted",
+        "steps": 0,
+        "wall_time": round(elapsed, 3),
+        "stop_reason": "hung",
+        "usage": {},
+        "cost": 0.0,
+        "timings": {},
+        "display": display,
+    }
+
+
+def _task_bound(task: Any, agent_config: Any) -> Optional[float]:
+    """
+    Seconds after which a worker still on a task counts as hung, before the grace period.
+
+    The task timeout is only checked between steps, so one worst-case step
+    is added to it; without a timeout, every step may take the worst case.
+
+    Returns:
+        The bound, or None if a phase has no deadline and there is no timeout.
+    """
+    from pc_agent.watchdog import step_bound
+
+    timeout = task.timeout if task.timeout is not None else agent_config.timeout
+    step = step_bound(agent_config.phase_deadlines, agent_config.phase_retries)
+    if step is not None:
+        step += agent_config.settle_time
+    if timeout is None:
+        return None if step is None else (task.max_steps or agent_config.max_steps) * step
+    return timeout + (step or 0.0)
+
+
+def run_on_displays(
+    tasks: List[Any],
+    num_displays: int,
+    model_config: Any = None,
+    agent_config: Any = None,
+    max_model_concurrency: Optional[int] = None,
+    resolution: Tuple[int, int] = (1920, 1080),
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+    hang_grace: float = 120.0,
+) -> List[Dict[str, Any]]:
+    """
+    Run tasks across N agents, each on its own Xvfb display.
+
+    Every worker process owns one virtual display and pulls tasks from a
+    shared queue, so a slow task never blocks the others. Model requests
+    from all workers share a cross-process semaphore that caps how many
+    are in flight at once. Worker metrics are merged into this process's
+    registry after every task, labelled with the worker's display, so
+    ``--metrics-port`` and ``--metrics-file`` cover the whole fleet.
+
+    The agent abandons phases that miss their deadlines, but a worker can
+    still wedge in native code. A worker still on a task ``hang_grace``
+    seconds after the task's bound is killed, the task is recorded with
+    stop reason "hung", and a fresh worker takes over the display. The
+    bound is the task's timeout (``BatchTask.timeout``, else the agent
+    config's) plus one step, or without a timeout ``max_steps`` worst-case
+    steps under the phase deadlines. Only tasks with neither a timeout nor
+    complete phase deadlines go unsupervised.
+
+    Args:
+        tasks: BatchTask entries to run.
+        num_displays: Number of displays / worker processes.
+        model_config: Model configuration for each worker's client.
+        agent_config: Default agent configuration.
+        max_model_concurrency: Global cap on in-flight model requests,
+            defaults to the number of displays.
+        resolution: Virtual screen size.
+        on_record: Optional callback receiving each record as it arrives.
+        hang_grace: Seconds past a task's bound before its worker is killed.
+
+    Returns:
+        List of result records, in completion order.
+    """
+    from pc_agent import metrics
+
+    if agent_config is None:
+        from pc_agent.agent import AgentConfig
+        agent_config = AgentConfig()
+
+    # spawn: workers must import pyautogui fresh, after choosing their display
+    ctx = multiprocessing.get_context("spawn")
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    limiter = ctx.BoundedSemaphore(max_model_concurrency or num_displays)
+
+    displays = [
+        XvfbDisplay(number, width=resolution[0], height=resolution[1])
+        for number in find_free_displays(num_displays)
+    ]
+    tasks_by_id = {task.id: task for task in tasks}
+    workers: Dict[str, Any] = {}  # display name -> (process, slots held)
+    running: Dict[str, Tuple[Any, float]] = {}  # display name -> (task, start time)
+    records = []
+
+    def start_worker(display: str) -> None:
+        held = ctx.Value("i", 0)
+        worker = ctx.Process(
+            target=_display_worker,
+            args=(display, task_queue, result_queue, model_config, agent_config, limiter, held),
+            name=f"agent{display}",
+        )
+        worker.start()
+        workers[display] = (worker, held)
+
+    def kill_hung(now: float) -> None:
+        for display, (task, started) in list(running.items()):
+            bound = _task_bound(task, agent_config)
+            if bound is None or now - started <= bound + hang_grace:
+                continue
+            worker, held = workers[display]
+            logger.error(f"Worker on {display} hung on task {task.id}; restarting it")
+            worker.kill()
+            worker.join(timeout=5)
+            # Request slots the dead worker held; read without the lock, which it may have died holding
+            for _ in range(held.get_obj().value):
+                try:
+                    limiter.release()
+                except ValueError:  # counted but never acquired, and every slot is free
+                    break
+            del running[display]
+            record = _hung_record(task, display, now - started)
+            records.append(record)
+            if on_record is not None:
+                on_record(record)
+            start_worker(display)  # takes over the dead worker's end-of-queue marker
+
+    try:
+        for display in displays:
+            display.start()
+        for task in tasks:
+            task_queue.put(task)
+        for display in displays:
+            task_queue.put(None)
+            start_worker(display.name)
+        print(f"🖥️  Running {len(tasks)} tasks on {len(displays)} displays")
+
+        while len(records) < len(tasks):
+            if not any(w.is_alive() for w, _ in workers.values()) and result_queue.empty():
+                logger.error("All workers exited before finishing the task queue")
+                break
+            kill_hung(time.monotonic())
+            try:
+                message = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if "metrics" in message:
+                metrics.REGISTRY.load(message["metrics"], display=message["display"])
+                continue
+            if "started" in message:
+                running[message["display"]] = (tasks_by_id[message["started"]], time.monotonic())
+                continue
+            running.pop(message["display"], None)
+            if any(r["id"] == message["id"] for r in records):
+                continue  # finished just as its worker was declared hung
+            records.append(message)
+            if on_record is not None:
+                on_record(message)
+    finally:
+        for worker, _ in workers.values():
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for display in displays:
+            display.stop()
+    return records
+
+
+def run_parallel(
+    tasks_path: Union[str, Path],
+    results_path: Union[str, Path],
+    num_displays: int,
+    model_config: Any = None,
+    agent_config: Any = None,
+    max_model_concurrency: Optional[int] = None,
+    resolution: Tuple[int, int] = (1920, 1080),
+) -> List[Dict[str, Any]]:
+    """
+    Run a JSONL task file across N agents, each on its own Xvfb display.
+
+    Args:
+        tasks_path: Path to the JSONL task file (same format as --batch).
+        results_path: Path of the JSONL results file to write.
+        num_displays: Number of displays / worker processes.
+        model_config: Model configuration for each worker's client.
+        agent_config: Default agent configuration.
+        max_model_concurrency: Global cap on in-flight model requests,
+            defaults to the number of displays.
+        resolution: Virtual screen size.
+
+    Returns:
+        List of result records, in completion order.
+    """
+    from pc_agent.batch import load_tasks, print_summary
+
+    tasks = load_tasks(tasks_path)
+    written = []
+    batch_start = time.perf_counter()
+    with open(results_path, "w", encoding="utf-8") as out:
+        def write(record: Dict[str, Any]) -> None:
+            written.append(record)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"📋 [{len(written)}/{len(tasks)}] {record['id']} on {record['display']}: "
+                  f"{'✅' if record['success'] else '❌'} {record['message']}")
+
+        records = run_on_displays(
+            tasks, num_displays, model_config, agent_config,
+            max_model_concurrency=max_model_concurrency, resolution=resolution, on_record=write,
+        )
+
+    print_summary(records, time.perf_counter() - batch_start, results_path)
+    return records
@@ -1,26 +1,28 @@
 """PC utilities for desktop interaction."""
 
-from pc_agent.pc.controller import (
-    back,
-    double_tap,
-    get_current_app,
-    home,
-    launch_app,
-    long_press,
-    swipe,
-    tap,
-)
-from pc_agent.pc.input import (
-    clear_text,
-    type_text,
-    press_key,
-)
-from pc_agent.pc.screenshot import get_screenshot, Screenshot
+from pc_agent.lazy import lazy_exports
 
 __all__ = [
+    # Backends
+    "Backend",
+    "LocalBackend",
+    "pin_display",
     # Screenshot
     "get_screenshot",
     "Screenshot",
+    "dhash",
+    "hash_distance",
+    "FrameCache",
+    "FRAME_CACHE",
+    # Accessibility tree
+    "AccessibilityProvider",
+    "AtspiProvider",
+    "FakeAccessibilityProvider",
+    "UINode",
+    "format_ui_tree",
+    # Tap snapping (needs NumPy)
+    "TapSnapper",
+    "snapping_available",
     # Input
     "type_text",
     "clear_text",
@@ -35,3 +37,20 @@ __all__ = [
     "long_press",
     "launch_app",
 ]
+
+# Submodules load PIL, NumPy and the input libraries, so they are imported on first use
+_MODULES = {
+    "pc_agent.pc.backend": ["Backend", "LocalBackend"],
+    "pc_agent.pc.display": ["pin_display"],
+    "pc_agent.pc.screenshot": ["get_screenshot", "Screenshot", "dhash", "hash_distance", "screenshot_dhash"],
+    "pc_agent.pc.frame_cache": ["FrameCache", "FRAME_CACHE"],
+    "pc_agent.pc.accessibility": [
+        "AccessibilityProvider", "AtspiProvider", "FakeAccessibilityProvider", "UINode", "format_ui_tree",
+    ],
+    "pc_agent.pc.snapping": ["TapSnapper", "snapping_available"],
+    "pc_agent.pc.input": ["type_text", "clear_text", "press_key"],
+    "pc_agent.pc.controller": [
+        "get_current_app", "tap", "swipe", "back", "home", "double_tap", "long_press", "launch_app",
+    ],
+}
+__getattr__, __dir__ = lazy_exports(__name__, {name: module for module, names in _MODULES.items() for name in names})
@@ -0,0 +1,235 @@
+"""Accessibility-tree observations: a compact text view of the focused window."""
+
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Bounds = Tuple[int, int, int, int]  # x, y, width, height in logical screen pixels
+
+# Roles worth listing even when they have no name
+INTERACTIVE_ROLES = {
+    "push button", "toggle button", "check box", "radio button", "menu item", "check menu item",
+    "radio menu item", "link", "entry", "password text", "text", "combo box", "list item",
+    "page tab", "slider", "spin button", "tree item", "table cell", "icon", "menu",
+}
+
+# States shown next to an element
+SHOWN_STATES = ("focused", "checked", "selected", "expanded", "disabled")
+
+
+@dataclass
+class UINode:
+    """An element of an accessibility tree."""
+
+    role: str
+    name: str = ""
+    bounds: Optional[Bounds] = None
+    value: str = ""  # text content of editable elements
+    states: List[str] = field(default_factory=list)
+    children: List["UINode"] = field(default_factory=list)
+
+
+def format_ui_tree(
+    root: UINode, screen_width: int, screen_height: int, max_chars: int = 3000
+) -> Tuple[str, int]:
+    """
+    Render a UI tree as compact indented text for the model.
+
+    Unnamed containers are flattened away, elements without bounds or
+    outside the screen are dropped, and positions are element centers in
+    the model's 0-1000 coordinates, so a line can be turned into a Tap
+    directly. Output stops at ``max_chars`` with a note of what was left out.
+
+    Args:
+        root: Root of the tree, usually the focused window.
+        screen_width: Logical screen width.
+        screen_height: Logical screen height.
+        max_chars: Size cap of the text.
+
+    Returns:
+        (text, number of elements listed).
+    """
+    lines: List[str] = []
+    size = 0
+    skipped = 0
+
+    def visit(node: UINode, depth: int) -> None:
+        nonlocal size, skipped
+        listed = bool(node.name or node.value or node.role in INTERACTIVE_ROLES)
+        position = ""
+        if node.bounds:
+            x, y, w, h = node.bounds
+            if w <= 0 or h <= 0 or x + w <= 0 or y + h <= 0 or x >= screen_width or y >= screen_height:
+                return  # off screen, with its subtree
+            cx = min(max(x + w // 2, 0), screen_width - 1)
+            cy = min(max(y + h // 2, 0), screen_height - 1)
+            position = f" @[{cx * 1000 // screen_width},{cy * 1000 // screen_height}]"
+        elif depth > 0:
+            listed = False
+
+        if listed:
+            line = "  " * depth + node.role
+            if node.name:
+                line += f' "{node.name[:80]}"'
+            if node.value and node.value != node.name:
+                line += f" = {node.value[:80]!r}"
+            line += position
+            states = [s for s in SHOWN_STATES if s in node.states]
+            if states:
+                line += f" ({', '.join(states)})"
+            if size + len(line) + 1 > max_chars:
+                skipped += 1
+            else:
+                lines.append(line)
+                size += len(line) + 1
+        for child in node.children:
+            visit(child, depth + 1 if listed else depth)
+
+    visit(root, 0)
+    if skipped:
+        lines.append(f"... ({skipped} more elements)")
+    return "\n".join(lines), len(lines) - (1 if skipped else 0)
+
+
+class AccessibilityProvider(ABC):
+    """Source of the focused window's accessibility tree."""
+
+    @abstractmethod
+    def get_tree(self) -> Optional[UINode]:
+        """
+        Get the tree of the focused window.
+
+        Returns:
+            The root node, or None if no tree is available.
+        """
+
+
+class FakeAccessibilityProvider(AccessibilityProvider):
+    """
+    Provider returning a fixed tree, for tests and recorded sessions.
+
+    Args:
+        tree: Tree to return; can be replaced between steps.
+    """
+
+    def __init__(self, tree: Optional[UINode] = None):
+        self.tree = tree
+
+    def get_tree(self) -> Optional[UINode]:
+        return self.tree
+
+
+class AtspiProvider(AccessibilityProvider):
+    """
+    Linux provider reading the AT-SPI accessibility bus.
+
+    Needs PyGObject with the Atspi typelib (e.g. the ``gir1.2-atspi-2.0``
+    and ``python3-gi`` packages) and applications with accessibility
+    enabled. Each node costs D-Bus round trips, so traversal is capped by
+    node count, depth and time.
+
+    Args:
+        max_nodes: Maximum number of nodes read.
+        max_depth: Maximum tree depth read.
+        max_seconds: Time budget for one traversal.
+
+    Raises:
+        ImportError: If PyGObject or the Atspi typelib is missing.
+    """
+
+    def __init__(self, max_nodes: int = 400, max_depth: int = 30, max_seconds: float = 0.5):
+        import gi
+        gi.require_version("Atspi", "2.0")
+        from gi.repository import Atspi
+
+        self._atspi = Atspi
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_seconds = max_seconds
+
+    def _active_window(self):
+        Atspi = self._atspi
+        desktop = Atspi.get_desktop(0)
+        for i in range(desktop.get_child_count()):
+            app = desktop.get_child_at_index(i)
+            if app is None:
+                continue
+            for j in range(app.get_child_count()):
+                window = app.get_child_at_index(j)
+                if window is not None and window.get_state_set().contains(Atspi.StateType.ACTIVE):
+                    return window
+        return None
+
+    def get_tree(self) -> Optional[UINode]:
+        try:
+            window = self._active_window()
+        except Exception as e:
+            logger.warning(f"AT-SPI unavailable: {e}")
+            return None
+        if window is None:
+            return None
+        budget = {"nodes": self.max_nodes, "deadline": time.monotonic() + self.max_seconds}
+        return self._convert(window, 0, budget)
+
+    def _convert(self, accessible, depth: int, budget: dict) -> Optional[UINode]:
+        Atspi = self._atspi
+        budget["nodes"] -= 1
+        try:
+            state_set = accessible.get_state_set()
+            if not state_set.contains(Atspi.StateType.SHOWING):
+                return None
+            extents = accessible.get_extents(Atspi.CoordType.SCREEN)
+            node = UINode(
+                role=accessible.get_role_name() or "unknown",
+                name=(accessible.get_name() or "").strip(),
+                bounds=(extents.x, extents.y, extents.width, extents.height),
+            )
+            for state in SHOWN_STATES[:-1]:
+                if state_set.contains(getattr(Atspi.StateType, state.upper())):
+                    node.states.append(state)
+            if not state_set.contains(Atspi.StateType.SENSITIVE):
+                node.states.append("disabled")
+            if state_set.contains(Atspi.StateType.EDITABLE):
+                text = accessible.get_text_iface()
+                if text is not None:
+                    node.value = Atspi.Text.get_text(text, 0, min(Atspi.Text.get_character_count(text), 200))
+            count = accessible.get_child_count()
+        except Exception as e:  # elements vanish while being read
+            logger.debug(f"Skipping accessible: {e}")
+            return None
+
+        if depth < self.max_depth:
+            for i in range(count):
+                if budget["nodes"] <= 0 or time.monotonic() > budget["deadline"]:
+                    break
+                try:
+                    child = accessible.get_child_at_index(i)
+                except Exception:
+                    continue
+                if child is not None:
+                    converted = self._convert(child, depth + 1, budget)
+                    if converted is not None:
+                        node.children.append(converted)
+        return node
+
+
+def default_provider() -> Optional[AccessibilityProvider]:
+    """
+    The platform's accessibility provider.
+
+    Returns:
+        AtspiProvider on Linux when PyGObject and AT-SPI are installed,
+        otherwise None.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return AtspiProvider()
+    except (ImportError, ValueError) as e:
+        logger.warning(f"Accessibility tree unavailable ({e}); install PyGObject and AT-SPI")
+        return None
@@ -0,0 +1,139 @@
+"""Backend interface between the agent and a desktop session."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from pc_agent.pc import controller, input as pc_input, screenshot
+from pc_agent.pc.accessibility import AccessibilityProvider, UINode, default_provider
+from pc_agent.pc.display import current_display, pin_display
+from pc_agent.pc.screenshot import Screenshot
+from pc_agent.tracing import traced_sleep
+
+
+class Backend(ABC):
+    """
+    A desktop the agent can observe and drive.
+
+    The agent and ActionHandler only talk to the desktop through this
+    interface, so alternative implementations (virtual displays, recorded
+    or simulated desktops) can be swapped in without touching the loop.
+    An implementation missing any abstract method cannot be instantiated.
+    """
+
+    @abstractmethod
+    def get_screenshot(self) -> Screenshot:
+        """Capture the current screen."""
+
+    @abstractmethod
+    def get_current_app(self) -> str:
+        """Get the name of the focused app."""
+
+    def get_ui_tree(self) -> Optional[UINode]:
+        """Get the accessibility tree of the focused window, or None if unavailable."""
+        return None
+
+    @abstractmethod
+    def tap(self, x: int, y: int) -> None:
+        """Click at absolute coordinates."""
+
+    @abstractmethod
+    def double_tap(self, x: int, y: int) -> None:
+        """Double click at absolute coordinates."""
+
+    @abstractmethod
+    def long_press(self, x: int, y: int) -> None:
+        """Press and hold at absolute coordinates."""
+
+    @abstractmethod
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        """Drag between absolute coordinates."""
+
+    @abstractmethod
+    def back(self) -> None:
+        """Navigate back."""
+
+    @abstractmethod
+    def home(self) -> None:
+        """Show the desktop."""
+
+    @abstractmethod
+    def launch_app(self, app_name: str) -> bool:
+        """Launch an app, returning False if it is unknown."""
+
+    @abstractmethod
+    def type_text(self, text: str) -> None:
+        """Type text into the focused element."""
+
+    @abstractmethod
+    def clear_text(self) -> None:
+        """Clear the focused text element."""
+
+    @abstractmethod
+    def press_key(self, key: str) -> None:
+        """Press a single key."""
+
+    def wait(self, seconds: float, reason: str = "wait") -> None:
+        """Let the UI settle; recorded or simulated desktops may skip this."""
+        traced_sleep(seconds, reason)
+
+
+class LocalBackend(Backend):
+    """
+    Backend driving a real screen through pyautogui.
+
+    Args:
+        display: Optional X display (e.g. ":99") to pin this process to. It
+            must be chosen before pyautogui is first used, which in practice
+            means one display per process.
+        accessibility: Source of UI trees; defaults to the platform's
+            provider (AT-SPI on Linux), created on first use.
+    """
+
+    def __init__(self, display: Optional[str] = None, accessibility: Optional[AccessibilityProvider] = None):
+        if display:
+            pin_display(display)
+        self.display = current_display()
+        self.accessibility = accessibility
+        self._default_accessibility = accessibility is None
+
+    def get_screenshot(self) -> Screenshot:
+        return screenshot.get_screenshot()
+
+    def get_current_app(self) -> str:
+        return controller.get_current_app()
+
+    def get_ui_tree(self) -> Optional[UINode]:
+        if self._default_accessibility:
+            self.accessibility = default_provider()
+            self._default_accessibility = False
+        return self.accessibility.get_tree() if self.accessibility else None
+
+    def tap(self, x: int, y: int) -> None:
+        controller.tap(x, y)
+
+    def double_tap(self, x: int, y: int) -> None:
+        controller.double_tap(x, y)
+
+    def long_press(self, x: int, y: int) -> None:
+        controller.long_press(x, y)
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        controller.swipe(start_x, start_y, end_x, end_y)
+
+    def back(self) -> None:
+        controller.back()
+
+    def home(self) -> None:
+        controller.home()
+
+    def launch_app(self, app_name: str) -> bool:
+        return controller.launch_app(app_name)
+
+    def type_text(self, text: str) -> None:
+        pc_input.type_text(text)
+
+    def clear_text(self) -> None:
+        pc_input.clear_text()
+
+    def press_key(self, key: str) -> None:
+        pc_input.press_key(key)
@@ -2,31 +2,38 @@
 
 import os
 import subprocess
-import time
 from typing import List, Optional, Tuple
 
-import pyautogui
-from pc_agent.config.apps import APP_CONFIGS, get_app_identifier
+from pc_agent.pc.display import pyautogui
+from pc_agent.tracing import traced_sleep
+from pc_agent.config.apps import current_platform, get_app_identifier, resolve_app_name
 
+# Seconds before a helper process is killed; a hung osascript or launcher must not freeze the agent
+APP_QUERY_TIMEOUT = 5.0
+LAUNCH_TIMEOUT = 15.0
 
-def get_current_app() -> str:
+
+def get_current_app(timeout: float = APP_QUERY_TIMEOUT) -> str:
     """
     Get the currently focused app name.
 
+    Args:
+        timeout: Seconds before the query process is killed.
+
     Returns:
         The app name if recognized, otherwise "Desktop".
     """
     try:
         # macOS specific using osascript
         script = 'tell application "System Events" to get name of first process whose frontmost is true'
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
+        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=timeout)
         active_app_name = result.stdout.strip()
 
-        # Check against our config
-        for name, cfg in APP_CONFIGS.items():
-            if cfg.get("macos", {}).get("bundle_id") == active_app_name or name == active_app_name:
-                return name
-            
+        # Check against the app registry (names, identifiers and aliases)
+        name = resolve_app_name(active_app_name, fuzzy=False)
+        if name:
+            return name
+
         return active_app_name if active_app_name else "Desktop"
     except Exception as e:
         print(f"Error getting current app: {e}")
@@ -43,7 +50,7 @@ def tap(x: int, y: int, delay: float = 1.0) -> None:
         delay: Delay in seconds after click.
     """
     pyautogui.click(x, y)
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
 def double_tap(x: int, y: int, delay: float = 1.0) -> None:
@@ -56,7 +63,7 @@ def double_tap(x: int, y: int, delay: float = 1.0) -> None:
         delay: Delay in seconds after double click.
     """
     pyautogui.doubleClick(x, y)
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
 def long_press(x: int, y: int, duration_ms: int = 1000, delay: float = 1.0) -> None:
@@ -70,9 +77,9 @@ def long_press(x: int, y: int, duration_ms: int = 1000, delay: float = 1.0) -> N
         delay: Delay in seconds after long press.
     """
     pyautogui.mouseDown(x, y)
-    time.sleep(duration_ms / 1000.0)
+    traced_sleep(duration_ms / 1000.0, "hold")
     pyautogui.mouseUp()
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
 def swipe(
@@ -96,7 +103,7 @@ def swipe(
     """
     pyautogui.moveTo(start_x, start_y)
     pyautogui.dragTo(end_x, end_y, duration=duration_ms / 1000.0)
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
 def back(delay: float = 1.0) -> None:
@@ -105,7 +112,7 @@ def back(delay: float = 1.0) -> None:
     """
     with pyautogui.hold('command'):
         pyautogui.press('[')
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
 def home(delay: float = 1.0) -> None:
@@ -116,29 +123,43 @@ def home(delay: float = 1.0) -> None:
     # Command + F3 is 'Show Desktop' on many Macs
     with pyautogui.hold('command'):
         pyautogui.press('f3')
-    time.sleep(delay)
+    traced_sleep(delay, "settle")
 
 
-def launch_app(app_name: str, delay: float = 2.0) -> bool:
+def launch_app(app_name: str, delay: float = 2.0, timeout: float = LAUNCH_TIMEOUT) -> bool:
     """
     Launch an app by name.
 
     Args:
-        app_name: The app name (must be in APP_CONFIGS).
+        app_name: The app name, alias or identifier (resolved via the app registry).
         delay: Delay in seconds after launching.
+        timeout: Seconds before the launcher process is killed.
 
     Returns:
         True if app was launched, False if app not found.
     """
-    bundle_id = get_app_identifier(app_name, platform="macos")
-    if not bundle_id:
+    platform = current_platform()
+    if platform == "linux":
+        command = _linux_launch_command(app_name)
+    else:
+        bundle_id = get_app_identifier(app_name, platform="macos")
+        # macOS: open -b <bundle_id>
+        command = ['open', '-b', bundle_id] if bundle_id else None
+    if not command:
         return False
 
     try:
-        # macOS: open -b <bundle_id>
-        subprocess.run(['open', '-b', bundle_id], check=True)
-        time.sleep(delay)
+        subprocess.run(command, check=True, timeout=timeout)
+        traced_sleep(delay, "settle")
         return True
     except Exception as e:
         print(f"Error launching app {app_name}: {e}")
         return False
+
+
+def _linux_launch_command(app_name: str) -> Optional[List[str]]:
+    """Build the launch command for an app discovered from a .desktop file."""
+    desktop_id = get_app_identifier(app_name, platform="linux")
+    if desktop_id:
+        return ['gtk-launch', desktop_id]
+    return None
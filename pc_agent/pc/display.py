@@ -0,0 +1,45 @@
+"""Display selection and deferred pyautogui loading."""
+
+import os
+import sys
+from typing import Any, Optional
+
+
+class _LazyPyAutoGUI:
+    """
+    Proxy that imports pyautogui on first attribute access.
+
+    On X11, pyautogui connects to $DISPLAY when it is imported, so deferring
+    the import lets a process pick its display (see pin_display) first.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        import pyautogui as module
+
+        return getattr(module, name)
+
+
+pyautogui = _LazyPyAutoGUI()
+
+
+def pin_display(display: str) -> None:
+    """
+    Bind this process's desktop automation to an X display.
+
+    Args:
+        display: X display name, e.g. ":99".
+
+    Raises:
+        RuntimeError: If pyautogui is already connected to another display.
+    """
+    if "pyautogui" in sys.modules and os.environ.get("DISPLAY") != display:
+        raise RuntimeError(
+            f"pyautogui is already bound to display {os.environ.get('DISPLAY')!r}; "
+            f"pin {display!r} before first use or use a separate process"
+        )
+    os.environ["DISPLAY"] = display
+
+
+def current_display() -> Optional[str]:
+    """Get the X display this process automates, if any."""
+    return os.environ.get("DISPLAY")
@@ -0,0 +1,192 @@
+"""Content-addressed LRU cache of encoded screenshots."""
+
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
+
+from pc_agent import metrics
+
+FrameKey = Tuple[str, str, int, int]  # (content digest, format, width, height)
+
+
+def frame_digest(img: Image.Image) -> str:
+    """
+    Hash the pixels of a frame.
+
+    Hashing raw pixels is an order of magnitude cheaper than PNG encoding,
+    so an unchanged screen is recognised before any encoding work.
+
+    Args:
+        img: The captured frame.
+
+    Returns:
+        Hex digest identifying the frame's content.
+    """
+    # SHA-256 runs on the CPU's SHA extensions on most hosts, faster than BLAKE2 here
+    h = hashlib.sha256(img.tobytes())
+    h.update(f"{img.mode}{img.size}".encode())
+    return h.hexdigest()[:32]
+
+
+@dataclass
+class EncodedFrame:
+    """
+    One encoded variant of a frame.
+
+    The base64 string and the ``image_url`` message part are built once and
+    shared by every request that sends this variant.
+    """
+
+    digest: str  # content digest of the source frame
+    base64_data: str
+    image_format: str
+    width: int
+    height: int
+    _part: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    @property
+    def key(self) -> FrameKey:
+        return (self.digest, self.image_format, self.width, self.height)
+
+    def image_part(self) -> Dict[str, Any]:
+        """The ready-made ``image_url`` content part; callers must not modify it."""
+        if self._part is None:
+            url = f"data:image/{self.image_format};base64,{self.base64_data}"
+            self._part = {"type": "image_url", "image_url": {"url": url}}
+        return self._part
+
+
+class FrameCache:
+    """
+    LRU cache of encoded frames, keyed by content digest, format and size.
+
+    Each entry is charged twice its base64 length (the string and its data
+    URL); the least recently used entries are evicted beyond ``max_bytes``.
+    Safe to share between threads.
+
+    Args:
+        max_bytes: Upper bound on the cached bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._frames: "OrderedDict[FrameKey, EncodedFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @staticmethod
+    def _size(frame: EncodedFrame) -> int:
+        return 2 * len(frame.base64_data)
+
+    def get(self, key: FrameKey) -> Optional[EncodedFrame]:
+        """Look up a variant, marking it as recently used."""
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+        metrics.FRAME_CACHE_LOOKUPS.inc(outcome="hit" if frame is not None else "miss")
+        return frame
+
+    def put(self, frame: EncodedFrame) -> EncodedFrame:
+        """
+        Store a variant, evicting the least recently used ones over the limit.
+
+        Returns:
+            The cached frame: an existing equal entry wins, so concurrent
+            encoders end up sharing one string.
+        """
+        size = self._size(frame)
+        with self._lock:
+            existing = self._frames.get(frame.key)
+            if existing is not None:
+                self._frames.move_to_end(frame.key)
+                return existing
+            if size > self.max_bytes:
+                return frame
+            self._frames[frame.key] = frame
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.bytes -= self._size(evicted)
+        return frame
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self.bytes = 0
+
+    def encode(self, img: Image.Image, image_format: str = "png", quality: int = 85, digest: Optional[str] = None) -> EncodedFrame:
+        """
+        Encode a frame, reusing the cached encoding of identical content.
+
+        Args:
+            img: The frame.
+            image_format: "png" or "jpeg".
+            quality: JPEG quality.
+            digest: The frame's digest, if already known.
+
+        Returns:
+            The encoded frame.
+        """
+        digest = digest or frame_digest(img)
+        frame = self.get((digest, image_format, img.width, img.height))
+        if frame is not None:
+            return frame
+        return self.put(EncodedFrame(digest, _encode(img, image_format, quality), image_format, img.width, img.height))
+
+    def variant(self, source: EncodedFrame, width: int, height: int) -> EncodedFrame:
+        """
+        Get a resized variant of a cached frame, decoding and resizing only on a miss.
+
+        Args:
+            source: The full-size encoded frame.
+            width: Target width.
+            height: Target height.
+
+        Returns:
+            The encoded variant, in the source's format.
+        """
+        frame = self.get((source.digest, source.image_format, width, height))
+        if frame is not None:
+            return frame
+        return self.put(resize_encoded(source, width, height))
+
+
+def resize_encoded(source: EncodedFrame, width: int, height: int) -> EncodedFrame:
+    """
+    Decode, resize and re-encode a frame, bypassing the cache.
+
+    Args:
+        source: The encoded frame.
+        width: Target width.
+        height: Target height.
+
+    Returns:
+        The resized frame, in the source's format.
+    """
+    img = Image.open(BytesIO(base64.b64decode(source.base64_data)))
+    img.draft("RGB", (width, height))  # JPEG: decode at reduced size
+    img = img.convert("RGB").resize((width, height), Image.Resampling.BILINEAR)
+    return EncodedFrame(source.digest, _encode(img, source.image_format), source.image_format, width, height)
+
+
+def _encode(img: Image.Image, image_format: str, quality: int = 85) -> str:
+    buffered = BytesIO()
+    if image_format == "jpeg":
+        img.save(buffered, format="JPEG", quality=quality)
+    else:
+        img.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+# Shared by every backend in the process
+FRAME_CACHE = FrameCache()
@@ -1,8 +1,8 @@
 """Input utilities for PC interaction."""
 
-import pyautogui
-import time
-import pyperclip
+from pc_agent.pc.display import pyautogui
+
+from pc_agent.tracing import traced_sleep
 
 
 def type_text(text: str, delay: float = 0.1) -> None:
@@ -19,8 +19,10 @@ def type_text(text: str, delay: float = 0.1) -> None:
         pyautogui.write(text, interval=delay)
     except UnicodeEncodeError:
         # Contains non-ASCII (e.g. Chinese), use clipboard
+        import pyperclip
+
         pyperclip.copy(text)
-        time.sleep(0.1)  # Brief wait for clipboard to update
+        traced_sleep(0.1, "clipboard_wait")  # Brief wait for clipboard to update
         
         # Determine modifier based on OS (user is on Mac)
         # Using command for Mac, control for others
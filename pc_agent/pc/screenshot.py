@@ -1,13 +1,18 @@
 """Screenshot utilities for capturing PC screen."""
 
 import base64
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from io import BytesIO
-from typing import Optional
+from typing import Any, Dict, Optional
 
-import pyautogui
+from pc_agent.pc.display import pyautogui
 from PIL import Image
 
+from pc_agent.pc.frame_cache import FRAME_CACHE, EncodedFrame, FrameCache, resize_encoded
+from pc_agent.tracing import span
+
 
 @dataclass
 class Screenshot:
@@ -19,18 +24,28 @@ class Screenshot:
     logical_width: int = 0
     logical_height: int = 0
     is_sensitive: bool = False
+    image_format: str = "png"  # encoding of base64_data: "png" or "jpeg"
+    digest: Optional[str] = None  # content digest, set when the encoding is held by the frame cache
 
 
-def get_screenshot(timeout: int = 10) -> Screenshot:
+def get_screenshot(timeout: int = 10, cache: FrameCache = FRAME_CACHE) -> Screenshot:
     """
     Capture a screenshot from the PC screen.
 
+    An unchanged screen is not encoded again: the frame cache returns the
+    earlier encoding (the same string object) for identical pixels.
+
+    Args:
+        timeout: Unused, kept for compatibility.
+        cache: Cache of encoded frames.
+
     Returns:
         Screenshot object containing base64 data and dimensions.
     """
     try:
         # Capture screenshot using pyautogui
-        img = pyautogui.screenshot()
+        with span("grab"):
+            img = pyautogui.screenshot()
         width, height = img.size
         
         # Get logical screen size for coordinate conversion
@@ -40,18 +55,21 @@ def get_screenshot(timeout: int = 10) -> Screenshot:
             logical_width, logical_height = width, height
 
         # Convert to base64
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        with span("encode", width=width, height=height):
+            frame = cache.encode(img)
 
-        return Screenshot(
-            base64_data=base64_data, 
+        screenshot = Screenshot(
+            base64_data=frame.base64_data, 
             width=width, 
             height=height, 
             logical_width=logical_width,
             logical_height=logical_height,
-            is_sensitive=False
+            is_sensitive=False,
+            digest=frame.digest,
         )
+        # Hashing the pixels in hand is far cheaper than decoding the PNG later
+        screenshot_dhash(screenshot, img)
+        return screenshot
 
     except Exception as e:
         print(f"Screenshot error: {e}")
@@ -77,3 +95,147 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
         height=default_height,
         is_sensitive=is_sensitive,
     )
+
+
+def _encoded(screenshot: Screenshot) -> EncodedFrame:
+    """View a screenshot as an encoded frame (uncached frames get a throwaway digest)."""
+    return EncodedFrame(
+        screenshot.digest or "", screenshot.base64_data, screenshot.image_format, screenshot.width, screenshot.height,
+    )
+
+
+def downscale(screenshot: Screenshot, scale: float, cache: FrameCache = FRAME_CACHE) -> Screenshot:
+    """
+    Shrink a screenshot, keeping its format and logical size.
+
+    Frames known to the cache are resized once per size; repeats reuse the
+    cached variant.
+
+    Args:
+        screenshot: Screenshot to shrink.
+        scale: Factor applied to both sides, between 0 and 1.
+        cache: Cache of encoded frames.
+
+    Returns:
+        A new, smaller screenshot; the original if there is nothing to shrink.
+    """
+    width, height = round(screenshot.width * scale), round(screenshot.height * scale)
+    if scale >= 1 or width < 1 or height < 1:
+        return screenshot
+    if screenshot.digest:
+        frame = cache.variant(_encoded(screenshot), width, height)
+    else:
+        frame = resize_encoded(_encoded(screenshot), width, height)
+    return Screenshot(
+        base64_data=frame.base64_data,
+        width=width,
+        height=height,
+        logical_width=screenshot.logical_width or screenshot.width,
+        logical_height=screenshot.logical_height or screenshot.height,
+        is_sensitive=screenshot.is_sensitive,
+        image_format=screenshot.image_format,
+        digest=screenshot.digest,
+    )
+
+
+def image_part(screenshot: Screenshot, cache: FrameCache = FRAME_CACHE) -> Dict[str, Any]:
+    """
+    The ``image_url`` message part for a screenshot.
+
+    Cached frames share one part (and data URL) across every request that
+    sends them, so repeat sends allocate no new large strings.
+
+    Args:
+        screenshot: The screenshot to send.
+        cache: Cache of encoded frames.
+
+    Returns:
+        The content part; it must not be modified.
+    """
+    frame = None
+    if screenshot.digest:
+        frame = cache.get((screenshot.digest, screenshot.image_format, screenshot.width, screenshot.height))
+    if frame is None or frame.base64_data is not screenshot.base64_data:
+        frame = _encoded(screenshot)
+    return frame.image_part()
+
+
+def dhash(base64_data: str, hash_size: int = 8) -> int:
+    """
+    Compute a difference hash (perceptual fingerprint) of a screenshot.
+
+    The image is shrunk to (hash_size + 1) x hash_size grayscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour,
+    so small rendering differences (cursor blink, clock) flip few bits.
+
+    Args:
+        base64_data: Base64-encoded image.
+        hash_size: Bits per row and number of rows.
+
+    Returns:
+        The hash as an integer of hash_size * hash_size bits.
+    """
+    return dhash_image(Image.open(BytesIO(base64.b64decode(base64_data))), hash_size)
+
+
+def dhash_image(img: Image.Image, hash_size: int = 8) -> int:
+    """
+    Compute the difference hash of a decoded image (see ``dhash``).
+
+    Args:
+        img: The image.
+        hash_size: Bits per row and number of rows.
+
+    Returns:
+        The hash as an integer of hash_size * hash_size bits.
+    """
+    img = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(img.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+# dhash per frame content digest, most recently used last
+_FINGERPRINTS: "OrderedDict[str, int]" = OrderedDict()
+_FINGERPRINTS_MAX = 1024
+_fingerprints_lock = threading.Lock()
+
+
+def screenshot_dhash(screenshot: Screenshot, image: Optional[Image.Image] = None) -> int:
+    """
+    The dhash of a screenshot, computed once per frame content.
+
+    Frames with a content digest are memoized by it, so an unchanged screen
+    is not hashed again; backends pass the captured image on first sight,
+    which skips decoding ``base64_data``.
+
+    Args:
+        screenshot: The screenshot.
+        image: The captured image, if at hand.
+
+    Returns:
+        The screenshot's dhash.
+    """
+    digest = screenshot.digest
+    if digest is not None:
+        with _fingerprints_lock:
+            value = _FINGERPRINTS.get(digest)
+            if value is not None:
+                _FINGERPRINTS.move_to_end(digest)
+                return value
+    value = dhash_image(image) if image is not None else dhash(screenshot.base64_data)
+    if digest is not None:
+        with _fingerprints_lock:
+            _FINGERPRINTS[digest] = value
+            while len(_FINGERPRINTS) > _FINGERPRINTS_MAX:
+                _FINGERPRINTS.popitem(last=False)
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two dhash values."""
+    return bin(a ^ b).count("1")
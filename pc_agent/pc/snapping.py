@@ -0,0 +1,210 @@
+"""Snapping of model tap coordinates onto nearby UI elements."""
+
+import base64
+import logging
+from dataclasses import dataclass
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from pc_agent.pc.screenshot import Screenshot
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install "wordwill[snap]"
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_missing_numpy_logged = False
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 in pixels, inclusive
+
+
+def snapping_available() -> bool:
+    """Whether NumPy, which tap snapping needs, is installed."""
+    return np is not None
+
+
+def log_missing_numpy() -> None:
+    """Warn that tap snapping is off because NumPy is missing, once per process."""
+    global _missing_numpy_logged
+    if not _missing_numpy_logged:
+        _missing_numpy_logged = True
+        logger.warning('Tap snapping needs NumPy (pip install "wordwill[snap]"), continuing without it')
+
+
+@dataclass
+class Snap:
+    """A tap moved onto an element."""
+
+    x: int  # new position, 0-1000 relative
+    y: int
+    dx: int  # shift in screenshot pixels
+    dy: int
+    box: Box  # element bounds in screenshot pixels
+
+
+class TapSnapper:
+    """
+    Moves taps that land just off a UI element onto that element.
+
+    Edges (strong brightness steps between neighbouring pixels) are found with vectorised
+    differences and pooled into small cells. The cells are thickened so
+    the glyphs of a label and the border of a button merge, then grouped
+    into connected components whose bounding boxes are the candidate
+    elements. A tap inside a candidate is left alone; otherwise it moves
+    just inside the nearest candidate within the tolerance (to its center
+    for small targets, to the closest point for long bars and fields).
+
+    Args:
+        tolerance: Max distance in logical pixels from the tap to an element.
+        min_size: Smallest element side in pixels; smaller blobs are noise.
+        max_size: Largest short side of an element in pixels; blobs that are
+            larger in both directions are panels, not targets.
+        edge_threshold: Brightness step (0-255) that counts as an edge.
+        cell: Side of the cells edges are pooled into, in pixels; grows
+            with the frame so 4K frames cost about as much as 1080p ones.
+    """
+
+    def __init__(
+        self,
+        tolerance: int = 24,
+        min_size: int = 6,
+        max_size: int = 160,
+        edge_threshold: int = 32,
+        cell: int = 4,
+    ):
+        if np is None:
+            raise RuntimeError("Tap snapping requires NumPy: pip install numpy")
+        self.tolerance = tolerance
+        self.min_size = min_size
+        self.max_size = max_size
+        self.edge_threshold = edge_threshold
+        self.cell = cell
+
+    def candidates(self, gray: "np.ndarray", cell: Optional[int] = None) -> List[Box]:
+        """
+        Find candidate element boxes in a grayscale image.
+
+        Args:
+            gray: 2-D uint8 array.
+            cell: Cell side in pixels, defaults to the snapper's.
+
+        Returns:
+            Bounding boxes of plausible elements, in the image's pixels.
+        """
+        c = cell or self.cell
+        img = gray.astype(np.int16)
+        edges = np.zeros(img.shape, dtype=bool)
+        edges[:, 1:] |= np.abs(np.diff(img, axis=1)) > self.edge_threshold
+        edges[1:, :] |= np.abs(np.diff(img, axis=0)) > self.edge_threshold
+
+        rows, cols = edges.shape[0] // c, edges.shape[1] // c
+        cells = edges[:rows * c, :cols * c].reshape(rows, c, cols, c).any(axis=(1, 3))
+        mask = self._dilate(cells)
+        if not mask.any():
+            return []
+
+        labels = self._label(mask)
+        ys, xs = np.nonzero(mask)
+        _, index = np.unique(labels[ys, xs], return_inverse=True)
+        count = index.max() + 1
+        x0 = np.full(count, cols); y0 = np.full(count, rows)
+        x1 = np.zeros(count, dtype=np.int64); y1 = np.zeros(count, dtype=np.int64)
+        np.minimum.at(x0, index, xs); np.minimum.at(y0, index, ys)
+        np.maximum.at(x1, index, xs); np.maximum.at(y1, index, ys)
+
+        # Undo the one-cell dilation and go back to pixels
+        x0, y0 = (x0 + 1) * c, (y0 + 1) * c
+        x1, y1 = x1 * c - 1, y1 * c - 1
+        w, h = x1 - x0 + 1, y1 - y0 + 1
+        keep = (w >= self.min_size) & (h >= self.min_size) & (np.minimum(w, h) <= self.max_size)
+        return [tuple(int(v) for v in box) for box in np.stack([x0, y0, x1, y1], axis=1)[keep]]
+
+    @staticmethod
+    def _dilate(mask: "np.ndarray") -> "np.ndarray":
+        """Binary dilation by one cell (3x3 kernel), via shifted ORs."""
+        out = mask.copy()
+        out[1:, :] |= mask[:-1, :]
+        out[:-1, :] |= mask[1:, :]
+        grown = out.copy()
+        grown[:, 1:] |= out[:, :-1]
+        grown[:, :-1] |= out[:, 1:]
+        return grown
+
+    @staticmethod
+    def _label(mask: "np.ndarray") -> "np.ndarray":
+        """
+        Label 4-connected components with the smallest cell index in each.
+
+        Every pass takes the minimum over each cell's neighbours and then
+        follows labels to their own labels until nothing changes (pointer
+        jumping), so even long, winding components converge in a few passes.
+        """
+        rows, cols = mask.shape
+        size = rows * cols
+        labels = np.where(mask, np.arange(size).reshape(rows, cols), size)
+        while True:
+            prev = labels
+            labels = labels.copy()
+            labels[1:, :] = np.minimum(labels[1:, :], prev[:-1, :])
+            labels[:-1, :] = np.minimum(labels[:-1, :], prev[1:, :])
+            labels[:, 1:] = np.minimum(labels[:, 1:], prev[:, :-1])
+            labels[:, :-1] = np.minimum(labels[:, :-1], prev[:, 1:])
+            labels[~mask] = size
+            flat = labels.ravel()
+            inside = np.flatnonzero(flat < size)
+            while True:
+                jumped = flat[flat[inside]]
+                if np.array_equal(jumped, flat[inside]):
+                    break
+                flat[inside] = jumped
+            if np.array_equal(labels, prev):
+                return labels
+
+    def snap(self, screenshot: Screenshot, x: int, y: int) -> Optional[Snap]:
+        """
+        Snap a tap to the nearest element if it misses one.
+
+        Args:
+            screenshot: The frame the tap was chosen on.
+            x: Tap position, 0-1000 relative.
+            y: Tap position, 0-1000 relative.
+
+        Returns:
+            The adjustment, or None to tap where the model said.
+        """
+        width, height = screenshot.width, screenshot.height
+        px, py = x * width // 1000, y * height // 1000
+        tolerance = self.tolerance * width / (screenshot.logical_width or width)  # HiDPI frames
+
+        img = Image.open(BytesIO(base64.b64decode(screenshot.base64_data)))
+        boxes = self.candidates(np.asarray(img.convert("L")), max(self.cell, width // 640))
+        if not boxes:
+            return None
+
+        arr = np.array(boxes)
+        dx = np.maximum(np.maximum(arr[:, 0] - px, 0), px - arr[:, 2])
+        dy = np.maximum(np.maximum(arr[:, 1] - py, 0), py - arr[:, 3])
+        distance = np.hypot(dx, dy)
+        if (distance == 0).any():
+            return None  # already on an element
+        best = int(distance.argmin())
+        if distance[best] > tolerance:
+            return None
+
+        # Clamp into the box shrunk by half its short side: the center of a
+        # square target, the nearest point on the midline of a long one
+        x0, y0, x1, y1 = (int(v) for v in arr[best])
+        margin = min(x1 - x0, y1 - y0) // 2
+        cx = min(max(px, x0 + margin), x1 - margin)
+        cy = min(max(py, y0 + margin), y1 - margin)
+        return Snap(
+            x=round(cx * 1000 / width),
+            y=round(cy * 1000 / height),
+            dx=cx - px,
+            dy=cy - py,
+            box=(x0, y0, x1, y1),
+        )
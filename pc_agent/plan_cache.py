@@ -0,0 +1,169 @@
+"""Cache of known-good action sequences, replayed while the screen matches."""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from pc_agent.pc.screenshot import hash_distance
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_VERSION = 1
+
+
+def normalize_task(task: str) -> str:
+    """
+    Normalise a task description into a cache key.
+
+    Case, Unicode width forms, repeated whitespace and trailing
+    punctuation are ignored, so "打开飞书 查看审批。" and "打开飞书  查看审批"
+    share a plan.
+
+    Args:
+        task: The task description.
+
+    Returns:
+        The normalised key.
+    """
+    text = unicodedata.normalize("NFKC", task).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .!?。！？")
+
+
+@dataclass
+class PlanStep:
+    """One cached step: the screen it applies to and the model output used there."""
+
+    fingerprint: int  # dhash of the screenshot the action was chosen for
+    raw_content: str
+    thinking: str
+    action: str
+
+
+@dataclass
+class CachedPlan:
+    """A successful action sequence for one task."""
+
+    task: str
+    steps: List[PlanStep] = field(default_factory=list)
+    hits: int = 0
+    updated_at: float = 0.0
+
+
+class PlanCache:
+    """
+    Persistent task -> action sequence cache.
+
+    Plans are stored in a single JSON file keyed by normalize_task(), and
+    only successful runs are stored. A cached step is reused only while the
+    live screen's dhash is within ``max_distance`` bits of the recorded one;
+    the first mismatch hands control back to the model for the rest of the
+    task.
+
+    Args:
+        path: JSON file holding the plans, created on first store.
+        max_distance: Maximum dhash Hamming distance for a frame to match.
+    """
+
+    def __init__(self, path: Union[str, Path], max_distance: int = 6):
+        self.path = Path(path).expanduser()
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._plans: Dict[str, CachedPlan] = self._load()
+
+    def _load(self) -> Dict[str, CachedPlan]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != PLAN_CACHE_VERSION:
+                return {}
+            return {
+                key: CachedPlan(
+                    task=plan["task"],
+                    steps=[PlanStep(**step) for step in plan["steps"]],
+                    hits=plan.get("hits", 0),
+                    updated_at=plan.get("updated_at", 0.0),
+                )
+                for key, plan in data["plans"].items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable plan cache {self.path}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        """Atomically write all plans. Caller holds the lock."""
+        data = {
+            "version": PLAN_CACHE_VERSION,
+            "plans": {key: asdict(plan) for key, plan in self._plans.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write plan cache {self.path}: {e}")
+
+    def lookup(self, task: str) -> Optional[CachedPlan]:
+        """
+        Get the cached plan for a task.
+
+        Args:
+            task: The task description.
+
+        Returns:
+            The plan, or None if the task has not succeeded before.
+        """
+        with self._lock:
+            return self._plans.get(normalize_task(task))
+
+    def matches(self, plan: CachedPlan, index: int, fingerprint: int) -> bool:
+        """
+        Check whether a cached step applies to the current screen.
+
+        Args:
+            plan: The cached plan.
+            index: Zero-based step index.
+            fingerprint: dhash of the current screenshot.
+
+        Returns:
+            True if the step exists and its frame is within tolerance.
+        """
+        if index >= len(plan.steps):
+            return False
+        return hash_distance(plan.steps[index].fingerprint, fingerprint) <= self.max_distance
+
+    def store(self, task: str, steps: List[PlanStep], replayed: int = 0) -> None:
+        """
+        Save the action sequence of a successful run.
+
+        Args:
+            task: The task description.
+            steps: The steps of the run, in order.
+            replayed: Number of leading steps that came from the cache.
+        """
+        key = normalize_task(task)
+        with self._lock:
+            previous = self._plans.get(key)
+            hits = (previous.hits if previous else 0) + (1 if replayed else 0)
+            self._plans[key] = CachedPlan(task=task, steps=list(steps), hits=hits, updated_at=time.time())
+            self._save()
+
+    def invalidate(self, task: str) -> None:
+        """Drop the cached plan for a task."""
+        with self._lock:
+            if self._plans.pop(normalize_task(task), None) is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._plans)
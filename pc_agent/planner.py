@@ -0,0 +1,312 @@
+"""Subtask planning: split a wide task, run the parts concurrently and merge their results."""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pc_agent.agent import AgentConfig, PcAgent
+from pc_agent.batch import BatchTask, create_unattended_agent, run_batch_task
+from pc_agent.model.client import MessageBuilder, ModelClient, ModelConfig
+from pc_agent.model.scheduler import Priority, RequestScheduler
+from pc_agent.pc import Backend
+
+logger = logging.getLogger(__name__)
+
+PLAN_PROMPT = """你是一个任务规划助手。判断下面的电脑操作任务能否拆分为若干个互不依赖、可以在不同电脑上同时执行的子任务。
+
+要求:
+- 每个子任务必须独立完整，不依赖其他子任务的结果，也不修改其他子任务要用到的内容；执行完后用一句话给出结果。
+- 需要用到所有子任务结果的收尾工作（汇总、比较、写入文档等）放在 merge 中，没有则为 null。
+- 子任务最多 {max_subtasks} 个。任务本身是顺序的、或者很简单时，不要拆分，返回空的 subtasks。
+
+只输出一个 JSON 对象，不要输出其他内容:
+{{"subtasks": ["子任务1", "子任务2"], "merge": "收尾任务或 null"}}"""
+
+
+@dataclass
+class Subtask:
+    """One independent part of a decomposed task."""
+
+    id: str
+    task: str
+
+
+@dataclass
+class TaskPlan:
+    """
+    A task split into independent subtasks and an optional merge step.
+
+    A plan with fewer than two subtasks is not worth running in parallel;
+    the original task is then run as is.
+    """
+
+    task: str
+    subtasks: List[Subtask] = field(default_factory=list)
+    merge: Optional[str] = None
+
+    @property
+    def parallel(self) -> bool:
+        """Whether the plan has more than one subtask."""
+        return len(self.subtasks) > 1
+
+
+@dataclass
+class DecomposedResult:
+    """Outcome of a decomposed run."""
+
+    success: bool
+    message: Optional[str]
+    plan: TaskPlan
+    subtasks: List[Dict[str, Any]] = field(default_factory=list)  # batch-style records, in plan order
+    merge: Optional[Dict[str, Any]] = None  # record of the merge (or undecomposed) run
+    duration: float = 0.0
+    usage: Dict[str, int] = field(default_factory=dict)  # planning, subtasks and merge combined
+
+
+def parse_plan(task: str, content: str, max_subtasks: int = 4) -> TaskPlan:
+    """
+    Parse the planner's JSON reply.
+
+    Anything that is not a usable plan yields a plan without subtasks, so the
+    caller falls back to running the task sequentially.
+
+    Args:
+        task: The original task.
+        content: Raw model output; reasoning around the JSON object is ignored.
+        max_subtasks: Subtasks beyond this are dropped.
+
+    Returns:
+        The parsed plan.
+    """
+    content = content.split("</think>")[-1]
+    try:
+        data = json.loads(content[content.index("{"):content.rindex("}") + 1])
+        subtasks = [str(s).strip() for s in data.get("subtasks") or [] if str(s).strip()]
+        merge = data.get("merge")
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Unusable plan, running the task as is: {e}")
+        return TaskPlan(task)
+
+    merge = str(merge).strip() if merge and str(merge).strip().lower() not in ("null", "none") else None
+    return TaskPlan(
+        task=task,
+        subtasks=[Subtask(str(i), text) for i, text in enumerate(subtasks[:max_subtasks], 1)],
+        merge=merge,
+    )
+
+
+def plan_task(model_client: ModelClient, task: str, max_subtasks: int = 4) -> Tuple[TaskPlan, Dict[str, int]]:
+    """
+    Ask the model once, without a screenshot, how to split a task.
+
+    Args:
+        model_client: Client for the planning request.
+        task: The task to split.
+        max_subtasks: Upper bound on the number of subtasks.
+
+    Returns:
+        The plan and the planning request's token usage.
+    """
+    messages = [
+        MessageBuilder.create_system_message(PLAN_PROMPT.format(max_subtasks=max_subtasks)),
+        MessageBuilder.create_user_message(f"任务: {task}"),
+    ]
+    try:
+        response = model_client.request(messages)
+    except Exception as e:
+        logger.warning(f"Planning request failed, running the task as is: {e}")
+        return TaskPlan(task), {}
+    return parse_plan(task, response.raw_content, max_subtasks), dict(response.usage)
+
+
+def merge_task(plan: TaskPlan, records: List[Dict[str, Any]]) -> str:
+    """
+    Build the merge agent's task from the subtasks' finish messages.
+
+    Args:
+        plan: The executed plan.
+        records: Subtask records in plan order.
+
+    Returns:
+        Task description for the merge agent.
+    """
+    lines = []
+    for subtask, record in zip(plan.subtasks, records):
+        if record.get("success"):
+            outcome = record.get("message") or "已完成"
+        else:
+            outcome = f"未完成 ({record.get('message') or record.get('stop_reason')})"
+        lines.append(f"{subtask.id}. {subtask.task}: {outcome}")
+    results = "\n".join(lines)
+    return f"原任务: {plan.task}\n以下子任务已在其他会话中执行完毕，结果如下:\n{results}\n\n请完成: {plan.merge}"
+
+
+def _combined_usage(usages: List[Dict[str, int]]) -> Dict[str, int]:
+    total: Dict[str, int] = {}
+    for usage in usages:
+        for key, value in usage.items():
+            if isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+def _failed_record(subtask: Subtask, message: str) -> Dict[str, Any]:
+    """Record for a subtask that could not run to completion."""
+    return {"id": subtask.id, "task": subtask.task, "success": False, "message": message,
+            "stop_reason": "error", "wall_time": 0.0, "usage": {}}
+
+
+def _run_threads(
+    plan: TaskPlan,
+    model_client: ModelClient,
+    agent_config: AgentConfig,
+    backend_factory: Callable[[], Backend],
+    max_model_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run every subtask on its own agent and backend in a thread pool.
+
+    The agents share ``model_client``'s scheduler; without one, a scheduler
+    capped at ``max_model_concurrency`` is created for them.
+    """
+    # Concurrent agents would interleave their console output
+    config = replace(agent_config, verbose=False)
+    scheduler = model_client.scheduler
+    if scheduler is None and max_model_concurrency:
+        scheduler = RequestScheduler(max_in_flight=max_model_concurrency)
+
+    def run(subtask: Subtask) -> Dict[str, Any]:
+        try:
+            client = model_client.derive(f"subtask-{subtask.id}", Priority.BATCH)
+            client.scheduler = scheduler
+            agent = create_unattended_agent(client, config, backend_factory())
+        except Exception as e:
+            logger.error(f"Subtask {subtask.id} could not start: {e}")
+            return _failed_record(subtask, f"Could not start: {e}")
+        return run_batch_task(agent, BatchTask(subtask.id, subtask.task), config)
+
+    records: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=len(plan.subtasks), thread_name_prefix="subtask") as pool:
+        futures = [pool.submit(run, subtask) for subtask in plan.subtasks]
+        for future in as_completed(futures):
+            record = future.result()
+            records[record["id"]] = record
+            _print_record(record, len(records), len(plan.subtasks))
+    return [records[subtask.id] for subtask in plan.subtasks]
+
+
+def _print_record(record: Dict[str, Any], done: int, total: int) -> None:
+    print(f"📋 [{done}/{total}] subtask {record['id']}: "
+          f"{'✅' if record['success'] else '❌'} {record['message']} ({record['wall_time']:.1f}s)")
+
+
+def run_decomposed(
+    task: str,
+    model_config: Optional[ModelConfig] = None,
+    agent_config: Optional[AgentConfig] = None,
+    model_client: Optional[ModelClient] = None,
+    backend_factory: Optional[Callable[[], Backend]] = None,
+    num_displays: int = 0,
+    max_subtasks: int = 4,
+    max_model_concurrency: Optional[int] = None,
+    merge_agent: Optional[PcAgent] = None,
+) -> DecomposedResult:
+    """
+    Split a task into independent subtasks, run them concurrently, then merge.
+
+    The model is asked once, text only, for a plan. Each subtask runs in a
+    fresh agent session on its own desktop, so wide tasks finish in roughly
+    the time of their slowest part. Subtask finish messages are handed to a
+    merge agent on the main desktop, which performs the plan's merge step.
+    Tasks the model does not split are run unchanged by the merge agent.
+
+    Where the subtasks run:
+        * ``backend_factory``: one thread per subtask, each with a backend of
+          its own (e.g. simulated or remote desktops).
+        * ``num_displays``: worker processes on private Xvfb displays, as
+          with ``--parallel`` batches (Linux).
+        * neither: one after another on the main desktop, which cannot be
+          shared by concurrent agents.
+
+    Args:
+        task: The compound task.
+        model_config: Model configuration, used when no client is given.
+        agent_config: Configuration for every agent; per-task limits apply to
+            each subtask and to the merge step separately.
+        model_client: Optional warm client, shared by the in-process agents.
+        backend_factory: Creates an isolated backend per subtask.
+        num_displays: Xvfb displays to spread subtasks over.
+        max_subtasks: Upper bound on the plan's fan-out.
+        max_model_concurrency: Global cap on in-flight model requests of
+            the subtask agents, unless ``model_client`` has a scheduler.
+        merge_agent: Agent for the merge step, defaults to an agent on the
+            local desktop.
+
+    Returns:
+        The combined result.
+    """
+    agent_config = agent_config or AgentConfig()
+    model_client = model_client or ModelClient(model_config)
+    start = time.perf_counter()
+
+    plan, plan_usage = plan_task(model_client, task, max_subtasks)
+    if merge_agent is None:
+        merge_agent = PcAgent(agent_config=agent_config, model_client=model_client)
+
+    records: List[Dict[str, Any]] = []
+    if plan.parallel:
+        print(f"🧩 Split into {len(plan.subtasks)} subtasks:")
+        for subtask in plan.subtasks:
+            print(f"  {subtask.id}. {subtask.task}")
+        batch = [BatchTask(s.id, s.task) for s in plan.subtasks]
+        if backend_factory is not None:
+            records = _run_threads(plan, model_client, agent_config, backend_factory, max_model_concurrency)
+        elif num_displays > 0:
+            from pc_agent.parallel import run_on_displays
+
+            def progress(record: Dict[str, Any]) -> None:
+                finished.append(record["id"])
+                _print_record(record, len(finished), len(batch))
+
+            finished: List[str] = []
+            done = run_on_displays(
+                batch, min(num_displays, len(batch)), model_client.config, agent_config,
+                max_model_concurrency=max_model_concurrency, on_record=progress,
+            )
+            by_id = {r["id"]: r for r in done}
+            records = [by_id.get(s.id) or _failed_record(s, "worker exited") for s in plan.subtasks]
+        else:
+            records = []
+            for index, subtask in enumerate(batch, 1):
+                records.append(run_batch_task(merge_agent, subtask, agent_config))
+                _print_record(records[-1], index, len(batch))
+
+    if plan.parallel and plan.merge is None:
+        merged = None
+        success = all(r["success"] for r in records)
+        message = "\n".join(f"{r['id']}. {r['message']}" for r in records)
+    else:
+        final = BatchTask("merge", merge_task(plan, records)) if plan.parallel else BatchTask("task", task)
+        if plan.parallel:
+            print(f"🔗 Merging: {plan.merge}")
+        merged = run_batch_task(merge_agent, final, agent_config)
+        success = merged["success"] and all(r["success"] for r in records)
+        message = merged["message"]
+
+    usages = [plan_usage] + [r.get("usage") or {} for r in records] + [merged["usage"] if merged else {}]
+    result = DecomposedResult(
+        success=success,
+        message=message,
+        plan=plan,
+        subtasks=records,
+        merge=merged,
+        duration=time.perf_counter() - start,
+        usage=_combined_usage(usages),
+    )
+    if plan.parallel:
+        print(f"\n📊 Decomposed task {'succeeded' if success else 'failed'} in {result.duration:.1f}s "
+              f"({len(records)} subtasks, {result.usage.get('total_tokens', 0)} tokens)")
+    return result
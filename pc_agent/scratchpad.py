@@ -0,0 +1,78 @@
+"""Bounded per-task working memory written by the Note and Call_API actions."""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List
+
+
+@dataclass
+class ScratchpadEntry:
+    """A remembered piece of text."""
+
+    kind: str  # "note" (text the model extracted) or "summary" (a Call_API result)
+    text: str
+
+
+class Scratchpad:
+    """
+    Text the model chose to remember while working through a task.
+
+    Notes let the model carry information across screens instead of
+    navigating back to re-read it. The scratchpad is shown in every turn's
+    screen info, so it is bounded: long entries are truncated and the
+    oldest entries are dropped once the entry or character limit is hit.
+
+    Args:
+        max_entries: Maximum number of entries kept.
+        max_chars: Maximum total characters kept.
+        entry_chars: Maximum characters of a single entry.
+    """
+
+    def __init__(self, max_entries: int = 20, max_chars: int = 2000, entry_chars: int = 500):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.entry_chars = entry_chars
+        self._entries: Deque[ScratchpadEntry] = deque()
+        self._chars = 0
+
+    def add(self, text: str, kind: str = "note") -> None:
+        """
+        Remember text, evicting the oldest entries if over budget.
+
+        Args:
+            text: Text to remember; repeats of a kept entry are ignored.
+            kind: "note" or "summary".
+        """
+        text = " ".join(text.split())
+        if len(text) > self.entry_chars:
+            text = text[:self.entry_chars - 1] + "…"
+        if not text or any(entry.text == text for entry in self._entries):
+            return
+        self._entries.append(ScratchpadEntry(kind, text))
+        self._chars += len(text)
+        while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+            self._chars -= len(self._entries.popleft().text)
+
+    def entries(self) -> List[ScratchpadEntry]:
+        """Kept entries, oldest first."""
+        return list(self._entries)
+
+    def render(self) -> str:
+        """
+        Format the entries compactly for the model, one per line.
+
+        Returns:
+            Numbered lines, summaries marked as such; empty if nothing is kept.
+        """
+        return "\n".join(
+            f"{i}. {'[总结] ' if entry.kind == 'summary' else ''}{entry.text}"
+            for i, entry in enumerate(self._entries, 1)
+        )
+
+    def clear(self) -> None:
+        """Forget everything, e.g. at the start of a new task."""
+        self._entries.clear()
+        self._chars = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,378 @@
+"""Long-lived agent daemon exposing a local HTTP/JSON task API."""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+from pc_agent import metrics
+from pc_agent.agent import AgentConfig, PcAgent, TaskResult
+from pc_agent.model.client import ModelClient, ModelConfig
+from pc_agent.model.scheduler import Priority, RequestScheduler
+from pc_agent.pc import LocalBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Task:
+    """A task submitted to the daemon and the events it has produced."""
+
+    id: str
+    description: str
+    max_steps: Optional[int] = None
+    lang: Optional[str] = None
+    status: str = "queued"  # queued -> running -> finished
+    submitted_at: float = field(default_factory=time.time)
+    result: Optional[TaskResult] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Append an event and wake up any stream readers."""
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def stream(self) -> Iterator[Dict[str, Any]]:
+        """Yield events as they are produced, until the task finishes."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.events) and self.status != "finished":
+                    self._cond.wait()
+                pending = self.events[index:]
+                done = self.status == "finished"
+            for event in pending:
+                yield event
+            index += len(pending)
+            if done and index >= len(self.events):
+                return
+
+    def summary(self) -> Dict[str, Any]:
+        """Get a JSON-serialisable view of the task."""
+        info = {
+            "id": self.id,
+            "task": self.description,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+        }
+        if self.result:
+            info.update(success=self.result.success, message=self.result.message, steps=self.result.steps)
+        return info
+
+
+class AgentService:
+    """
+    Keeps a warm model client and capture backend and runs tasks one at a time.
+
+    Tasks share a single desktop, so they are executed serially by a worker
+    thread; submission and event streaming are safe from any thread. Only
+    the most recent finished tasks are kept, so a long-lived daemon does
+    not grow without bound.
+
+    Args:
+        model_config: Model configuration for the shared client.
+        agent_config: Default agent configuration for submitted tasks; they
+            always run without console output.
+        scheduler: Optional request scheduler shared with other clients in
+            this process; daemon tasks are submitted as interactive.
+        max_finished_tasks: Finished tasks kept for status queries; older
+            ones are forgotten.
+    """
+
+    def __init__(
+        self,
+        model_config: Optional[ModelConfig] = None,
+        agent_config: Optional[AgentConfig] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        max_finished_tasks: int = 1000,
+    ):
+        # Task progress goes to the event streams; console output would interleave between tasks
+        self.agent_config = replace(agent_config or AgentConfig(), verbose=False)
+        self.model_client = ModelClient(model_config, scheduler=scheduler, priority=Priority.INTERACTIVE)
+        self.backend = LocalBackend()
+        self.tasks: Dict[str, Task] = {}
+        self.max_finished_tasks = max_finished_tasks
+        self._tasks_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Task]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="agent-worker", daemon=True)
+
+    def start(self) -> None:
+        """Warm up the model connection and capture backend, then start the worker."""
+        if self.model_client.warmup():
+            logger.info("Model server connection established")
+        else:
+            logger.warning("Model server warm-up failed; will retry on first task")
+        try:
+            self.backend.get_screenshot()
+        except Exception as e:
+            logger.warning(f"Capture warm-up failed: {e}")
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the current task."""
+        self._queue.put(None)
+
+    def submit(
+        self, description: str, max_steps: Optional[int] = None, lang: Optional[str] = None
+    ) -> Task:
+        """
+        Queue a task for execution.
+
+        Args:
+            description: Natural language task description.
+            max_steps: Optional per-task step limit.
+            lang: Optional per-task language.
+
+        Returns:
+            The queued Task.
+        """
+        task = Task(id=uuid.uuid4().hex[:12], description=description, max_steps=max_steps, lang=lang)
+        with self._tasks_lock:
+            self.tasks[task.id] = task
+        task.emit({"type": "queued", "id": task.id, "task": description})
+        self._queue.put(task)
+        return task
+
+    def task_list(self) -> List[Task]:
+        """Get the retained tasks in submission order."""
+        with self._tasks_lock:
+            return list(self.tasks.values())
+
+    def _prune(self) -> None:
+        """Forget the oldest finished tasks beyond ``max_finished_tasks``."""
+        with self._tasks_lock:
+            finished = [task_id for task_id, task in self.tasks.items() if task.status == "finished"]
+            for task_id in finished[:max(0, len(finished) - self.max_finished_tasks)]:
+                del self.tasks[task_id]
+
+    def create_agent(self, task: Task) -> PcAgent:
+        """Build a PcAgent for a task on top of the shared, warm model client."""
+        config = replace(
+            self.agent_config,
+            max_steps=task.max_steps or self.agent_config.max_steps,
+            lang=task.lang or self.agent_config.lang,
+        )
+
+        def on_confirmation(message: str) -> bool:
+            # Nobody is at the console: only proceed when confirmation is disabled
+            task.emit({"type": "confirmation_required", "message": message})
+            return not config.confirm_sensitive
+
+        def on_takeover(message: str) -> None:
+            task.emit({"type": "takeover_required", "message": message})
+
+        agent = PcAgent(
+            agent_config=config,
+            model_client=self.model_client,
+            backend=self.backend,
+            confirmation_callback=on_confirmation,
+            takeover_callback=on_takeover,
+        )
+        # The agent's own events (steps, model output, actions) go to the stream as they happen
+        agent.events.subscribe(lambda event: task.emit(event.to_dict()))
+        return agent
+
+    def _work(self) -> None:
+        """Worker loop executing queued tasks."""
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            task.status = "running"
+            task.emit({"type": "started", "id": task.id})
+            try:
+                result = self.create_agent(task).run(task.description)
+            except Exception as e:
+                logger.error(f"Task {task.id} crashed: {e}")
+                result = TaskResult(success=False, message=str(e))
+            task.result = result
+            with task._cond:
+                task.status = "finished"
+                task.events.append({
+                    "type": "finished",
+                    "id": task.id,
+                    "success": result.success,
+                    "message": result.message,
+                    "steps": result.steps,
+                })
+                task._cond.notify_all()
+            self._prune()
+
+
+def _validate_submission(body: Any) -> Optional[str]:
+    """
+    Check a task submission body.
+
+    Returns:
+        The error message, or None if the body is valid.
+    """
+    if not isinstance(body, dict):
+        return "Body must be a JSON object with a 'task' field"
+    task = body.get("task")
+    if not isinstance(task, str) or not task.strip():
+        return "'task' must be a non-empty string"
+    max_steps = body.get("max_steps")
+    if max_steps is not None and (not isinstance(max_steps, int) or isinstance(max_steps, bool) or max_steps < 1):
+        return "'max_steps' must be a positive integer"
+    lang = body.get("lang")
+    if lang is not None and lang not in ("cn", "en"):
+        return "'lang' must be 'cn' or 'en'"
+    return None
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for the task API."""
+
+    server: "AgentHTTPServer"
+
+    def do_GET(self) -> None:
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        if parts == ["metrics"]:
+            data = metrics.REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif parts == ["health"]:
+            self._send_json(200, {"status": "ok", "tasks": len(self.server.service.tasks)})
+        elif parts == ["tasks"]:
+            self._send_json(200, [t.summary() for t in self.server.service.task_list()])
+        elif len(parts) in (2, 3) and parts[0] == "tasks":
+            task = self.server.service.tasks.get(parts[1])
+            if task is None:
+                self._send_json(404, {"error": f"Unknown task: {parts[1]}"})
+            elif len(parts) == 2:
+                self._send_json(200, task.summary())
+            elif parts[2] == "events":
+                self._stream_events(task)
+            else:
+                self._send_json(404, {"error": "Not found"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        path, _, query = self.path.partition("?")
+        if path.rstrip("/") != "/tasks":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "Body must be JSON with a 'task' field"})
+            return
+        error = _validate_submission(body)
+        if error:
+            self._send_json(400, {"error": error})
+            return
+
+        task = self.server.service.submit(body["task"], body.get("max_steps"), body.get("lang"))
+        if "stream=1" in query.split("&"):
+            self._stream_events(task)
+        else:
+            self._send_json(202, task.summary())
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, task: Task) -> None:
+        """Stream task events as newline-delimited JSON until the task finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for event in task.stream():
+                self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class AgentHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to an AgentService."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Any, service: AgentService):
+        self.service = service
+        super().__init__(address, _RequestHandler)
+
+
+class AgentUnixHTTPServer(AgentHTTPServer):
+    """AgentHTTPServer listening on a Unix domain socket."""
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def serve(
+    model_config: Optional[ModelConfig] = None,
+    agent_config: Optional[AgentConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+    scheduler: Optional[RequestScheduler] = None,
+) -> None:
+    """
+    Run the agent daemon until interrupted.
+
+    Args:
+        model_config: Model configuration for the shared client.
+        agent_config: Default agent configuration for tasks.
+        host: Host to bind the HTTP API to.
+        port: Port to bind the HTTP API to.
+        unix_socket: Serve on this Unix socket path instead of TCP.
+        scheduler: Optional request scheduler shared with other clients in
+            this process.
+    """
+    service = AgentService(model_config, agent_config, scheduler)
+    service.start()
+
+    if unix_socket:
+        server: AgentHTTPServer = AgentUnixHTTPServer(unix_socket, service)
+        where = unix_socket
+    else:
+        server = AgentHTTPServer((host, port), service)
+        where = f"http://{host}:{port}"
+
+    print(f"🛰️  PC Agent daemon listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
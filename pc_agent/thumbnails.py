@@ -0,0 +1,159 @@
+"""Bounded ring of downscaled past screenshots kept in the model's context."""
+
+import base64
+from collections import deque
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Deque, Dict, List, Optional
+
+from PIL import Image
+
+from pc_agent.model.usage import estimate_image_tokens
+
+
+@dataclass
+class Thumbnail:
+    """One encoded past frame."""
+
+    step: int
+    action: str  # the action chosen on this screen
+    base64_data: str  # JPEG
+    width: int
+    height: int
+    tokens: int  # estimated vision tokens
+
+    @property
+    def size(self) -> int:
+        """Encoded size in bytes (as sent, base64)."""
+        return len(self.base64_data)
+
+
+class ThumbnailHistory:
+    """
+    The last few screens, as small JPEG thumbnails.
+
+    Each frame is downscaled and encoded once when it is added; the ring
+    then hands out the cached encodings on every request. Oldest frames are
+    evicted first whenever the frame count, byte budget or token budget
+    would be exceeded.
+
+    Args:
+        max_frames: Maximum number of thumbnails kept.
+        max_side: Longest side of a thumbnail in pixels.
+        max_bytes: Maximum total base64 size of the kept thumbnails.
+        max_tokens: Maximum total estimated vision tokens of the thumbnails.
+        quality: JPEG quality.
+    """
+
+    def __init__(
+        self,
+        max_frames: int = 3,
+        max_side: int = 256,
+        max_bytes: int = 64 * 1024,
+        max_tokens: int = 600,
+        quality: int = 60,
+    ):
+        self.max_frames = max_frames
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.quality = quality
+        self._frames: Deque[Thumbnail] = deque()
+        self._bytes = 0
+        self._tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total base64 size of the kept thumbnails."""
+        return self._bytes
+
+    @property
+    def total_tokens(self) -> int:
+        """Total estimated vision tokens of the kept thumbnails."""
+        return self._tokens
+
+    def clear(self) -> None:
+        """Drop all thumbnails."""
+        self._frames.clear()
+        self._bytes = 0
+        self._tokens = 0
+
+    def encode(self, base64_data: str) -> Dict[str, Any]:
+        """
+        Downscale and JPEG-encode a screenshot.
+
+        Args:
+            base64_data: Base64 PNG or JPEG screenshot.
+
+        Returns:
+            Dict with base64_data, width and height.
+        """
+        img = Image.open(BytesIO(base64.b64decode(base64_data)))
+        img.draft("RGB", (self.max_side, self.max_side))  # JPEG: decode at reduced scale
+        img = img.convert("RGB")
+        img.thumbnail((self.max_side, self.max_side), Image.BILINEAR)
+        buffered = BytesIO()
+        img.save(buffered, format="JPEG", quality=self.quality, optimize=True)
+        width, height = img.size
+        return {
+            "base64_data": base64.b64encode(buffered.getvalue()).decode("utf-8"),
+            "width": width,
+            "height": height,
+        }
+
+    def add(self, step: int, action: str, base64_data: str) -> Thumbnail:
+        """
+        Add the screen a step acted on, evicting old frames to stay in budget.
+
+        Args:
+            step: Step number.
+            action: The action taken on this screen.
+            base64_data: The full screenshot.
+
+        Returns:
+            The new thumbnail.
+        """
+        encoded = self.encode(base64_data)
+        thumbnail = Thumbnail(
+            step=step,
+            action=action,
+            tokens=estimate_image_tokens(encoded["width"], encoded["height"]),
+            **encoded,
+        )
+        self._frames.append(thumbnail)
+        self._bytes += thumbnail.size
+        self._tokens += thumbnail.tokens
+        while self._frames and (
+            len(self._frames) > self.max_frames
+            or self._bytes > self.max_bytes
+            or self._tokens > self.max_tokens
+        ):
+            evicted = self._frames.popleft()
+            self._bytes -= evicted.size
+            self._tokens -= evicted.tokens
+        return thumbnail
+
+    def frames(self) -> List[Thumbnail]:
+        """The kept thumbnails, oldest first."""
+        return list(self._frames)
+
+    def to_message(self) -> Optional[Dict[str, Any]]:
+        """
+        Build a user message showing the kept thumbnails, oldest first.
+
+        Returns:
+            OpenAI-format message, or None if the ring is empty.
+        """
+        if not self._frames:
+            return None
+        content: List[Dict[str, Any]] = [{"type": "text", "text": "最近的屏幕缩略图（从旧到新）:"}]
+        for thumbnail in self._frames:
+            content.append({"type": "text", "text": f"步骤 {thumbnail.step}，执行的动作: {thumbnail.action}"})
+            content.append({
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{thumbnail.base64_data}"},
+            })
+        return {"role": "user", "content": content}
@@ -0,0 +1,193 @@
+"""Lightweight span tracing with Chrome trace-event export."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Union
+
+
+@dataclass
+class Span:
+    """A finished, named interval."""
+
+    name: str
+    start: float  # perf_counter seconds
+    duration: float  # seconds
+    thread_id: int
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Collects named spans from the agent loop.
+
+    Spans nest naturally: a span opened inside another one on the same
+    thread is rendered as its child in Chrome's trace viewer
+    (chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """
+        Time the enclosed block as a span.
+
+        Args:
+            name: Span name, e.g. "capture" or "model.request".
+            **args: Extra attributes shown in the trace viewer.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start, **args)
+
+    def add(self, name: str, start: float, duration: float, **args: Any) -> None:
+        """
+        Record a span measured elsewhere.
+
+        Args:
+            name: Span name.
+            start: Start time from time.perf_counter().
+            duration: Duration in seconds.
+            **args: Extra attributes.
+        """
+        span = Span(name, start, duration, threading.get_ident(), args)
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        """Drop all recorded spans."""
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+
+    def phase_totals(self) -> Dict[str, float]:
+        """Get the total seconds spent per span name."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Get per-span-name statistics.
+
+        Returns:
+            One row per span name with count, total, mean, p50, p95 and max
+            durations in milliseconds, ordered by total time.
+        """
+        durations: Dict[str, List[float]] = {}
+        for span in self.spans:
+            durations.setdefault(span.name, []).append(span.duration * 1000)
+
+        rows = []
+        for name, values in durations.items():
+            values.sort()
+            rows.append({
+                "name": name,
+                "count": len(values),
+                "total_ms": sum(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "max_ms": values[-1],
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def format_summary(self) -> str:
+        """Render summary() as a fixed-width text table."""
+        header = f"{'span':<24}{'count':>7}{'total ms':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<24}{row['count']:>7}{row['total_ms']:>12.1f}{row['mean_ms']:>10.1f}"
+                f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Convert the spans to Chrome trace-event format (complete events)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start - self._origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.args,
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Write the spans as a Chrome trace-event JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+
+
+class NullTracer(Tracer):
+    """Tracer that records nothing, used when tracing is disabled."""
+
+    enabled = False
+    _NULL = nullcontext()
+
+    def span(self, name: str, **args: Any) -> ContextManager[None]:
+        return self._NULL
+
+    def add(self, name: str, start: float, duration: float, **args: Any) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+_current_tracer: ContextVar[Tracer] = ContextVar("pc_agent_tracer", default=NULL_TRACER)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def get_tracer() -> Tracer:
+    """Get the tracer active in the current context."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def use_tracer(tracer: Tracer) -> Iterator[Tracer]:
+    """Make a tracer active for the enclosed block (and code it calls)."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Open a span on the active tracer; a no-op when tracing is disabled."""
+    return _current_tracer.get().span(name, **args)
+
+
+def traced_sleep(seconds: float, name: str = "sleep") -> None:
+    """Sleep, recording the wait as a span on the active tracer."""
+    with _current_tracer.get().span(name, seconds=seconds):
+        time.sleep(seconds)
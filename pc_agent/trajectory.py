@@ -0,0 +1,433 @@
+"""Trajectory recording and offline replay of agent runs."""
+
+import base64
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pc_agent.actions.handler import ActionHandler, ActionResult, parse_action
+from pc_agent.actions.types import Action, action_from_dict
+from pc_agent.model.client import ModelClient, ModelResponse
+from pc_agent.pc.backend import Backend
+from pc_agent.pc.screenshot import Screenshot
+
+TRAJECTORY_FILE = "trajectory.jsonl"
+FRAMES_DIR = "frames"
+
+
+def _frame_extension(data: bytes) -> str:
+    return ".jpg" if data.startswith(b"\xff\xd8") else ".png"
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip a value through JSON, so live and recorded values compare equal."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class TrajectoryRecorder:
+    """
+    Append-only on-disk recording of one task run.
+
+    A trajectory is a directory holding ``trajectory.jsonl`` and a
+    ``frames/`` folder. Screenshots are stored once per distinct content,
+    named by their SHA-256, and steps refer to them by digest. The JSONL
+    file has one "task" line, one "step" line per executed step and a
+    final "result" line; conversation history is stored as the messages
+    added since the previous step, so the file grows linearly. Each step
+    also notes how much of that history its model request carried, and any
+    messages sent between the history and the screenshot (thumbnails).
+
+    Args:
+        path: Trajectory directory, created if missing.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.frames_path = self.path / FRAMES_DIR
+        self.frames_path.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path / TRAJECTORY_FILE, "a", encoding="utf-8")
+        self._frames = {p.stem for p in self.frames_path.iterdir()}
+        self._history_len = 0
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def add_frame(self, base64_data: str) -> str:
+        """
+        Store a screenshot unless identical content is already stored.
+
+        Args:
+            base64_data: Base64-encoded image.
+
+        Returns:
+            The frame digest.
+        """
+        data = base64.b64decode(base64_data)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._frames:
+            (self.frames_path / f"{digest}{_frame_extension(data)}").write_bytes(data)
+            self._frames.add(digest)
+        return digest
+
+    def _strip_images(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace inline images in a message with frame references."""
+        content = message.get("content")
+        if not isinstance(content, list):
+            return message
+        parts = []
+        for part in content:
+            if part.get("type") == "image_url":
+                url = part["image_url"]["url"]
+                parts.append({"type": "frame", "frame": self.add_frame(url.split(",", 1)[-1])})
+            else:
+                parts.append(part)
+        return {**message, "content": parts}
+
+    def start(self, task: str, **metadata: Any) -> None:
+        """
+        Record the start of a task.
+
+        Args:
+            task: The task description.
+            **metadata: Extra fields, e.g. model name and language.
+        """
+        self._history_len = 0
+        self._write({"type": "task", "task": task, "started_at": time.time(), **metadata})
+
+    def record_step(
+        self,
+        step: int,
+        screenshot: Screenshot,
+        current_app: str,
+        history: List[Dict[str, Any]],
+        user_message: Dict[str, Any],
+        response: ModelResponse,
+        action: Action,
+        result: ActionResult,
+        timings: Dict[str, float],
+        request_messages: Optional[List[Dict[str, Any]]] = None,
+        executed: Optional[Action] = None,
+    ) -> None:
+        """
+        Record one executed step.
+
+        Args:
+            step: Step number.
+            screenshot: The screenshot the model saw.
+            current_app: The detected foreground app.
+            history: The agent's full persistent message history; only the
+                messages added since the previous step are written.
+            user_message: The per-step message carrying the screenshot.
+            response: The model response.
+            action: The action parsed from the model output.
+            result: The action result.
+            timings: Seconds spent per phase in this step.
+            request_messages: The messages sent to the model, or None if the
+                step was replayed without a request.
+            executed: The action actually performed, if the agent changed the
+                parsed one (tap snapping, loop recovery alternatives).
+        """
+        new_messages = [self._strip_images(m) for m in history[self._history_len:]]
+        self._history_len = len(history)
+        request = None
+        if request_messages is not None:
+            # The request starts with the history as it was then; the agent only appends to it
+            shared = 0
+            while shared < len(request_messages) - 1 and shared < len(history) and request_messages[shared] is history[shared]:
+                shared += 1
+            request = {
+                "history": shared,
+                "extra": [self._strip_images(m) for m in request_messages[shared:-1]],
+            }
+        self._write({
+            "type": "step",
+            "step": step,
+            "frame": self.add_frame(screenshot.base64_data),
+            "width": screenshot.width,
+            "height": screenshot.height,
+            "logical_width": screenshot.logical_width,
+            "logical_height": screenshot.logical_height,
+            "current_app": current_app,
+            "history": new_messages,
+            "user_message": self._strip_images(user_message),
+            "request": request,
+            "raw_content": response.raw_content,
+            "thinking": response.thinking,
+            "action": response.action,
+            "parsed": action.to_dict(),
+            "executed": (executed or action).to_dict(),
+            "result": asdict(result),
+            "usage": response.usage,
+            "timings": {phase: round(seconds, 6) for phase, seconds in timings.items()},
+        })
+
+    def finish(self, result: Any) -> None:
+        """
+        Record how the task ended.
+
+        Args:
+            result: The TaskResult of the run.
+        """
+        self._write({"type": "result", **asdict(result)})
+
+    def close(self) -> None:
+        """Close the trajectory file."""
+        self._file.close()
+
+
+@dataclass
+class Trajectory:
+    """A recorded task run loaded from disk."""
+
+    path: Path
+    task: Dict[str, Any]
+    steps: List[Dict[str, Any]]
+    result: Optional[Dict[str, Any]] = None
+
+    def frame_bytes(self, digest: str) -> bytes:
+        """Read the raw image bytes of a stored frame."""
+        matches = list((self.path / FRAMES_DIR).glob(f"{digest}.*"))
+        if not matches:
+            raise FileNotFoundError(f"Frame {digest} missing from {self.path}")
+        return matches[0].read_bytes()
+
+    def screenshot(self, index: int) -> Screenshot:
+        """Rebuild the Screenshot seen at a step (by index into steps)."""
+        step = self.steps[index]
+        return Screenshot(
+            base64_data=base64.b64encode(self.frame_bytes(step["frame"])).decode("utf-8"),
+            width=step["width"],
+            height=step["height"],
+            logical_width=step["logical_width"],
+            logical_height=step["logical_height"],
+        )
+
+    def request_messages(self, index: int) -> List[Dict[str, Any]]:
+        """
+        Rebuild the exact message list sent to the model at a step.
+
+        Args:
+            index: Index into steps.
+
+        Returns:
+            OpenAI-format messages with frames inlined as data URLs.
+
+        Raises:
+            ValueError: If the step sent no request (it was replayed from the
+                plan cache) or was recorded without its request.
+        """
+        step = self.steps[index]
+        request = step.get("request")
+        if request is None:
+            raise ValueError(f"Step {step['step']} has no recorded model request")
+        history = [message for recorded in self.steps[:index + 1] for message in recorded["history"]]
+        messages = history[:request["history"]] + request["extra"] + [step["user_message"]]
+        return [self._inline_frames(m) for m in messages]
+
+    def _inline_frames(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        content = message.get("content")
+        if not isinstance(content, list):
+            return message
+        parts = []
+        for part in content:
+            if part.get("type") == "frame":
+                data = self.frame_bytes(part["frame"])
+                mime = "image/jpeg" if _frame_extension(data) == ".jpg" else "image/png"
+                url = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+                parts.append({"type": "image_url", "image_url": {"url": url}})
+            else:
+                parts.append(part)
+        return {**message, "content": parts}
+
+
+def load_trajectory(path: Union[str, Path]) -> Trajectory:
+    """
+    Load a recorded trajectory.
+
+    If the directory holds several runs, the last one is loaded.
+
+    Args:
+        path: Trajectory directory.
+
+    Returns:
+        The loaded Trajectory.
+
+    Raises:
+        ValueError: If the directory holds no recorded task.
+    """
+    path = Path(path)
+    task: Optional[Dict[str, Any]] = None
+    steps: List[Dict[str, Any]] = []
+    result = None
+    with open(path / TRAJECTORY_FILE, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.pop("type")
+            if kind == "task":
+                task, steps, result = record, [], None
+            elif kind == "step":
+                steps.append(record)
+            elif kind == "result":
+                result = record
+    if task is None:
+        raise ValueError(f"No recorded task in {path}")
+    return Trajectory(path=path, task=task, steps=steps, result=result)
+
+
+class ReplayBackend(Backend):
+    """
+    No-op backend serving recorded frames.
+
+    Input actions are collected in ``calls`` instead of touching a screen,
+    and waits return immediately.
+
+    Args:
+        trajectory: The recorded run to serve frames from.
+    """
+
+    def __init__(self, trajectory: Trajectory):
+        self.trajectory = trajectory
+        self.index = 0
+        self.calls: List[Tuple[Any, ...]] = []
+
+    def get_screenshot(self) -> Screenshot:
+        return self.trajectory.screenshot(self.index)
+
+    def get_current_app(self) -> str:
+        return self.trajectory.steps[self.index]["current_app"]
+
+    def tap(self, x: int, y: int) -> None:
+        self.calls.append(("tap", x, y))
+
+    def double_tap(self, x: int, y: int) -> None:
+        self.calls.append(("double_tap", x, y))
+
+    def long_press(self, x: int, y: int) -> None:
+        self.calls.append(("long_press", x, y))
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int) -> None:
+        self.calls.append(("swipe", start_x, start_y, end_x, end_y))
+
+    def back(self) -> None:
+        self.calls.append(("back",))
+
+    def home(self) -> None:
+        self.calls.append(("home",))
+
+    def launch_app(self, app_name: str) -> bool:
+        self.calls.append(("launch_app", app_name))
+        return True
+
+    def type_text(self, text: str) -> None:
+        self.calls.append(("type_text", text))
+
+    def clear_text(self) -> None:
+        self.calls.append(("clear_text",))
+
+    def press_key(self, key: str) -> None:
+        self.calls.append(("press_key", key))
+
+    def wait(self, seconds: float, reason: str = "wait") -> None:
+        self.calls.append(("wait", seconds))
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of replaying a trajectory through the parsers and ActionHandler."""
+
+    task: str
+    steps: int = 0
+    action_mismatches: List[int] = field(default_factory=list)  # response parser disagrees
+    parse_mismatches: List[int] = field(default_factory=list)  # action parser disagrees
+    result_mismatches: List[int] = field(default_factory=list)  # ActionResult differs
+    parse_failures: List[int] = field(default_factory=list)  # parser fell back to Wait
+    parse_time: float = 0.0
+    execute_time: float = 0.0
+
+    @property
+    def matched(self) -> bool:
+        """True if every step reproduced the recorded behaviour."""
+        return not (self.action_mismatches or self.parse_mismatches or self.result_mismatches)
+
+    def format(self) -> str:
+        """Render the report as a short text block."""
+        return "\n".join([
+            f"Task: {self.task}",
+            f"Steps replayed: {self.steps}",
+            f"Response parser mismatches: {self.action_mismatches or 'none'}",
+            f"Action parser mismatches: {self.parse_mismatches or 'none'}",
+            f"Result mismatches: {self.result_mismatches or 'none'}",
+            f"Parse failures: {self.parse_failures or 'none'}",
+            f"Parse time: {self.parse_time * 1000:.2f} ms, execute time: {self.execute_time * 1000:.2f} ms",
+        ])
+
+
+def replay(
+    path: Union[str, Path],
+    response_parser: Callable[[str], Tuple[str, str]] = ModelClient._parse_response,
+    action_parser: Callable[[str], Action] = parse_action,
+) -> ReplayReport:
+    """
+    Re-run a recorded trajectory without a screen or a model.
+
+    Each recorded model output goes back through the response and action
+    parsers and the ActionHandler, driving a ReplayBackend. The results are
+    compared with what was recorded, so a new parser can be scored against
+    past runs and the pipeline can be benchmarked deterministically.
+    Sensitive actions are treated as confirmed, and Call_API steps get the
+    recorded summary back.
+
+    Args:
+        path: Trajectory directory.
+        response_parser: Splits raw model output into (thinking, action).
+        action_parser: Parses an action string into an Action.
+
+    Returns:
+        The ReplayReport.
+    """
+    trajectory = load_trajectory(path)
+    backend = ReplayBackend(trajectory)
+    handler = ActionHandler(
+        confirmation_callback=lambda message: True,
+        takeover_callback=lambda message: None,
+        backend=backend,
+        # Call_API answers with the summary the model gave when the step was recorded
+        summarize_callback=lambda instruction, notes: trajectory.steps[backend.index]["result"]["message"] or "",
+    )
+    report = ReplayReport(task=trajectory.task["task"])
+
+    for index, step in enumerate(trajectory.steps):
+        backend.index = index
+        number = step["step"]
+
+        start = time.perf_counter()
+        _, action_text = response_parser(step["raw_content"])
+        action = action_parser(action_text)
+        report.parse_time += time.perf_counter() - start
+
+        if action_text != step["action"]:
+            report.action_mismatches.append(number)
+        if _jsonable(action.to_dict()) != step["parsed"]:
+            report.parse_mismatches.append(number)
+        if action.parse_error:
+            report.parse_failures.append(number)
+        if step.get("executed", step["parsed"]) != step["parsed"]:
+            # The agent snapped or substituted the parsed action: perform what it performed
+            action = action_from_dict(step["executed"])
+
+        start = time.perf_counter()
+        result = handler.execute(
+            action, step["logical_width"], step["logical_height"]
+        )
+        report.execute_time += time.perf_counter() - start
+        if _jsonable(asdict(result)) != step["result"]:
+            report.result_mismatches.append(number)
+
+        report.steps += 1
+    return report
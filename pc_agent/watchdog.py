@@ -0,0 +1,111 @@
+"""Deadlines for blocking calls: desktop I/O, input and model requests."""
+
+import contextvars
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from pc_agent import metrics
+
+T = TypeVar("T")
+
+# Seconds per agent phase; a phase missing here (or set to 0) has no deadline.
+# "action" covers the settle delays inside actions and slow typing, so it is generous;
+# takeovers and confirmations wait for the user outside it.
+DEFAULT_PHASE_DEADLINES: Dict[str, float] = {
+    "capture": 15.0,
+    "app_detection": 10.0,
+    "ui_tree": 5.0,
+    "model": 180.0,
+    "action": 120.0,
+}
+
+
+class PhaseTimeout(TimeoutError):
+    """
+    A phase did not finish within its deadline.
+
+    Args:
+        phase: Name of the phase.
+        deadline: The deadline in seconds.
+        done: Set once the abandoned call has returned.
+    """
+
+    def __init__(self, phase: str, deadline: float, done: Optional[threading.Event] = None):
+        super().__init__(f"Phase '{phase}' did not finish within {deadline:g}s")
+        self.phase = phase
+        self.deadline = deadline
+        self.done = done if done is not None else threading.Event()
+
+
+def call_with_deadline(phase: str, deadline: Optional[float], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call, giving up on it after a deadline.
+
+    The call runs on a daemon thread, in a copy of the caller's context (so
+    it is traced by the caller's tracer). A Python thread cannot be killed,
+    so a call that overruns is abandoned: it keeps its thread until it
+    returns, but the caller is released; ``PhaseTimeout.done`` tells when it
+    has. Calls that own a subprocess or a connection should still bound it
+    themselves (``subprocess`` timeouts, the model client's timeout) so
+    abandoned threads do finish.
+
+    Args:
+        phase: Name of the phase, for the error and metrics.
+        deadline: Seconds to wait; None or 0 runs the call directly.
+        fn: The call.
+        *args: Positional arguments for ``fn``.
+        **kwargs: Keyword arguments for ``fn``.
+
+    Returns:
+        What ``fn`` returned.
+
+    Raises:
+        PhaseTimeout: If the deadline passed first.
+        Exception: Whatever ``fn`` raised.
+    """
+    if not deadline:
+        return fn(*args, **kwargs)
+
+    outcome: Dict[str, Any] = {}
+    done = threading.Event()
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        try:
+            outcome["value"] = context.run(fn, *args, **kwargs)
+        except BaseException as e:  # re-raised in the caller
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name=f"phase-{phase}", daemon=True).start()
+    if not done.wait(deadline):
+        metrics.PHASE_TIMEOUTS.inc(phase=phase)
+        raise PhaseTimeout(phase, deadline, done)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+# Phases the agent retries after a missed deadline (``AgentConfig.phase_retries``)
+RETRIED_PHASES = ("capture", "model")
+
+
+def step_bound(deadlines: Dict[str, float], retries: int = 0) -> Optional[float]:
+    """
+    Upper bound on the time one agent step spends in its guarded phases.
+
+    Args:
+        deadlines: Seconds per phase, as in ``AgentConfig.phase_deadlines``.
+        retries: Retries of the phases in ``RETRIED_PHASES``.
+
+    Returns:
+        The bound in seconds, or None if a phase has no deadline.
+    """
+    total = 0.0
+    for phase in DEFAULT_PHASE_DEADLINES:
+        deadline = deadlines.get(phase)
+        if not deadline:
+            return None
+        total += deadline * (retries + 1 if phase in RETRIED_PHASES else 1)
+    return total